@@ -22,6 +22,7 @@ from src.db.database import SQLModel # Assuming you might have SQLModel imported
 
 # Import at least one model, but ideally all for autogenerate
 from src.db.models.student import Student
+from src.db.models.student_change import StudentChange
 # from app.db.models.graduation import Graduation
 # from app.db.models.period import Period
 
@@ -0,0 +1,31 @@
+"""add student keyset indexes
+
+Revision ID: 3c1f2a9b7d40
+Revises: 6fda89a6f58d
+Create Date: 2025-08-18 09:12:44.201733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f2a9b7d40'
+down_revision: Union[str, Sequence[str], None] = '6fda89a6f58d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_student_created_at_id', 'student', ['created_at', 'id'], unique=False)
+    op.create_index('ix_student_name_id', 'student', ['name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_student_name_id', table_name='student')
+    op.drop_index('ix_student_created_at_id', table_name='student')
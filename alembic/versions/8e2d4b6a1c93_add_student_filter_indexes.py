@@ -0,0 +1,52 @@
+"""add student filter indexes
+
+Revision ID: 8e2d4b6a1c93
+Revises: 3c1f2a9b7d40
+Create Date: 2025-08-24 10:03:17.482915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2d4b6a1c93'
+down_revision: Union[str, Sequence[str], None] = '3c1f2a9b7d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_student_id_semester', 'student', ['id_semester'], unique=False)
+    if op.get_bind().dialect.name == 'postgresql':
+        # Trigram index for name prefix/substring (I)LIKE searches
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index(
+            'ix_student_name_trgm', 'student', ['name'], unique=False,
+            postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}
+        )
+        # JSONB so department key/value filters (@> containment) can use a GIN index
+        op.alter_column(
+            'student', 'department',
+            type_=postgresql.JSONB(), existing_type=sa.JSON(), existing_nullable=True,
+            postgresql_using='department::jsonb'
+        )
+        op.create_index('ix_student_department', 'student', ['department'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_student_department', table_name='student')
+        op.alter_column(
+            'student', 'department',
+            type_=sa.JSON(), existing_type=postgresql.JSONB(), existing_nullable=True,
+            postgresql_using='department::json'
+        )
+        op.drop_index('ix_student_name_trgm', table_name='student')
+    op.drop_index('ix_student_id_semester', table_name='student')
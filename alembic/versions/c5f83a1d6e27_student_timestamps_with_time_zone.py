@@ -0,0 +1,45 @@
+"""student timestamps with time zone
+
+Revision ID: c5f83a1d6e27
+Revises: b7e41c2d9f05
+Create Date: 2025-09-12 14:22:08.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f83a1d6e27'
+down_revision: Union[str, Sequence[str], None] = 'b7e41c2d9f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The application writes aware UTC datetimes, which asyncpg refuses to bind to "timestamp without time zone".
+    # Existing values were stored as UTC wall-clock times. SQLite has no time zone type, nothing to change there
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for column in ('created_at', 'updated_at'):
+        op.alter_column(
+            'student', column,
+            type_=sa.DateTime(timezone=True), existing_type=sa.DateTime(), existing_nullable=False,
+            existing_server_default=sa.text('now()'), postgresql_using=f"{column} AT TIME ZONE 'UTC'"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    for column in ('created_at', 'updated_at'):
+        op.alter_column(
+            'student', column,
+            type_=sa.DateTime(), existing_type=sa.DateTime(timezone=True), existing_nullable=False,
+            existing_server_default=sa.text('now()'), postgresql_using=f"{column} AT TIME ZONE 'UTC'"
+        )
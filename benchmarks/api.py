@@ -0,0 +1,284 @@
+"""
+Load test for the student API.
+
+Seeds the database, then drives create / get / list / update / delete either in-process
+through httpx's ASGI transport ("asgi") or over a real uvicorn socket ("socket"), and
+reports throughput and p50/p95/p99 latency per endpoint.
+
+Usage (from the project root):
+    python -m benchmarks.api --seed 10000 --requests 2000 --concurrency 32
+    python -m benchmarks.api --mode socket --save benchmarks/results/baseline.json
+    python -m benchmarks.api --compare benchmarks/results/baseline.json
+
+Without DATABASE_URL a throwaway SQLite file is used. Set DATABASE_ASYNC=true (or any
+other setting) in the environment to benchmark that configuration; the socket server
+inherits the environment. Never point this at a database holding real data: it creates,
+updates and deletes rows.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx  # noqa: E402
+
+from benchmarks.seed import make_student, sample_ids, seed  # noqa: E402
+from src.core.config import settings  # noqa: E402
+from src.core.logging_config import configure_logging  # noqa: E402
+from src.db.database import get_engine  # noqa: E402
+
+SCENARIOS = ["create", "get", "list", "update", "delete"]
+API = settings.API_V1_STR
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], statuses: Dict[int, int], elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": sum(n for code, n in statuses.items() if code >= 400),
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+        "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+async def drive(client: httpx.AsyncClient, make_request: Callable[[int], Any], requests: int, concurrency: int) -> Dict[str, Any]:
+    """Runs `requests` calls of make_request(i) with at most `concurrency` in flight."""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    counter = itertools.count()
+
+    async def worker():
+        while True:
+            i = next(counter)
+            if i >= requests:
+                return
+            method, url, kwargs = make_request(i)
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+async def run_scenarios(client: httpx.AsyncClient, args, ids: List[Any]) -> Dict[str, Dict[str, Any]]:
+    run_tag = f"R{int(time.time() * 1000) % 10**9}"
+    created: List[str] = []
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def create_request(i):
+        payload = make_student(i, prefix=run_tag).model_dump()
+        return "POST", f"{API}/student/", {"json": payload}
+
+    def get_request(i):
+        return "GET", f"{API}/student/{random.choice(ids)}", {}
+
+    def list_request(i):
+        offset = random.randint(0, max(0, min(args.seed, args.list_max_offset) - args.page_size))
+        return "GET", f"{API}/student/", {"params": {"offset": offset, "limit": args.page_size}}
+
+    def update_request(i):
+        return "PUT", f"{API}/student/{random.choice(ids)}", {"json": {"name": f"Updated {i}"}}
+
+    def delete_request(i):
+        return "DELETE", f"{API}/student/{created[i % len(created)]}", {}
+
+    makers = {
+        "create": create_request,
+        "get": get_request,
+        "list": list_request,
+        "update": update_request,
+        "delete": delete_request,
+    }
+
+    # Warm up connections, caches and the threadpool before measuring
+    for scenario in ("get", "list"):
+        if scenario in args.scenarios:
+            await drive(client, makers[scenario], min(50, args.requests), args.concurrency)
+
+    for scenario in args.scenarios:
+        if scenario == "delete":
+            # Delete only rows created by this run so the seeded table stays intact
+            if not created:
+                await drive(client, create_request, args.requests, args.concurrency)
+            created[:] = fetch_created_ids(run_tag)
+            if not created:
+                continue
+            count = len(created)
+        else:
+            count = args.requests
+        results[scenario] = await drive(client, makers[scenario], count, args.concurrency)
+        print(format_row(scenario, results[scenario]))
+        if scenario == "create":
+            created[:] = fetch_created_ids(run_tag)
+    return results
+
+
+def fetch_created_ids(run_tag: str) -> List[str]:
+    from sqlmodel import Session, select
+    from src.db.models.student import Student
+    with Session(get_engine()) as session:
+        rows = session.exec(select(Student.id).where(Student.student_id.startswith(run_tag))).all()
+    return [str(row) for row in rows]
+
+
+def format_row(scenario: str, result: Dict[str, Any]) -> str:
+    return (
+        f"  {scenario:<8} {result['requests']:>7} req  {result['throughput_rps']:>9.1f} req/s  "
+        f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  "
+        f"errors {result['errors']} {result['statuses']}"
+    )
+
+
+async def bench_asgi(args, ids) -> Dict[str, Dict[str, Any]]:
+    from src.main import app
+    # Count server errors as responses, like the socket mode does, instead of raising them
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return await run_scenarios(client, args, ids)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def bench_socket(args, ids) -> Dict[str, Dict[str, Any]]:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        env=os.environ.copy(),
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline or server.poll() is not None:
+                        raise RuntimeError("uvicorn did not start")
+                    await asyncio.sleep(0.2)
+            return await run_scenarios(client, args, ids)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[str]:
+    """Returns a line per scenario whose p95 or throughput regressed by more than `tolerance`."""
+    regressions = []
+    for mode, scenarios in current["results"].items():
+        for scenario, result in scenarios.items():
+            before = baseline.get("results", {}).get(mode, {}).get(scenario)
+            if not before:
+                continue
+            p95_change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+            rps_change = (result["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] if before["throughput_rps"] else 0.0
+            line = f"  {mode}/{scenario:<8} p95 {before['p95_ms']:.2f} -> {result['p95_ms']:.2f}ms ({p95_change:+.0%})  " \
+                   f"rps {before['throughput_rps']:.0f} -> {result['throughput_rps']:.0f} ({rps_change:+.0%})"
+            print(line)
+            if p95_change > tolerance or rps_change < -tolerance:
+                regressions.append(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=10000, help="Students in the table before measuring (10k to 1M)")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mode", choices=["asgi", "socket", "both"], default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers in socket mode")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--page-size", type=int, default=100, help="limit used by the list scenario")
+    parser.add_argument("--list-max-offset", type=int, default=10000, help="Highest offset the list scenario reads")
+    parser.add_argument("--save", help="Write results as JSON to this path")
+    parser.add_argument("--compare", help="Baseline JSON to compare against; exits 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative regression for --compare")
+    args = parser.parse_args()
+
+    configure_logging()
+    engine = get_engine()
+    rows = seed(engine, args.seed)
+    ids = sample_ids(engine, 10000)
+    modes = ["asgi", "socket"] if args.mode == "both" else [args.mode]
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": engine.url.get_backend_name(),
+            "database_async": settings.DATABASE_ASYNC,
+            "rows": rows,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+        },
+        "results": {},
+    }
+    for mode in modes:
+        print(f"{mode}: {rows} students, {args.requests} requests/scenario, concurrency {args.concurrency}")
+        runner = bench_asgi if mode == "asgi" else bench_socket
+        report["results"][mode] = asyncio.run(runner(args, ids))
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"saved {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"compared with {args.compare} ({baseline['meta'].get('git_revision')}):")
+        regressions = compare(baseline, report, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
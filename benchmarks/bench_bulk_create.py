@@ -0,0 +1,87 @@
+"""
+Compares single-row StudentService.create_student against bulk_create_students.
+
+Usage (from the project root):
+    python -m benchmarks.bench_bulk_create --rows 5000
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.bench_bulk_create --rows 20000
+
+Without DATABASE_URL a throwaway SQLite file is used. The student table is emptied
+before each run, so never point this at a database holding real data.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+
+from sqlmodel import Session, SQLModel, delete  # noqa: E402
+
+from src.db.database import get_engine  # noqa: E402
+from src.db.models.student import Student, StudentCreate  # noqa: E402
+from src.services.student_service import StudentService  # noqa: E402
+
+
+def make_students(count: int, prefix: str):
+    return [
+        StudentCreate(
+            name=f"Student {i}",
+            student_id=f"{prefix}{i:08d}",
+            id_semester="2025-1",
+            email=f"{prefix}{i}@example.com",
+            department={"code": "CS", "faculty": "Engineering"},
+        )
+        for i in range(count)
+    ]
+
+
+def reset(engine):
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.exec(delete(Student))
+        session.commit()
+
+
+def bench_single(engine, students) -> float:
+    reset(engine)
+    started = time.perf_counter()
+    with Session(engine) as session:
+        service = StudentService(session)
+        for student in students:
+            service.create_student(student)
+    return time.perf_counter() - started
+
+
+def bench_bulk(engine, students, upsert: bool) -> float:
+    reset(engine)
+    started = time.perf_counter()
+    with Session(engine) as session:
+        response = StudentService(session).bulk_create_students(students, upsert=upsert)
+    elapsed = time.perf_counter() - started
+    assert response.created == len(students), response.conflicts
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="Rows written by the bulk runs")
+    parser.add_argument("--single-rows", type=int, default=1000, help="Rows written by the single-row run")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+
+    results = {
+        "single-row create_student": (args.single_rows, bench_single(engine, make_students(args.single_rows, "s"))),
+        "bulk insert": (args.rows, bench_bulk(engine, make_students(args.rows, "b"), upsert=False)),
+        "bulk upsert": (args.rows, bench_bulk(engine, make_students(args.rows, "u"), upsert=True)),
+    }
+    baseline = args.single_rows / results["single-row create_student"][1]
+    for name, (rows, elapsed) in results.items():
+        rate = rows / elapsed
+        print(f"{name:<28} {rows:>8} rows {elapsed:>8.3f}s {rate:>10.0f} rows/s  x{rate / baseline:.1f}")
+    reset(engine)
+
+
+if __name__ == "__main__":
+    main()
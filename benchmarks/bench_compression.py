@@ -0,0 +1,121 @@
+"""
+Measures what CompressionMiddleware costs in CPU against the bytes it saves on student list pages.
+
+Bodies are real GET /student/ page bodies (rendered with ModelJSONResponse) of synthetic students
+with a department JSON blob each, sent through the middleware as a single body and as a stream
+of chunks. For every coding and level it reports the compressed size, the CPU time per response,
+and the transfer time saved on a link of --link-mbps.
+
+Usage (from the project root):
+    python -m benchmarks.bench_compression
+    python -m benchmarks.bench_compression --rows 100 1000 --levels 1 4 6 9 --link-mbps 20
+
+No database is needed.
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from src.core.middleware import CompressionMiddleware, brotli  # noqa: E402
+from src.db.models.student import StudentRead  # noqa: E402
+from src.utils.pagination import create_paginated_response  # noqa: E402
+from src.utils.responses import ModelJSONResponse  # noqa: E402
+
+FACULTIES = ["Engineering", "Science", "Arts", "Medicine", "Law"]
+
+
+def make_page(rows: int) -> bytes:
+    now = datetime.now(timezone.utc)
+    students = [
+        StudentRead(
+            id=uuid.uuid4(),
+            name=f"Student {i}",
+            student_id=f"S{i:08d}",
+            id_semester=f"2025-{i % 2 + 1}",
+            email=f"student{i}@example.edu",
+            department={
+                "code": f"D{i % 40:02d}",
+                "faculty": FACULTIES[i % len(FACULTIES)],
+                "advisor": f"Prof. {i % 97}",
+                "courses": [f"C{(i * 7 + k) % 500:03d}" for k in range(6)],
+            },
+            updated_at=now,
+        )
+        for i in range(rows)
+    ]
+    return ModelJSONResponse(create_paginated_response(students, rows * 10, 0, rows, StudentRead)).body
+
+
+def run(body: bytes, accept_encoding: str, level: int, quality: int, chunk_size: int, iterations: int):
+    """Sends `body` through the middleware `iterations` times; returns (seconds per response, bytes sent)."""
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] if chunk_size else [body]
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+
+    middleware = CompressionMiddleware(app, minimum_size=1024, level=level, brotli_quality=quality)
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    sent = 0
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal sent
+        if message["type"] == "http.response.body":
+            sent += len(message["body"])
+
+    async def loop():
+        for _ in range(iterations):
+            await middleware(scope, receive, send)
+
+    started = time.process_time()
+    asyncio.run(loop())
+    return (time.process_time() - started) / iterations, sent // iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 100, 1000], help="Students per list page")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 6, 9], help="gzip/deflate levels to try")
+    parser.add_argument("--brotli-qualities", type=int, nargs="+", default=[1, 4, 6], help="br qualities (needs brotli)")
+    parser.add_argument("--chunk-size", type=int, default=16384, help="Chunk size of the streamed runs")
+    parser.add_argument("--link-mbps", type=float, default=50.0, help="Client bandwidth used to price the saved bytes")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    variants = [("identity", "identity", 0, 0)]
+    variants += [(f"gzip -{level}", "gzip", level, 0) for level in args.levels]
+    variants += [(f"deflate -{level}", "deflate", level, 0) for level in args.levels if level == 6]
+    if brotli is not None:
+        variants += [(f"br q{quality}", "br", 6, quality) for quality in args.brotli_qualities]
+    else:
+        print("brotli is not installed; br is skipped")
+
+    bytes_per_second = args.link_mbps * 1_000_000 / 8
+    for rows in args.rows:
+        body = make_page(rows)
+        print(f"\n{rows} rows, {len(body)} bytes uncompressed, {args.link_mbps:g} Mbit/s link")
+        print(f"{'coding':<12} {'mode':<7} {'bytes':>9} {'ratio':>6} {'cpu ms':>8} {'wire ms':>8} {'saved ms':>9} {'cpu us/KB saved':>16}")
+        for label, accept_encoding, level, quality in variants:
+            for mode, chunk_size in (("single", 0), ("stream", args.chunk_size)):
+                seconds, sent = run(body, accept_encoding, level, quality, chunk_size, args.iterations)
+                wire = sent / bytes_per_second
+                saved = len(body) - sent
+                per_kb = seconds * 1e6 / (saved / 1024) if saved > 0 else float("nan")
+                print(
+                    f"{label:<12} {mode:<7} {sent:>9} {len(body) / sent:>6.1f} {seconds * 1000:>8.3f} "
+                    f"{wire * 1000:>8.2f} {(len(body) - sent) / bytes_per_second * 1000:>9.2f} {per_kb:>16.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Seeds the student table with synthetic rows for benchmarking.
+
+Usage (from the project root):
+    python -m benchmarks.seed --rows 100000
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.seed --rows 1000000 --reset
+
+Rows are written through StudentService.bulk_create_students, so seeding 1M rows takes
+seconds to minutes rather than hours.
+"""
+import argparse
+import os
+import random
+import time
+from typing import List
+from uuid import UUID
+
+from sqlmodel import Session, SQLModel, delete, func, select
+
+from src.db.models.student import Student, StudentCreate
+from src.services.student_service import StudentService
+
+DEPARTMENTS = [
+    {"code": "CS", "name": "Computer Science", "faculty": "Engineering"},
+    {"code": "EE", "name": "Electrical Engineering", "faculty": "Engineering"},
+    {"code": "MA", "name": "Mathematics", "faculty": "Science"},
+    {"code": "PH", "name": "Physics", "faculty": "Science"},
+    {"code": "EC", "name": "Economics", "faculty": "Business"},
+]
+SEMESTERS = [f"{year}-{term}" for year in range(2020, 2026) for term in (1, 2)]
+
+
+def make_student(number: int, prefix: str = "BENCH") -> StudentCreate:
+    return StudentCreate(
+        name=f"Student {number:07d}",
+        student_id=f"{prefix}{number:09d}",
+        id_semester=SEMESTERS[number % len(SEMESTERS)],
+        email=f"{prefix.lower()}{number}@example.com",
+        department=DEPARTMENTS[number % len(DEPARTMENTS)],
+    )
+
+
+def seed(engine, rows: int, reset: bool = False, chunk: int = 10000, prefix: str = "BENCH") -> int:
+    """Creates the tables if needed and tops the student table up to `rows` rows. Returns the row count."""
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        if reset:
+            session.exec(delete(Student))
+            session.commit()
+        existing = session.exec(select(func.count()).select_from(Student)).one()
+        service = StudentService(session)
+        number = existing
+        started = time.perf_counter()
+        while number < rows:
+            batch = [make_student(n, prefix) for n in range(number, min(number + chunk, rows))]
+            service.bulk_create_students(batch)
+            number += len(batch)
+        if number > existing:
+            elapsed = time.perf_counter() - started
+            print(f"seeded {number - existing} students in {elapsed:.1f}s ({(number - existing) / elapsed:.0f} rows/s)")
+        return session.exec(select(func.count()).select_from(Student)).one()
+
+
+def sample_ids(engine, count: int) -> List[UUID]:
+    """Returns up to `count` random student primary keys."""
+    with Session(engine) as session:
+        ids = session.exec(select(Student.id).limit(count * 4)).all()
+    random.shuffle(ids)
+    return ids[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--reset", action="store_true", help="Delete all students first")
+    args = parser.parse_args()
+
+    from src.db.database import get_engine
+    total = seed(get_engine(), args.rows, reset=args.reset)
+    print(f"student table now holds {total} rows ({os.environ.get('DATABASE_URL', '').split('://')[0]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,30 @@
 # app/api/v1/deps.py
-from typing import Generator
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Generator, Union
 from sqlmodel import Session
-from src.db.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.core.config import settings
+from src.db.database import get_async_session, get_session, new_async_session, new_session
 
 # Re-export get_session for convenience in endpoints
 def get_db_session() -> Generator[Session, None, None]:
     yield from get_session()
 
+# Session dependency for request handlers: AsyncSession when DATABASE_ASYNC is enabled,
+# otherwise the sync Session (which FastAPI resolves in the threadpool)
+get_request_session = get_async_session if settings.DATABASE_ASYNC else get_session
+
+# Same session selection for work that outlives the request handler, e.g. streaming response bodies,
+# which run after the dependencies with yield have already been closed
+@asynccontextmanager
+async def open_request_session() -> AsyncGenerator[Union[Session, AsyncSession], None]:
+    if settings.DATABASE_ASYNC:
+        async with new_async_session() as session:
+            yield session
+    else:
+        with new_session() as session:
+            yield session
+
 # You might add other dependencies here, e.g., for authentication:
 # from fastapi import Depends, HTTPException, status
 # from src.core.security import verify_token, decode_token
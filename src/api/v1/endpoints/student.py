@@ -1,29 +1,109 @@
-from typing import List
+import asyncio
+from typing import Dict, List, Literal, Optional, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from weakref import WeakKeyDictionary
+from fastapi import APIRouter, Body, Depends, File, Header, HTTPException, Query, UploadFile, status, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
-from src.db.database import get_session # Your dependency for getting a DB session
-from src.db.models.student import StudentCreate, StudentRead, StudentUpdate
-from src.services.student_service import StudentService # Import your new service
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.api.v1.deps import get_request_session, open_request_session # Your dependency for getting a DB session
+from src.db.models.pagination import PaginatedResponse
+from src.core.config import settings
+from src.core.exceptions import (
+    IdempotencyKeyReused, IdempotencyRequestInProgress, ImportFileTooLarge, StudentConflict, StudentVersionConflict,
+    UnsupportedImportFormat
+)
+from src.core.idempotency import get_idempotency_store, request_fingerprint
+from src.core.logging_config import LazyValue
+from src.db.models.student import (
+    STUDENT_READ_FIELDS, StudentCreate, StudentRead, StudentUpdate, StudentBulkResponse, StudentBatchResponse, StudentFilter
+)
+from src.db.models.student_change import StudentChange, StudentChangeEvent
+from src.db.models.student_import import StudentImportJob
+from src.services.async_student_service import AsyncStudentService # Import your new service
+from src.services.student_cache import get_student_cache
+from src.services.student_changes import get_change_notifier
+from src.services.student_count_cache import get_student_count_cache
+from src.services.student_import import get_student_importer
+from src.services.student_service import EXPORT_COLUMNS, StudentFields, sort_key, student_read_type
+from src.utils.dataloader import DataLoader
+from src.utils.etag import as_utc, etag_matches, is_not_modified, page_etag, parse_if_match, student_validators
+from src.utils.export import rows_to_csv, rows_to_ndjson
+from src.utils.pagination import create_paginated_response, decode_cursor, encode_cursor
+from src.utils.responses import ModelJSONResponse
 import structlog
 
 router = APIRouter()
 logger = structlog.get_logger(__name__)
 
-# Dependency that provides an instance of StudentService
-def get_student_service(session: Session = Depends(get_session)) -> StudentService:
-    """Provides a StudentService instance with an injected database session."""
-    return StudentService(session)
+# One coalescing loader per event loop (each uvicorn worker runs one loop)
+student_loaders: "WeakKeyDictionary[asyncio.AbstractEventLoop, DataLoader[UUID, StudentRead]]" = WeakKeyDictionary()
 
-@router.post("/student/", response_model=StudentRead, status_code=status.HTTP_201_CREATED, summary="Create a new student")
-def create_student(
-    student_create: StudentCreate,
-    student_service: StudentService = Depends(get_student_service)
-):
+async def load_students(student_ids: List[UUID]) -> Dict[UUID, StudentRead]:
+    # Batches are shared by several requests, so they run on a session of their own
+    async with open_request_session() as session:
+        students = await AsyncStudentService(session).get_students_by_ids(student_ids)
+    return {student.id: student for student in students}
+
+def get_student_loader() -> Optional[DataLoader[UUID, StudentRead]]:
+    if not settings.STUDENT_LOOKUP_COALESCING:
+        return None
+    loop = asyncio.get_running_loop()
+    loader = student_loaders.get(loop)
+    if loader is None:
+        loader = student_loaders[loop] = DataLoader(load_students, max_batch_size=settings.STUDENT_BATCH_MAX_IDS)
+    return loader
+
+# Dependency that collects the list/export filter parameters
+def get_student_filter(
+    name: Optional[str] = Query(None, min_length=1, max_length=50, description="Case-insensitive name search"),
+    name_match: Literal["prefix", "contains"] = Query("prefix", description="How `name` is matched"),
+    id_semester: Optional[str] = Query(None),
+    department: Optional[List[str]] = Query(None, description="department `key:value` pairs that must all match (repeatable)")
+) -> StudentFilter:
+    department_filters = {}
+    for item in department or []:
+        key, separator, value = item.partition(":")
+        if not separator or not key:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Invalid department filter '{item}', expected key:value"
+            )
+        department_filters[key] = value
+    return StudentFilter(name=name, name_match=name_match, id_semester=id_semester, department=department_filters)
+
+# Dependency that parses a sparse fieldset (?fields=id,name) into StudentRead field names, in STUDENT_READ_FIELDS order
+def get_student_fields(
+    fields: Optional[str] = Query(
+        None, description=f"Comma-separated fields to return, any of {', '.join(STUDENT_READ_FIELDS)} (default: all)"
+    )
+) -> StudentFields:
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(STUDENT_READ_FIELDS)
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid fields '{fields}', expected a comma-separated subset of {', '.join(STUDENT_READ_FIELDS)}"
+        )
+    return tuple(field for field in STUDENT_READ_FIELDS if field in requested)
+
+# Dependency that provides an instance of AsyncStudentService
+async def get_student_service(session: Union[Session, AsyncSession] = Depends(get_request_session)) -> AsyncStudentService:
+    """Provides an AsyncStudentService instance with an injected database session."""
+    return AsyncStudentService(
+        session,
+        cache=get_student_cache(),
+        loader=get_student_loader(),
+        counts=get_student_count_cache(),
+        changes=get_change_notifier()
+    )
+
+async def create_response(student_service: AsyncStudentService, student_create: StudentCreate) -> ModelJSONResponse:
     try:
-        new_student = student_service.create_student(student_create)
-        return new_student
+        new_student = await student_service.create_student(student_create)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -34,63 +114,456 @@ def create_student(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error creating student: {e}"
         )
+    return ModelJSONResponse(new_student, status_code=status.HTTP_201_CREATED)
+
+@router.post("/student/", response_model=StudentRead, status_code=status.HTTP_201_CREATED, summary="Create a new student")
+async def create_student(
+    student_create: StudentCreate,
+    student_service: AsyncStudentService = Depends(get_student_service),
+    idempotency_key: Optional[str] = Header(
+        None, min_length=1, max_length=255, description="Client-chosen key that makes retries of this request safe"
+    )
+):
+    """
+    Create a student.
+
+    With an Idempotency-Key header the request runs at most once per key: retries with the same key
+    and body get the first response back (with `Idempotent-Replayed: true`) without touching the
+    database, and a retry sent while the first attempt is still running waits for its result.
+    Reusing a key with a different body is rejected with 422.
+    """
+    store = get_idempotency_store()
+    if idempotency_key is None or store is None:
+        return await create_response(student_service, student_create)
+    try:
+        return await store.run(
+            f"POST /student/:{idempotency_key}",
+            request_fingerprint(student_create.model_dump_json()),
+            lambda: create_response(student_service, student_create)
+        )
+    except IdempotencyKeyReused as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except IdempotencyRequestInProgress as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
+
+@router.post("/student/bulk", response_model=StudentBulkResponse, summary="Create or upsert students in bulk")
+async def bulk_create_students(
+    students_create: List[StudentCreate] = Body(...),
+    upsert: bool = Query(False, description="Update rows whose student_id already exists instead of reporting a conflict"),
+    student_service: AsyncStudentService = Depends(get_student_service)
+):
+    """
+    Create many students in a single transaction using batched multi-row INSERTs.
+    Each row is reported as created, updated (upsert only) or conflict.
+    """
+    if len(students_create) > settings.STUDENT_BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.STUDENT_BULK_MAX_ROWS} students per bulk request"
+        )
+    logger.info("API call: bulk_create_students", rows=len(students_create), upsert=upsert)
+    try:
+        result = await student_service.bulk_create_students(students_create, upsert=upsert)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f'Bulk write failed: {e}',
+        )
+    return ModelJSONResponse(result)
+
+async def import_batch(students_create: List[StudentCreate], upsert: bool) -> StudentBulkResponse:
+    # Import jobs outlive the upload request, so every batch runs on a session (and transaction) of its own
+    async with open_request_session() as session:
+        student_service = AsyncStudentService(
+            session, cache=get_student_cache(), counts=get_student_count_cache(), changes=get_change_notifier()
+        )
+        return await student_service.bulk_create_students(students_create, upsert=upsert)
+
+@router.post(
+    "/student/imports",
+    response_model=StudentImportJob,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Import students from a CSV or Excel file"
+)
+async def import_students(
+    file: UploadFile = File(..., description="CSV or .xlsx file with name, student_id, id_semester, email and optional department (JSON) columns"),
+    upsert: bool = Query(False, description="Update rows whose student_id already exists instead of reporting a conflict")
+):
+    """
+    Upload a file of students to import in the background. The response is the import job:
+    poll GET /student/imports/{job_id} for its progress, rows/sec and the rows that were rejected.
+    """
+    try:
+        job = await get_student_importer().accept(file, upsert, import_batch)
+    except UnsupportedImportFormat as e:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    except ImportFileTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    logger.info("API call: import_students", job_id=job.id, filename=file.filename, upsert=upsert)
+    return ModelJSONResponse(
+        job,
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": f"{settings.API_V1_STR}/student/imports/{job.id}"}
+    )
+
+@router.get("/student/imports/{job_id}", response_model=StudentImportJob, summary="Get the progress of a student import")
+async def get_student_import(job_id: UUID):
+    job = get_student_importer().store.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Import job {job_id} not found"
+        )
+    return ModelJSONResponse(job)
+
+@router.get("/student/", response_model=PaginatedResponse[StudentRead], summary="Get a list of students")
+async def read_students(
+    student_service: AsyncStudentService = Depends(get_student_service),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    order_by: Literal["created_at", "name"] = "created_at",
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous page; implies cursor pagination"),
+    filters: StudentFilter = Depends(get_student_filter),
+    fields: StudentFields = Depends(get_student_fields),
+    count: Optional[Literal["exact", "cached", "estimate"]] = Query(
+        None, description="How to compute `total` (default STUDENT_COUNT_MODE); the response's `total_mode` says which was used"
+    ),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    List students in a stable order.
+
+    Offset pagination (`offset`/`limit`) is fine for small pages. For walking the whole table use
+    cursor pagination: start with `pagination=cursor` and keep passing back `next_cursor` until it
+    is null. Each cursor page is an index seek, so deep pages are as cheap as the first one.
+
+    `name` (prefix or substring), `id_semester` and `department=key:value` narrow the list; `total`
+    and the pages then cover the matching students only. `fields=id,name` returns only those fields
+    of each student, read with a column-only query.
+
+    An exact `total` costs a COUNT(*) per page. `count=cached` reuses a recent count (dropped on every
+    create/delete), `count=estimate` takes it from the database's planner statistics; both are enough
+    for "about how many pages". `total_mode` reports how the total was obtained.
+
+    Pages carry an ETag covering their rows' ids and updated_at, the total and whether a next page
+    exists. A matching If-None-Match is answered with 304 after a column-only query.
+    """
+    after = None
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+            if position["order_by"] != order_by:
+                raise ValueError(f"cursor was issued for order_by={position['order_by']}")
+            after = sort_key(order_by, position["key"])
+            offset = int(position["offset"])
+            if offset < 0:
+                raise ValueError("negative offset")
+        except (ValueError, KeyError, TypeError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid cursor: {e}"
+            )
+    elif pagination == "cursor":
+        offset = 0
+
+    count_mode = count or settings.STUDENT_COUNT_MODE
+    total_count = None
+    if if_none_match is not None:
+        versions, has_more = await student_service.get_students_page_versions(
+            limit=limit, offset=offset, order_by=order_by, after=after, filters=filters
+        )
+        total_count, total_mode = await student_service.total_students(filters, count_mode)
+        etag = page_etag(total_count, has_more, versions)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    students, next_key = await student_service.get_students_page(
+        limit=limit, offset=offset, order_by=order_by, after=after, filters=filters, fields=fields
+    )
+    if total_count is None:
+        total_count, total_mode = await student_service.total_students(filters, count_mode)
+    next_cursor = None
+    if next_key is not None:
+        next_cursor = encode_cursor({"order_by": order_by, "key": next_key, "offset": offset + len(students)})
+    etag = page_etag(total_count, next_key is not None, [(student.id, student.updated_at) for student in students])
+    return ModelJSONResponse(
+        create_paginated_response(
+            students, total_count, offset, limit, student_read_type(fields), next_cursor=next_cursor, total_mode=total_mode
+        ),
+        headers={"ETag": etag}
+    )
+
+@router.get("/student/export", summary="Stream every student as NDJSON or CSV")
+async def export_students(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    order_by: Literal["created_at", "name"] = "created_at",
+    filters: StudentFilter = Depends(get_student_filter)
+):
+    """
+    Stream the whole student table (or the students matching the list filters) without materialising it.
+    Rows are read through a server-side cursor and sent in batches, so worker memory stays flat.
+    """
+    logger.info("API call: export_students", format=format, order_by=order_by, filters=LazyValue(lambda: filters.model_dump(exclude_defaults=True)))
+    columns = [column.key for column in EXPORT_COLUMNS]
+
+    async def render():
+        # The request-scoped session is closed before the body is streamed, so open a dedicated one
+        async with open_request_session() as session:
+            header = True
+            async for rows in AsyncStudentService(session).iter_students(order_by=order_by, filters=filters):
+                if format == "csv":
+                    yield rows_to_csv(rows, columns, header=header)
+                    header = False
+                else:
+                    yield rows_to_ndjson(rows)
+            if format == "csv" and header:
+                yield rows_to_csv([], columns, header=True)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        render(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="students.{format}"'}
+    )
+
+def change_event(change: StudentChange) -> str:
+    event = StudentChangeEvent(
+        seq=change.seq, operation=change.operation, id=change.student_uuid, student=change.data, at=as_utc(change.created_at)
+    )
+    return f"id: {change.seq}\nevent: {change.operation}\ndata: {event.model_dump_json()}\n\n"
+
+@router.get("/student/changes", summary="Stream student changes as server-sent events")
+async def stream_student_changes(
+    after: Optional[int] = Query(None, ge=0, description="Send the changes after this seq (default: only new changes)"),
+    last_event_id: Optional[str] = Header(None, description="Set by EventSource on reconnect; takes precedence over `after`")
+):
+    """
+    Server-sent events for every committed student create, update and delete, in commit order,
+    instead of polling the list. Each event's `id` is its seq: resume with `after` or Last-Event-ID.
+    A `reset` event means changes since the requested seq were already pruned and the client must
+    reload the list before applying further events. Comment lines are sent as keepalives.
+
+    The stream only holds a database connection while it reads new changes: it sleeps until a write
+    in this worker (or a NOTIFY, with STUDENT_CHANGES_LISTEN) wakes it, or the poll interval passes.
+    """
+    notifier = get_change_notifier()
+    if notifier is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The change feed is disabled")
+    if last_event_id is not None:
+        try:
+            after = int(last_event_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Invalid Last-Event-ID '{last_event_id}', expected a change seq"
+            )
+    logger.info("API call: stream_student_changes", after=after)
+
+    async def read(call):
+        async with open_request_session() as session:
+            return await call(AsyncStudentService(session))
+
+    async def render():
+        cursor = after
+        first, last = await read(lambda service: service.get_student_change_bounds())
+        if cursor is None:
+            cursor = last or 0
+        elif first is not None and cursor < first - 1:
+            # Rows after the cursor were pruned: the client missed changes it can no longer get
+            yield f"event: reset\ndata: {{\"oldest\": {first}}}\n\n"
+            cursor = first - 1
+        # Tells EventSource how soon to reconnect after the connection drops
+        yield f"retry: {int(settings.STUDENT_CHANGES_POLL_SECONDS * 1000)}\n\n"
+
+        loop = asyncio.get_running_loop()
+        idle_since = loop.time()
+        with notifier.subscribe() as subscription:
+            while True:
+                subscription.clear()
+                changes = await read(lambda service: service.get_student_changes(cursor, limit=settings.STUDENT_CHANGES_BATCH_SIZE))
+                if changes:
+                    yield "".join(change_event(change) for change in changes)
+                    cursor = changes[-1].seq
+                    idle_since = loop.time()
+                    if len(changes) == settings.STUDENT_CHANGES_BATCH_SIZE:
+                        continue
+                elif loop.time() - idle_since >= settings.STUDENT_CHANGES_HEARTBEAT_SECONDS:
+                    yield ": keepalive\n\n"
+                    idle_since = loop.time()
+                await subscription.wait(min(
+                    settings.STUDENT_CHANGES_POLL_SECONDS,
+                    max(settings.STUDENT_CHANGES_HEARTBEAT_SECONDS - (loop.time() - idle_since), 0.0)
+                ))
+
+    return StreamingResponse(
+        render(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def batch_response(student_service: AsyncStudentService, ids: List[UUID], fields: StudentFields = None) -> ModelJSONResponse:
+    ids = list(dict.fromkeys(ids))  # Drop repeats, keep the requested order
+    if len(ids) > settings.STUDENT_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.STUDENT_BATCH_MAX_IDS} ids per batch request"
+        )
+    logger.info("API call: get_students_batch", ids=len(ids))
+    found = {student.id: student for student in await student_service.get_students_by_ids(ids, fields=fields)}
+    data = [found[student_id] for student_id in ids if student_id in found]
+    missing = [student_id for student_id in ids if student_id not in found]
+    if fields is not None:
+        # Sparse rows do not validate as StudentRead; the body has the same shape with fewer keys per student
+        return ModelJSONResponse({"data": data, "missing": missing})
+    return ModelJSONResponse(StudentBatchResponse(data=data, missing=missing))
 
-@router.get("/student/", response_model=List[StudentRead], summary="Get a list of students")
-def read_students(
-    student_service: StudentService = Depends(get_student_service),
-    offset: int = 0,
-    limit: int = 100
+@router.get("/student/batch", response_model=StudentBatchResponse, summary="Get many students by ID")
+async def get_students_batch(
+    ids: List[str] = Query(..., description="Student ids, repeated (?ids=a&ids=b) or comma-separated"),
+    fields: StudentFields = Depends(get_student_fields),
+    student_service: AsyncStudentService = Depends(get_student_service)
 ):
-    students = student_service.get_all_students(offset=offset, limit=limit)
-    return students
+    """
+    Retrieve up to STUDENT_BATCH_MAX_IDS students in one database query.
+    Students are returned in the requested order; unknown ids are listed in `missing`.
+    """
+    try:
+        student_ids = [UUID(value) for item in ids for value in item.split(",") if value]
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid student id: {e}"
+        )
+    return await batch_response(student_service, student_ids, fields)
+
+@router.post("/student/batch", response_model=StudentBatchResponse, summary="Get many students by ID (large sets)")
+async def post_students_batch(
+    ids: List[UUID] = Body(..., embed=True),
+    fields: StudentFields = Depends(get_student_fields),
+    student_service: AsyncStudentService = Depends(get_student_service)
+):
+    """
+    Same as GET /student/batch with the ids in the request body (`{"ids": [...]}`), for id sets too large for a URL.
+    """
+    return await batch_response(student_service, ids, fields)
 
 @router.get("/student/{student_id}", response_model=StudentRead, summary="Get a single student by ID")
-def get_student(
+async def get_student(
     student_id: UUID, # FastAPI automatically converts path parameter to UUID
-    student_service: StudentService = Depends(get_student_service)
+    student_service: AsyncStudentService = Depends(get_student_service),
+    fields: StudentFields = Depends(get_student_fields),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None)
 ):
     """
     Retrieve a single student by their unique ID.
+
+    Responses carry an ETag and Last-Modified derived from the student's updated_at. Conditional
+    requests (If-None-Match / If-Modified-Since) are checked with a column-only query and answered
+    with 304 when the student is unchanged.
     """
     logger.info("API call: get_student", student_uuid=student_id)
-    student = student_service.get_student_by_id(student_id)
+    if if_none_match is not None or if_modified_since is not None:
+        updated_at = await student_service.get_student_version(student_id)
+        if updated_at is not None:
+            validators = student_validators(updated_at)
+            if is_not_modified(if_none_match, if_modified_since, validators["ETag"], updated_at):
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators)
+
+    student = await student_service.get_student_by_id(student_id, fields=fields)
     if not student:
         logger.warning("Student not found", student_uuid=student_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student not found"
         )
-    return student
+    # Cached and database records carry updated_at; the version query is only a fallback
+    updated_at = student.updated_at or await student_service.get_student_version(student_id)
+    headers = student_validators(updated_at) if updated_at is not None else None
+    return ModelJSONResponse(student, headers=headers)
 
-@router.put("/student/{student_id}", response_model=StudentRead, summary="Update an existing student")
-def update_student(
+async def update_response(
+    student_service: AsyncStudentService,
     student_id: UUID,
     student_update: StudentUpdate,
-    student_service: StudentService = Depends(get_student_service)
-):
-    """
-    Update an existing student's information.
-    """
-    logger.info("API call: update_student", student_uuid=student_id, update_data=student_update.model_dump(exclude_unset=True))
-    updated_student = student_service.update_student(student_id, student_update)
+    if_match: Optional[str]
+) -> ModelJSONResponse:
+    logger.info("API call: update_student", student_uuid=student_id, update_data=LazyValue(lambda: student_update.model_dump(exclude_unset=True)))
+    try:
+        updated_student = await student_service.update_student(
+            student_id, student_update, if_match=parse_if_match(if_match) if if_match is not None else None
+        )
+    except StudentVersionConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=str(e)
+        )
+    except StudentConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f'Duplicate student: {e}',
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error updating student: {e}"
+        )
     if not updated_student:
         logger.warning("Student not found for update", student_uuid=student_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Student not found"
         )
-    return updated_student
+    headers = student_validators(updated_student.updated_at) if updated_student.updated_at is not None else None
+    return ModelJSONResponse(updated_student, headers=headers)
+
+@router.put("/student/{student_id}", response_model=StudentRead, summary="Update an existing student")
+async def update_student(
+    student_id: UUID,
+    student_update: StudentUpdate,
+    student_service: AsyncStudentService = Depends(get_student_service),
+    if_match: Optional[str] = Header(None)
+):
+    """
+    Update an existing student's information.
+    An optional If-Match is honoured as for PATCH.
+    """
+    return await update_response(student_service, student_id, student_update, if_match)
+
+@router.patch("/student/{student_id}", response_model=StudentRead, summary="Partially update a student")
+async def patch_student(
+    student_id: UUID,
+    student_update: StudentUpdate,
+    student_service: AsyncStudentService = Depends(get_student_service),
+    if_match: Optional[str] = Header(None, description="ETag of the version being edited")
+):
+    """
+    Update only the fields present in the body, in one UPDATE ... RETURNING.
+
+    Send the ETag from a previous GET as If-Match to update only if nobody changed the student in
+    the meantime; a stale ETag is answered with 412 Precondition Failed and nothing is written.
+    The response carries the new ETag for the next edit.
+    """
+    return await update_response(student_service, student_id, student_update, if_match)
 
 @router.delete("/student/{student_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete a student")
-def delete_student(
+async def delete_student(
     student_id: UUID,
-    student_service: StudentService = Depends(get_student_service)
+    student_service: AsyncStudentService = Depends(get_student_service)
 ):
     """
     Delete a student by their unique ID.
     """
     logger.info("API call: delete_student", student_uuid=student_id)
-    if not student_service.delete_student(student_id):
+    if not await student_service.delete_student(student_id):
         logger.warning("Student not found for deletion", student_uuid=student_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,260 @@
+# app/core/cache.py
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Protocol, Tuple
+
+from pydantic import BaseModel
+
+
+class CacheBackend(Protocol):
+    """
+    Minimal key/value interface shared by the cache backends.
+    Values must be JSON-serializable (or pydantic models) for the shared backends.
+    """
+    def get(self, key: str) -> Optional[Any]: ...
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None: ...
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Sets `key` only if it holds no (unexpired) value; returns whether it was set."""
+        ...
+
+    def delete(self, *keys: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def stats(self) -> Dict[str, int]: ...
+
+
+class TTLLRUCache:
+    """
+    Thread-safe in-process cache with least-recently-used eviction and per-entry expiry.
+    Values are stored by reference, so callers must treat them as read-only.
+    """
+    def __init__(self, max_entries: int = 10000, ttl: Optional[float] = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                return False
+            self._data[key] = (now + ttl if ttl is not None else None, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def _dumps(value: Any) -> bytes:
+    if isinstance(value, BaseModel):
+        return value.model_dump_json().encode("utf-8")
+    return json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+
+
+class LocalSharedCache:
+    """
+    In-process stand-in for a shared cache (e.g. Redis) used in tests and local runs.
+    Like the real thing it stores serialized bytes, so every read returns a fresh copy
+    and code paths exercise the same (de)serialization as in production.
+    """
+    def __init__(self, ttl: Optional[float] = 60.0):
+        self.ttl = ttl
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(entry[1])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        payload = _dumps(value)
+        with self._lock:
+            self._data[key] = (expires_at, payload)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        payload = _dumps(value)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                return False
+            self._data[key] = (now + ttl if ttl is not None else None, payload)
+        return True
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class RedisCache:
+    """
+    Shared cache backed by Redis, so invalidations are seen by every worker.
+    Requires the optional `redis` package.
+    """
+    def __init__(self, url: str, ttl: Optional[float] = 60.0, prefix: str = "cache:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The redis cache backend requires the 'redis' package (pip install redis)") from e
+        # Short timeouts: a slow cache must degrade to a miss, not stall the request
+        self._client = redis.Redis.from_url(url, socket_timeout=0.05, socket_connect_timeout=0.2)
+        self._error = redis.RedisError
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            payload = self._client.get(self.prefix + key)
+        except self._error:
+            self.errors += 1
+            payload = None
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(payload)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            self._client.set(self.prefix + key, _dumps(value), px=int(ttl * 1000) if ttl is not None else None)
+        except self._error:
+            self.errors += 1
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            return bool(self._client.set(
+                self.prefix + key, _dumps(value), px=int(ttl * 1000) if ttl is not None else None, nx=True
+            ))
+        except self._error:
+            self.errors += 1
+            # Like a failed get() this degrades to "not cached": the caller goes ahead
+            return True
+
+    def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            self._client.delete(*(self.prefix + key for key in keys))
+        except self._error:
+            self.errors += 1
+
+    def clear(self) -> None:
+        try:
+            for key in self._client.scan_iter(match=self.prefix + "*"):
+                self._client.delete(key)
+        except self._error:
+            self.errors += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+def create_cache_backend(
+    backend: str,
+    max_entries: int = 10000,
+    ttl: Optional[float] = 60.0,
+    redis_url: Optional[str] = None,
+    prefix: str = "cache:"
+) -> Optional[CacheBackend]:
+    """
+    Builds a cache backend by name: "memory" (TTL + LRU, per worker), "redis" (shared),
+    "local-shared" (in-process stand-in for the shared backend) or "none".
+    """
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return TTLLRUCache(max_entries=max_entries, ttl=ttl)
+    if backend == "local-shared":
+        return LocalSharedCache(ttl=ttl)
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("REDIS_URL must be set to use the redis cache backend")
+        return RedisCache(redis_url, ttl=ttl, prefix=prefix)
+    raise ValueError(f"Unknown cache backend '{backend}'")
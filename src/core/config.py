@@ -1,4 +1,6 @@
 # app/core/config.py
+from typing import Dict, List, Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -12,5 +14,156 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
 
     DATABASE_URL: str
+    # Serve requests through the asyncio engine (AsyncSession) instead of the sync threadpool path
+    DATABASE_ASYNC: bool = False
+    # Optional explicit async URL, derived from DATABASE_URL when not set
+    # (postgresql -> postgresql+asyncpg, sqlite -> sqlite+aiosqlite)
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Connection pool, per engine and per worker process: each gunicorn worker can open up to
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW connections, so keep workers x that below max_connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Seconds a checkout waits for a free connection before failing with a pool timeout
+    DB_POOL_TIMEOUT: float = 30.0
+    # Replace connections older than this many seconds (-1 keeps them forever)
+    DB_POOL_RECYCLE: int = 1800
+    # Liveness check on checkout: "pre_ping" (default) pings every checkout (one extra round trip each),
+    # "idle" pings only connections unused for DB_POOL_PING_IDLE_SECONDS, "none" never pings
+    DB_POOL_PING: Literal["pre_ping", "idle", "none"] = "pre_ping"
+    DB_POOL_PING_IDLE_SECONDS: float = 30.0
+    # Log a warning when obtaining a pooled connection takes longer than this
+    DB_POOL_SLOW_CHECKOUT_SECONDS: float = 0.1
+    # Server-side per-statement timeout in milliseconds (PostgreSQL statement_timeout), 0 disables
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+
+    # Read replicas (JSON list of URLs) serving read-only StudentService queries round-robin.
+    # Async replica URLs are derived like ASYNC_DATABASE_URL is from DATABASE_URL.
+    DATABASE_REPLICA_URLS: List[str] = []
+    # Seconds a failing replica is skipped before it is tried again
+    DATABASE_REPLICA_RETRY_SECONDS: float = 30.0
+    # After this worker commits a write, its reads stay on the primary for this long (replication lag)
+    DATABASE_REPLICA_STICKY_SECONDS: float = 1.0
+
+    # POST /student/bulk: maximum rows per request and rows per multi-row INSERT statement
+    STUDENT_BULK_MAX_ROWS: int = 10000
+    STUDENT_BULK_BATCH_SIZE: int = 500
+    # GET/POST /student/batch: maximum ids per request (also the size of one coalesced IN query)
+    STUDENT_BATCH_MAX_IDS: int = 500
+    # Coalesce concurrent GET /student/{id} lookups in a worker into one IN query per event loop tick
+    STUDENT_LOOKUP_COALESCING: bool = True
+    # GET /student/export: rows fetched per server-side cursor batch (and per streamed chunk)
+    STUDENT_EXPORT_BATCH_SIZE: int = 1000
+
+    # File imports (POST /student/imports): uploads of at most STUDENT_IMPORT_MAX_BYTES are spooled to
+    # STUDENT_IMPORT_DIR (default: the system temp dir), parsed and validated by STUDENT_IMPORT_WORKERS
+    # threads and written STUDENT_IMPORT_BATCH_SIZE rows per transaction. At most STUDENT_IMPORT_MAX_JOBS
+    # run at once per worker; job progress is kept for STUDENT_IMPORT_TTL_SECONDS ("redis" shares it
+    # between workers). Request bodies are refused from STUDENT_IMPORT_MAX_BYTES plus 64 KiB of multipart
+    # framing on, before they are spooled, so the limit is soft; the spooled file is held to it exactly
+    STUDENT_IMPORT_DIR: Optional[str] = None
+    STUDENT_IMPORT_MAX_BYTES: int = 100 * 1024 * 1024
+    STUDENT_IMPORT_BATCH_SIZE: int = 1000
+    STUDENT_IMPORT_WORKERS: int = 2
+    STUDENT_IMPORT_MAX_JOBS: int = 2
+    STUDENT_IMPORT_MAX_ERRORS: int = 1000
+    STUDENT_IMPORT_BACKEND: Literal["memory", "redis", "local-shared"] = "memory"
+    STUDENT_IMPORT_TTL_SECONDS: float = 86400.0
+
+    # Change feed (GET /student/changes): every student write also appends a student_change row in the
+    # same transaction. Streams wake up on writes in this worker (and on PostgreSQL NOTIFY from other
+    # workers when STUDENT_CHANGES_LISTEN is set) and otherwise poll every STUDENT_CHANGES_POLL_SECONDS
+    STUDENT_CHANGES_ENABLED: bool = True
+    STUDENT_CHANGES_LISTEN: bool = False
+    STUDENT_CHANGES_POLL_SECONDS: float = 2.0
+    STUDENT_CHANGES_HEARTBEAT_SECONDS: float = 15.0
+    STUDENT_CHANGES_BATCH_SIZE: int = 500
+    # Changes older than this are pruned; a client resuming from before that is told to resync
+    STUDENT_CHANGES_RETENTION_HOURS: float = 168.0
+
+    # Read-through cache for student lookups: "memory" is a per-worker TTL+LRU cache,
+    # "redis" is shared by all workers, "local-shared" is an in-process stand-in for it (tests)
+    STUDENT_CACHE_BACKEND: Literal["memory", "redis", "local-shared", "none"] = "memory"
+    STUDENT_CACHE_TTL_SECONDS: float = 60.0
+    STUDENT_CACHE_MAX_ENTRIES: int = 10000
+    # GET /student/ totals: "exact" runs COUNT(*) per page, "cached" reuses a COUNT(*) per filter set
+    # until the TTL or a student write, "estimate" reads planner statistics (and counts exactly when
+    # they say fewer than STUDENT_COUNT_EXACT_BELOW rows). Callers can override it with ?count=
+    STUDENT_COUNT_MODE: Literal["exact", "cached", "estimate"] = "exact"
+    STUDENT_COUNT_CACHE_BACKEND: Literal["memory", "redis", "local-shared", "none"] = "memory"
+    STUDENT_COUNT_CACHE_TTL_SECONDS: float = 30.0
+    STUDENT_COUNT_EXACT_BELOW: int = 10000
+    REDIS_URL: Optional[str] = None
+
+    # Admission control, opt-in with ADMISSION_CONTROL_ENABLED: at most ADMISSION_MAX_CONCURRENT requests
+    # run at once per worker (0 means the primary pool's capacity, DB_POOL_SIZE + DB_MAX_OVERFLOW, beyond
+    # which they would only wait for a connection). Others queue; one that gets no slot within
+    # ADMISSION_MAX_WAIT_SECONDS, or finds ADMISSION_MAX_QUEUE requests already waiting, is shed with 503
+    # and Retry-After
+    ADMISSION_CONTROL_ENABLED: bool = False
+    ADMISSION_MAX_CONCURRENT: int = 0
+    ADMISSION_MAX_QUEUE: int = 100
+    ADMISSION_MAX_WAIT_SECONDS: float = 1.0
+    # Per-client token bucket, per worker: RATE_LIMIT_PER_SECOND requests/s with bursts of RATE_LIMIT_BURST,
+    # keyed by the bearer token's user or else the client address (0 disables it); excess gets 429
+    RATE_LIMIT_PER_SECOND: float = 0.0
+    RATE_LIMIT_BURST: int = 20
+    RATE_LIMIT_MAX_CLIENTS: int = 100000
+
+    # Idempotency-Key on POST /student/: the first response is kept for IDEMPOTENCY_TTL_SECONDS and
+    # replayed to retries; a retry arriving while the first attempt still runs waits for it up to
+    # IDEMPOTENCY_WAIT_SECONDS. "redis" shares keys between workers; "none" ignores the header
+    IDEMPOTENCY_BACKEND: Literal["memory", "redis", "local-shared", "none"] = "memory"
+    IDEMPOTENCY_TTL_SECONDS: float = 86400.0
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+    IDEMPOTENCY_MAX_ENTRIES: int = 100000
+
+    # JWT verification: keys come from a JWKS (https:// or file:// URL, or a file path)
+    JWT_JWKS_URL: Optional[str] = None
+    JWT_ALGORITHMS: List[str] = ["RS256"]
+    JWT_AUDIENCE: Optional[str] = None
+    JWT_ISSUER: Optional[str] = None
+    JWT_LEEWAY_SECONDS: int = 0
+    JWKS_REFRESH_SECONDS: float = 300.0
+    # Verified tokens are cached (keyed by token hash) until their exp, capped at this TTL
+    JWT_TOKEN_CACHE_TTL_SECONDS: float = 300.0
+    JWT_TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    # Rejected tokens are cached as well, briefly, so replaying an invalid token skips the signature check
+    JWT_REJECTED_TOKEN_CACHE_TTL_SECONDS: float = 30.0
+    # Development only: skip signature and claim verification entirely
+    JWT_VERIFY: bool = True
+
+    # Logging: records are rendered and written by a background thread behind a queue of this many
+    # records (0 writes synchronously); when the queue is full new records are dropped and counted
+    LOG_QUEUE_SIZE: int = 10000
+    # Fraction of selected high-volume debug/info events to keep, by event name (JSON object),
+    # e.g. {"API call: get_student": 0.01}
+    LOG_SAMPLE_RATES: Dict[str, float] = {}
+
+    # Response compression: gzip/deflate (and br when the brotli package is installed) for
+    # JSON/CSV/text bodies of at least COMPRESSION_MIN_SIZE bytes
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    # gzip/deflate, 1 (fastest) to 9 (smallest). 4 gets within ~4% of 6's size on list pages
+    # for two thirds of the CPU (python -m benchmarks.bench_compression)
+    COMPRESSION_LEVEL: int = 4
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0 (fastest) to 11 (smallest)
+
+    # On-demand profiling: a request with the PROFILING_HEADER header set to PROFILING_TOKEN, or a
+    # PROFILING_SAMPLE_RATE fraction of all requests (kept only when slower than PROFILING_MIN_DURATION_SECONDS),
+    # runs under a profiler, one request at a time per worker. "collapsed" samples every busy thread each
+    # PROFILING_INTERVAL_SECONDS into collapsed stacks for flame graphs; "pstats" is cProfile of the event
+    # loop. Profiles go to PROFILING_DIR. With neither a token nor a sample rate the middleware is not installed
+    PROFILING_TOKEN: Optional[str] = None
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_MIN_DURATION_SECONDS: float = 0.0
+    PROFILING_FORMAT: Literal["collapsed", "pstats"] = "collapsed"
+    PROFILING_INTERVAL_SECONDS: float = 0.005
+    PROFILING_DIR: str = "profiles"
+
+    # Prometheus metrics (request latency, SQL timing, pool waits) served at METRICS_PATH
+    METRICS_ENABLED: bool = True
+    METRICS_PATH: str = "/metrics"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
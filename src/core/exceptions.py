@@ -0,0 +1,28 @@
+# app/core/exceptions.py
+
+class StudentVersionConflict(Exception):
+    """Raised by a conditional (If-Match) write when the student changed since the version the caller sent."""
+
+
+class StudentConflict(Exception):
+    """Raised when a write would give a student the student_id or email of another student."""
+
+
+class IdempotencyKeyReused(Exception):
+    """Raised when an Idempotency-Key is sent again with a different request body."""
+
+
+class IdempotencyRequestInProgress(Exception):
+    """Raised when the request holding an Idempotency-Key did not finish within the wait limit."""
+
+
+class ImportFileTooLarge(Exception):
+    """Raised when an uploaded import file exceeds STUDENT_IMPORT_MAX_BYTES."""
+
+
+class UnsupportedImportFormat(Exception):
+    """Raised when an import file is neither CSV nor Excel, or Excel support (openpyxl) is not installed."""
+
+
+class JWKSUnavailable(Exception):
+    """Raised when the JSON Web Key Set cannot be fetched, so tokens cannot be verified right now."""
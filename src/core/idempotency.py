@@ -0,0 +1,145 @@
+# app/core/idempotency.py
+
+import asyncio
+import base64
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.responses import Response
+
+from src.core.cache import CacheBackend, create_cache_backend
+from src.core.config import settings
+from src.core.exceptions import IdempotencyKeyReused, IdempotencyRequestInProgress
+from src.core.metrics import idempotency_requests_total
+
+# A claimed key whose request never finishes (the worker died) is released after this long
+PENDING_TTL_SECONDS = 60.0
+# How often a waiter in another worker re-reads a key that is still in flight
+POLL_SECONDS = 0.05
+
+
+def request_fingerprint(*parts: Any) -> str:
+    """Hash identifying a request's content, compared when a key is reused."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """
+    Runs a request at most once per Idempotency-Key and replays its response to retries.
+
+    The first request claims the key with an atomic add() of a pending record, runs, and replaces
+    the record with its response (status, headers, body) for `ttl` seconds. Retries get that response
+    back without running anything. A retry that arrives while the first request is still running
+    waits for it: on the in-process future in the same worker, by polling the backend in another.
+    Responses with status 5xx, and requests that raise, release the key so a retry runs again.
+    HTTPExceptions are stored like any other response, as the JSON error FastAPI would have sent.
+    """
+    def __init__(self, backend: CacheBackend, ttl: float = 86400.0, wait_seconds: float = 10.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.wait_seconds = wait_seconds
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, fingerprint: str, call: Callable[[], Awaitable[Response]]) -> Response:
+        key = f"idempotency:{key}"
+        deadline = time.monotonic() + self.wait_seconds
+        waited = False
+        while True:
+            record = self.backend.get(key)
+            if record is None:
+                if self.backend.add(key, {"fingerprint": fingerprint}, ttl=PENDING_TTL_SECONDS):
+                    return await self._execute(key, fingerprint, call)
+                # Another request claimed it first; read its record, unless the wait is already over
+                if time.monotonic() < deadline:
+                    continue
+                idempotency_requests_total.inc(outcome="in_progress")
+                raise IdempotencyRequestInProgress("A request with this Idempotency-Key is still being processed")
+            if record["fingerprint"] != fingerprint:
+                idempotency_requests_total.inc(outcome="reused")
+                raise IdempotencyKeyReused("Idempotency-Key was already used for a different request")
+            if "status" in record:
+                idempotency_requests_total.inc(outcome="waited" if waited else "replayed")
+                return self._replay(record)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                idempotency_requests_total.inc(outcome="in_progress")
+                raise IdempotencyRequestInProgress("A request with this Idempotency-Key is still being processed")
+            waited = True
+            future = self._inflight.get(key)
+            if future is not None and future.get_loop() is asyncio.get_running_loop():
+                try:
+                    await asyncio.wait_for(asyncio.shield(future), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(min(POLL_SECONDS, remaining))
+
+    async def _execute(self, key: str, fingerprint: str, call: Callable[[], Awaitable[Response]]) -> Response:
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            try:
+                response = await call()
+            except HTTPException as e:
+                response = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+            except BaseException:
+                self.backend.delete(key)
+                raise
+            if response.status_code >= 500:
+                self.backend.delete(key)
+            else:
+                self.backend.set(key, self._record(fingerprint, response), ttl=self.ttl)
+            idempotency_requests_total.inc(outcome="executed")
+            return response
+        finally:
+            # Waiters re-read the backend, so the record is written before they are woken. Once the key
+            # is released a retry may already have claimed it again; its future is left in place
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            future.set_result(None)
+
+    @staticmethod
+    def _record(fingerprint: str, response: Response) -> Dict[str, Any]:
+        return {
+            "fingerprint": fingerprint,
+            "status": response.status_code,
+            "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in response.raw_headers],
+            "body": base64.b64encode(response.body).decode("ascii"),
+        }
+
+    @staticmethod
+    def _replay(record: Dict[str, Any]) -> Response:
+        response = Response(content=base64.b64decode(record["body"]), status_code=record["status"])
+        response.raw_headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]]
+        response.raw_headers.append((b"idempotent-replayed", b"true"))
+        return response
+
+
+idempotency_store: Optional[IdempotencyStore] = None
+_idempotency_store_initialized = False
+
+
+def get_idempotency_store() -> Optional[IdempotencyStore]:
+    """Returns the process-wide IdempotencyStore, or None when IDEMPOTENCY_BACKEND is "none"."""
+    global idempotency_store, _idempotency_store_initialized
+    if not _idempotency_store_initialized:
+        backend = create_cache_backend(
+            settings.IDEMPOTENCY_BACKEND,
+            max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+            ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+            redis_url=settings.REDIS_URL,
+        )
+        if backend is not None:
+            idempotency_store = IdempotencyStore(
+                backend, ttl=settings.IDEMPOTENCY_TTL_SECONDS, wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS
+            )
+        _idempotency_store_initialized = True
+    return idempotency_store
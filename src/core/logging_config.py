@@ -1,11 +1,85 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import random
+from typing import Any, Callable, Dict, Optional
 
 import structlog
 import sys
 from src.core.config import settings
+from src.core.metrics import log_events_sampled_out_total, log_records_dropped_total
+
+# Background thread that renders and writes queued records (None when logging synchronously)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class LazyValue:
+    """
+    Log field computed only if the event is actually emitted, e.g.
+    logger.info("...", update_data=LazyValue(lambda: model.model_dump(exclude_unset=True))).
+    """
+    __slots__ = ("factory",)
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+
+
+def resolve_lazy_values(logger, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    for key, value in event_dict.items():
+        if isinstance(value, LazyValue):
+            event_dict[key] = value.factory()
+    return event_dict
+
+
+class EventSampler:
+    """
+    structlog processor keeping only a fraction of selected debug/info events, keyed by event name
+    (e.g. {"API call: get_student": 0.01}). Warnings and errors are never sampled.
+    """
+    def __init__(self, rates: Dict[str, float]):
+        self.rates = rates
+
+    def __call__(self, logger, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        rate = self.rates.get(event_dict.get("event"))
+        if rate is not None and method_name in ("debug", "info") and random.random() >= rate:
+            log_events_sampled_out_total.inc(event=event_dict["event"])
+            raise structlog.DropEvent
+        return event_dict
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the calling thread: when the queue is full the record is dropped
+    and counted. Records are queued unformatted; rendering happens on the QueueListener thread.
+    """
+    def __init__(self, maxsize: int):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The default prepare() formats the record here, on the request thread; the listener does it instead
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            log_records_dropped_total.inc()
+
+
+def stop_logging() -> None:
+    """Flushes queued records and stops the background log thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 def configure_logging():
+    global _listener
     timestamper = structlog.processors.TimeStamper(fmt="iso", utc=True)
 
     pre_chain = [
@@ -20,9 +94,13 @@ def configure_logging():
     else:
         renderer = structlog.processors.JSONRenderer()
 
-    # Configure structlog
+    # Configure structlog. Disabled levels and sampled-out events are dropped first,
+    # before any field (including LazyValue fields) is computed.
     structlog.configure(
         processors=[
+            structlog.stdlib.filter_by_level,
+            EventSampler(settings.LOG_SAMPLE_RATES),
+            resolve_lazy_values,
             *pre_chain,
             structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
@@ -39,13 +117,26 @@ def configure_logging():
     handler = logging.StreamHandler(sys.stdout)
     handler.setFormatter(formatter)
 
+    # Rendering and stdout writes run on a background thread behind a bounded queue,
+    # so a slow log consumer drops records instead of stalling requests
+    stop_logging()
+    if settings.LOG_QUEUE_SIZE > 0:
+        root_handler = BoundedQueueHandler(settings.LOG_QUEUE_SIZE)
+        _listener = logging.handlers.QueueListener(root_handler.queue, handler)
+        _listener.start()
+    else:
+        root_handler = handler
+
     # Reset root logger
     root_logger = logging.getLogger()
     root_logger.handlers.clear()
-    root_logger.addHandler(handler)
+    root_logger.addHandler(root_handler)
     root_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
 
     # Prevent Uvicorn log duplication
     for logger_name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
         logging.getLogger(logger_name).handlers.clear()
         logging.getLogger(logger_name).propagate = True
+
+
+atexit.register(stop_logging)
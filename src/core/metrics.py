@@ -0,0 +1,278 @@
+# app/core/metrics.py
+
+import bisect
+import threading
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond cache hits up to slow requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+# Per-request accumulator: [SQL seconds, statements, pool checkout wait seconds]. The middleware sets a fresh
+# list per request; the SQLAlchemy hooks add to it. Context copies made for the threadpool and for
+# AsyncSession.run_sync share the same list object, so their updates are visible to the middleware.
+request_db_time: ContextVar[Optional[List[float]]] = ContextVar("request_db_time", default=None)
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._label_values(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._label_values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._label_values(labels))
+        return sum(entry[0]) if entry else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+        return lines
+
+
+# A collector returns (name, type, documentation, [(labels, value), ...]) tuples computed at scrape time
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+
+class MetricsRegistry:
+    """
+    Holds the process metrics and renders them in the Prometheus text exposition format.
+
+    Recording is a dict update under a lock; nothing is formatted until a scrape calls render(),
+    and collectors (e.g. pool or cache statistics) are only evaluated at scrape time.
+    Each gunicorn worker has its own registry, so scrapes see one worker at a time.
+    """
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Collector) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            for name, type_name, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {type_name}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels), tuple(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# HTTP
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests handled, by route template and status.", ("method", "route", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body.", ("method", "route")
+)
+http_request_db_seconds = registry.histogram(
+    "http_request_db_seconds", "Time a request spent executing SQL statements.", ("method", "route")
+)
+http_request_pool_wait_seconds = registry.histogram(
+    "http_request_pool_wait_seconds", "Time a request spent waiting for pooled database connections.", ("method", "route")
+)
+http_request_db_statements = registry.histogram(
+    "http_request_db_statements", "SQL statements executed per request.", ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100)
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled."
+)
+
+# Admission control and rate limiting
+http_requests_rejected_total = registry.counter(
+    "http_requests_rejected_total",
+    "Requests turned away before reaching the app: queue_full, wait_timeout (503), rate_limited (429) or body_too_large (413).",
+    ("reason",)
+)
+http_admission_wait_seconds = registry.histogram(
+    "http_admission_wait_seconds", "Time admitted requests waited for a concurrency slot."
+)
+http_requests_queued = registry.gauge(
+    "http_requests_queued", "Requests waiting for a concurrency slot."
+)
+
+# Response compression; output/input gives the ratio, seconds the CPU spent on it
+http_compression_input_bytes_total = registry.counter(
+    "http_compression_input_bytes_total", "Response body bytes fed to the compressor.", ("encoding",)
+)
+http_compression_output_bytes_total = registry.counter(
+    "http_compression_output_bytes_total", "Compressed response body bytes sent.", ("encoding",)
+)
+http_compression_seconds_total = registry.counter(
+    "http_compression_seconds_total", "Time spent compressing response bodies.", ("encoding",)
+)
+
+# Idempotency keys
+idempotency_requests_total = registry.counter(
+    "idempotency_requests_total",
+    "Requests carrying an Idempotency-Key, by outcome (executed, replayed, waited, in_progress, reused).",
+    ("outcome",)
+)
+
+# Student imports
+student_import_rows_total = registry.counter(
+    "student_import_rows_total", "Rows of imported files, by outcome (created, updated, invalid, conflict).", ("outcome",)
+)
+
+# Database
+db_statement_duration_seconds = registry.histogram(
+    "db_statement_duration_seconds", "SQL statement execution time (cursor execute).", ("engine", "operation")
+)
+db_statement_rows = registry.histogram(
+    "db_statement_rows", "Rows affected or returned per statement, where the driver reports it.", ("engine", "operation"),
+    buckets=(0, 1, 10, 100, 1000, 10000, 100000)
+)
+db_pool_checkout_wait_seconds = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a connection from the pool.", ("engine",)
+)
+db_pool_checkout_timeouts_total = registry.counter(
+    "db_pool_checkout_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT because the pool was exhausted.", ("engine",)
+)
+
+# Logging
+log_records_dropped_total = registry.counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full."
+)
+log_events_sampled_out_total = registry.counter(
+    "log_events_sampled_out_total", "Log events discarded by LOG_SAMPLE_RATES sampling.", ("event",)
+)
@@ -0,0 +1,582 @@
+# app/core/middleware.py
+
+import asyncio
+import hmac
+import math
+import os
+import random
+import time
+import zlib
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+import structlog
+from fastapi import HTTPException
+from jose.exceptions import JOSEError
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.exceptions import JWKSUnavailable
+from src.core.metrics import (
+    http_admission_wait_seconds,
+    http_compression_input_bytes_total,
+    http_compression_output_bytes_total,
+    http_compression_seconds_total,
+    http_request_db_seconds,
+    http_request_db_statements,
+    http_request_duration_seconds,
+    http_request_pool_wait_seconds,
+    http_requests_in_flight,
+    http_requests_queued,
+    http_requests_rejected_total,
+    http_requests_total,
+    request_db_time,
+)
+from src.core.profiling import CallProfiler, StackSampler, profile_filename
+from src.utils.etag import encoded_etag
+from src.utils.jwt import authenticate_token, get_cached_token, user_for_token
+
+logger = structlog.get_logger(__name__)
+
+
+class MetricsMiddleware:
+    """
+    Records request count, latency, in-flight requests and per-request SQL / pool wait time.
+
+    Requests are labelled with the matched route template (e.g. /api/v1/student/{student_id}),
+    not the raw path, so label cardinality stays bounded; unmatched paths share one label.
+    The duration covers the whole response body, including streamed ones.
+    """
+    def __init__(self, app: ASGIApp, exclude_paths: tuple = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        accumulator = [0.0, 0, 0.0]
+        token = request_db_time.set(accumulator)
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            request_db_time.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            http_requests_total.inc(method=method, route=route_path, status=str(status_code))
+            http_request_duration_seconds.observe(elapsed, method=method, route=route_path)
+            http_request_db_seconds.observe(accumulator[0], method=method, route=route_path)
+            http_request_db_statements.observe(accumulator[1], method=method, route=route_path)
+            http_request_pool_wait_seconds.observe(accumulator[2], method=method, route=route_path)
+
+
+try:
+    import brotli
+except ImportError:  # br is only offered when the optional brotli package is installed
+    brotli = None
+
+# Media types worth compressing. Everything else (images, archives, PDFs) is usually compressed already.
+COMPRESSIBLE_PREFIXES = ("text/", "application/json", "application/x-ndjson", "application/javascript", "application/xml")
+COMPRESSIBLE_SUFFIXES = ("+json", "+xml")
+# Event streams must reach the client event by event, never held back for the size threshold
+INCOMPRESSIBLE_TYPES = ("text/event-stream",)
+# Chunks at least this large are compressed on the threadpool (zlib and brotli release the GIL)
+# rather than holding up the event loop for milliseconds
+THREADPOOL_COMPRESS_BYTES = 65536
+
+
+def negotiate_encoding(accept_encoding: str, available: Sequence[str]) -> Optional[str]:
+    """
+    Picks the content coding for an Accept-Encoding header: the highest q-value among `available`,
+    ties going to the earlier (preferred) one. Returns None when the client accepts none of them.
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _Encoder:
+    """Incremental compressor for one response body."""
+    def __init__(self, encoding: str, level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits 31 writes the gzip container, 15 the zlib one that HTTP calls "deflate"
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31 if encoding == "gzip" else 15)
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.seconds = 0.0
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compresses `data` and flushes, so everything passed in so far can be decoded by the client."""
+        started = time.perf_counter()
+        if self.encoding == "br":
+            output = self._brotli.process(data) + (self._brotli.finish() if final else self._brotli.flush())
+        else:
+            output = self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        self.seconds += time.perf_counter() - started
+        self.input_bytes += len(data)
+        self.output_bytes += len(output)
+        return output
+
+    async def compress_async(self, data: bytes, final: bool) -> bytes:
+        if len(data) >= THREADPOOL_COMPRESS_BYTES:
+            return await run_in_threadpool(self.compress, data, final)
+        return self.compress(data, final)
+
+    def record(self) -> None:
+        http_compression_input_bytes_total.inc(self.input_bytes, encoding=self.encoding)
+        http_compression_output_bytes_total.inc(self.output_bytes, encoding=self.encoding)
+        http_compression_seconds_total.inc(self.seconds, encoding=self.encoding)
+
+
+class CompressionMiddleware:
+    """
+    Compresses response bodies with the best coding the client accepts (br, gzip, deflate).
+
+    Only compressible media types of at least `minimum_size` bytes are compressed. Responses that
+    already carry a Content-Encoding, ask for Cache-Control: no-transform, or have no body to speak
+    of (1xx, 204, 206, 304) pass through untouched. A single-message body is compressed in one go
+    and kept as is if that does not make it smaller. A streamed body (StreamingResponse) is held
+    back only until `minimum_size` bytes have arrived, then compressed and flushed chunk by chunk,
+    so memory stays bounded and every chunk reaches the client as soon as it is produced.
+
+    A compressed response's ETag gets the coding appended (see encoded_etag), so a strong tag never
+    stands for two different bodies; the endpoints' conditional checks accept either form.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        level: int = 4,
+        brotli_quality: int = 4,
+        encodings: Sequence[str] = ("br", "gzip", "deflate")
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.encodings = [encoding for encoding in encodings if encoding != "br" or brotli is not None]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            accept_encoding = Headers(scope=scope).get("accept-encoding")
+            encoding = negotiate_encoding(accept_encoding, self.encodings) if accept_encoding else None
+            if encoding is not None:
+                responder = _CompressionResponder(send, _Encoder(encoding, self.level, self.brotli_quality), self.minimum_size)
+                await self.app(scope, receive, responder.send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _CompressionResponder:
+    """send() wrapper compressing one response; decides on the first body message."""
+    def __init__(self, send: Send, encoder: _Encoder, minimum_size: int):
+        self._send = send
+        self.encoder = encoder
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.buffer: List[bytes] = []
+        self.buffered = 0
+        self.state = "pending"  # pending -> buffering -> compressing, or pending -> passthrough
+
+    def _eligible(self) -> bool:
+        headers = Headers(raw=self.start["headers"])
+        if self.start["status"] < 200 or self.start["status"] in (204, 206, 304):
+            return False
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", "").lower():
+            return False
+        content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+        if content_type in INCOMPRESSIBLE_TYPES:
+            return False
+        return content_type.startswith(COMPRESSIBLE_PREFIXES) or content_type.endswith(COMPRESSIBLE_SUFFIXES)
+
+    async def send(self, message: Message) -> None:
+        if self.state == "passthrough":
+            await self._send(message)
+        elif message["type"] == "http.response.start":
+            self.start = message
+        elif message["type"] != "http.response.body":
+            # e.g. http.response.pathsend: nothing to compress, release the response as it is
+            self.state = "passthrough"
+            await self._send(self.start)
+            await self._send(message)
+        elif self.state == "compressing":
+            more_body = message.get("more_body", False)
+            body = await self.encoder.compress_async(message.get("body", b""), final=not more_body)
+            if body or not more_body:
+                await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+            if not more_body:
+                self.encoder.record()
+        elif self.state == "pending" and not self._eligible():
+            self.state = "passthrough"
+            await self._send(self.start)
+            await self._send(message)
+        else:
+            await self._buffer(message)
+
+    async def _buffer(self, message: Message) -> None:
+        self.state = "buffering"
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        self.buffer.append(body)
+        self.buffered += len(body)
+        if self.buffered < self.minimum_size:
+            if more_body:
+                return
+            # Too small to be worth it
+            await self._release(b"".join(self.buffer))
+            return
+
+        data = b"".join(self.buffer)
+        self.buffer = []
+        headers = MutableHeaders(scope=self.start)
+        if not more_body:
+            compressed = await self.encoder.compress_async(data, final=True)
+            if len(compressed) >= len(data):
+                await self._release(data)
+                return
+            self.encoder.record()
+            headers["Content-Length"] = str(len(compressed))
+            self._mark_encoded(headers)
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        self.state = "compressing"
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        self._mark_encoded(headers)
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": await self.encoder.compress_async(data, final=False), "more_body": True})
+
+    def _mark_encoded(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.encoder.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "etag" in headers:
+            headers["ETag"] = encoded_etag(headers["etag"], self.encoder.encoding)
+
+    async def _release(self, body: bytes) -> None:
+        self.state = "passthrough"
+        await self._send(self.start)
+        await self._send({"type": "http.response.body", "body": body})
+
+
+class AdmissionControlMiddleware:
+    """
+    Caps the requests a worker runs at once and sheds the excess quickly instead of letting it pile up.
+
+    Up to `max_concurrent` requests run; the next ones wait in FIFO order for a slot. A request that
+    finds `max_queue` others already waiting, or does not get a slot within `max_wait` seconds, is
+    answered with 503 and Retry-After right away. Sized to the database pool, this keeps requests from
+    stacking up in pool checkout (and in the threadpool) when the database slows down: latency stays
+    bounded by the wait budget and clients are told to back off.
+
+    A slot is held until the response body is sent, so streamed exports count for their whole length.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_concurrent: int,
+        max_queue: int = 100,
+        max_wait: float = 1.0,
+        retry_after: int = 1,
+        exclude_paths: tuple = ("/metrics",)
+    ):
+        self.app = app
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.exclude_paths = set(exclude_paths)
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        reason = await self._acquire()
+        if reason is not None:
+            http_requests_rejected_total.inc(reason=reason)
+            response = JSONResponse(
+                {"detail": "Server is busy, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._release()
+
+    async def _acquire(self) -> Optional[str]:
+        """Takes a slot; returns why the request is rejected instead, or None once it holds one."""
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            http_admission_wait_seconds.observe(0.0)
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return "queue_full"
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        http_requests_queued.inc()
+        started = time.perf_counter()
+        try:
+            # _release hands its slot straight to the waiter, so `active` already counts it
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            return "wait_timeout"
+        except asyncio.CancelledError:
+            # The client went away; pass on a slot that was handed over in the meantime
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            http_requests_queued.dec()
+            if waiter.cancelled():
+                self._discard(waiter)
+        http_admission_wait_seconds.observe(time.perf_counter() - started)
+        return None
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+class RateLimitMiddleware:
+    """
+    Per-client token bucket: `rate` requests per second on average, bursts of up to `burst`.
+
+    Clients are identified by the user of their bearer token (verified through src.utils.jwt, so
+    repeat tokens, valid or not, are answered from its caches), or by their address when there is no
+    token that can be verified. Buckets live in the worker, so with N workers a client gets up to N
+    times the rate. Requests over the limit get 429 with Retry-After. Authentication itself is still up to the endpoints.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate: float,
+        burst: int,
+        max_clients: int = 100000,
+        exclude_paths: tuple = ("/metrics",)
+    ):
+        self.app = app
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.exclude_paths = set(exclude_paths)
+        # client -> (tokens, monotonic time of the last update), least recently seen first
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        wait = self._take(await self._client_key(scope))
+        if wait > 0:
+            http_requests_rejected_total.inc(reason="rate_limited")
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded"},
+                status_code=429,
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+    async def _client_key(self, scope: Scope) -> str:
+        scheme, _, token = Headers(scope=scope).get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                verified = get_cached_token(token)
+                if verified is None:
+                    # First sight of this token: signature checks (and a possible JWKS fetch) stay off the loop
+                    verified = await run_in_threadpool(authenticate_token, token)
+                user = user_for_token(verified)
+                return f"user:{user.id or user.username}"
+            except (JOSEError, ValidationError):
+                pass  # Invalid tokens are limited by address; the endpoint rejects them (from the cache)
+            except JWKSUnavailable:
+                pass  # So are all tokens while the JWKS cannot be fetched; the endpoint answers 503
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    def _take(self, key: str) -> float:
+        """Takes a token from the client's bucket; returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+        wait = 0.0
+        if tokens >= 1.0:
+            tokens -= 1.0
+        else:
+            wait = (1.0 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class BodyLimitMiddleware:
+    """
+    Rejects request bodies over a per-path byte limit with 413 before the app has read them.
+
+    Form parsing spools a whole multipart upload to disk before the endpoint runs, so a size check in
+    the endpoint comes after the damage. Here a Content-Length over the limit is refused at once, and
+    a body sent without one (chunked) is cut off as soon as more than `limit` bytes were received.
+    The limit is on the raw body, multipart framing and other form fields included, so it is a soft
+    limit: set it a little above the content limit the endpoint still enforces exactly.
+    """
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        self.limits = dict(limits)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        detail = f"Request bodies are limited to {limit} bytes"
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > limit:
+            http_requests_rejected_total.inc(reason="body_too_large")
+            response = JSONResponse({"detail": detail}, status_code=413, headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    http_requests_rejected_total.inc(reason="body_too_large")
+                    # Re-raised by FastAPI's body parsing and answered by its exception handler
+                    raise HTTPException(status_code=413, detail=detail, headers={"Connection": "close"})
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+class ProfilingMiddleware:
+    """
+    Runs selected requests under a profiler and writes one profile file per request to `directory`,
+    named by start time, method, route template and duration.
+
+    A request is profiled when it carries `header` set to `token`, or else with probability
+    `sample_rate`; profiles of sampled requests faster than `min_duration` are discarded. "collapsed"
+    samples the stacks of every busy thread (see StackSampler), "pstats" runs cProfile on the event
+    loop (see CallProfiler). A profiler sees the whole worker, so at most one request per worker is
+    profiled at a time and requests running alongside it show up in its profile too.
+    Only installed when configured: without it requests pay nothing.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: str,
+        profiler: str = "collapsed",
+        header: str = "X-Profile",
+        token: Optional[str] = None,
+        sample_rate: float = 0.0,
+        min_duration: float = 0.0,
+        interval: float = 0.005,
+        exclude_paths: tuple = ("/metrics",)
+    ):
+        self.app = app
+        self.directory = directory
+        self.profiler = profiler
+        self.header = header.lower().encode("latin-1")
+        self.token = token.encode("latin-1") if token else None
+        self.sample_rate = sample_rate
+        self.min_duration = min_duration
+        self.interval = interval
+        self.exclude_paths = set(exclude_paths)
+        self.active = False
+        os.makedirs(directory, exist_ok=True)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths or self.active:
+            await self.app(scope, receive, send)
+            return
+        requested = self._requested(scope)
+        if not requested and not (self.sample_rate > 0 and random.random() < self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = StackSampler(self.interval) if self.profiler == "collapsed" else CallProfiler()
+        self.active = True
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.stop()
+            duration = time.perf_counter() - started
+            self.active = False
+            if requested or duration >= self.min_duration:
+                route = getattr(scope.get("route"), "path", None) or "unmatched"
+                path = os.path.join(
+                    self.directory, profile_filename(started_at, scope["method"], route, duration, profiler.extension)
+                )
+                try:
+                    await run_in_threadpool(profiler.write, path)
+                    logger.info("Request profiled", route=route, duration_ms=round(duration * 1000, 1), file=path)
+                except OSError as e:
+                    logger.warning("Writing request profile failed", file=path, error=str(e))
+
+    def _requested(self, scope: Scope) -> bool:
+        if self.token is None:
+            return False
+        for name, value in scope["headers"]:
+            if name == self.header:
+                return hmac.compare_digest(value, self.token)
+        return False
@@ -0,0 +1,99 @@
+# app/core/profiling.py
+
+import cProfile
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from types import CodeType, FrameType
+from typing import Dict, List, Optional
+
+# Innermost frames of a thread parked on a lock, condition or queue (idle threadpool workers, the log writer)
+IDLE_FRAME_FILE = threading.__file__
+# Runs of characters replaced with "_" when a route template goes into a profile file name
+ROUTE_UNSAFE = re.compile(r"[^A-Za-z0-9]+")
+
+
+def profile_filename(started: datetime, method: str, route: str, duration: float, extension: str) -> str:
+    """e.g. 20261018T101500123-GET-api_v1_student_student_id-153ms.prof (UTC start time first, so they sort)"""
+    slug = ROUTE_UNSAFE.sub("_", route).strip("_") or "root"
+    return f"{started.astimezone(timezone.utc):%Y%m%dT%H%M%S%f}"[:-3] + f"-{method}-{slug}-{round(duration * 1000)}ms.{extension}"
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of the process's busy threads every `interval` seconds from a
+    background thread and counts them in collapsed-stack form ("thread;outer;...;inner count"),
+    the input of flamegraph.pl and speedscope. Unlike cProfile it sees the threadpool as well as
+    the event loop, and costs one stack walk per thread per interval instead of a hook per call.
+    """
+    extension = "collapsed"
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._labels: Dict[CodeType, str] = {}
+        # Module paths are shown relative to their sys.path entry ("anyio/to_thread.py", "src/main.py")
+        self._roots = sorted({os.path.join(os.path.abspath(entry), "") for entry in sys.path}, key=len, reverse=True)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own and frame.f_code.co_filename != IDLE_FRAME_FILE:
+                    self.stacks[self._collapse(names.get(ident, str(ident)), frame)] += 1
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            path = code.co_filename
+            root = next((root for root in self._roots if path.startswith(root)), "")
+            label = self._labels[code] = f"{getattr(code, 'co_qualname', code.co_name)} ({path[len(root):]}:{code.co_firstlineno})"
+        return label
+
+    def _collapse(self, thread_name: str, frame: Optional[FrameType]) -> str:
+        frames: List[str] = []
+        while frame is not None:
+            frames.append(self._label(frame.f_code))
+            frame = frame.f_back
+        frames.append(thread_name)
+        return ";".join(reversed(frames))
+
+    def write(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            file.writelines(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class CallProfiler:
+    """
+    cProfile of the thread that started it, the event loop: every call made by the request's
+    coroutines, including the sync service and SQLAlchemy code of DATABASE_ASYNC mode (run_sync
+    stays on the loop) and response serialization, but not work handed to the threadpool.
+    Written as pstats (python -m pstats, snakeviz; flameprof or gprof2dot for flame graphs).
+    """
+    extension = "prof"
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profile.enable()
+
+    def stop(self) -> None:
+        self.profile.disable()
+
+    def write(self, path: str) -> None:
+        self.profile.dump_stats(path)
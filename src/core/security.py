@@ -0,0 +1,135 @@
+# app/core/security.py
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+import structlog
+from jose import JWTError, jwk
+from jose.backends.base import Key
+
+from src.core.exceptions import JWKSUnavailable
+
+logger = structlog.get_logger(__name__)
+
+
+class JWKSProvider:
+    """
+    Serves token-verification keys from a JSON Web Key Set.
+
+    The set is fetched once and kept in memory; a background thread refreshes it every
+    `refresh_interval` seconds, and a token signed with an unknown `kid` triggers an
+    on-demand refresh (at most once per `min_refresh_interval`) to pick up key rotations.
+    Constructed key objects are cached per (kid, alg) so RSA/EC key parsing happens once.
+
+    `source` may be an http(s) URL, a file:// URL or a plain file path. Pass `jwks`
+    instead to use a fixed in-memory key set (offline tests, local development).
+    """
+    def __init__(
+        self,
+        source: Optional[str] = None,
+        jwks: Optional[Dict[str, Any]] = None,
+        refresh_interval: float = 300.0,
+        min_refresh_interval: float = 10.0,
+        http_timeout: float = 5.0,
+        on_rotate: Optional[Callable[[], None]] = None,
+    ):
+        if source is None and jwks is None:
+            raise ValueError("JWKSProvider needs a source or an in-memory jwks")
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.http_timeout = http_timeout
+        self.on_rotate = on_rotate
+        self._jwks_by_kid: Dict[Optional[str], Dict[str, Any]] = {}
+        self._keys: Dict[Tuple[Optional[str], str], Key] = {}
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+        self._loaded = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if jwks is not None:
+            self._load(jwks)
+
+    def _fetch(self) -> Dict[str, Any]:
+        if self.source.startswith(("http://", "https://")):
+            response = httpx.get(self.source, timeout=self.http_timeout)
+            response.raise_for_status()
+            return response.json()
+        path = self.source[len("file://"):] if self.source.startswith("file://") else self.source
+        return json.loads(Path(path).read_text())
+
+    def _load(self, jwks: Dict[str, Any]) -> None:
+        jwks_by_kid = {key.get("kid"): key for key in jwks.get("keys", [])}
+        with self._lock:
+            rotated = self._loaded and set(jwks_by_kid) != set(self._jwks_by_kid)
+            self._jwks_by_kid = jwks_by_kid
+            self._keys = {}
+            self._loaded = True
+            self._last_refresh = time.monotonic()
+        if rotated:
+            logger.info("JWKS keys rotated", kids=sorted(str(kid) for kid in jwks_by_kid))
+            if self.on_rotate is not None:
+                self.on_rotate()
+
+    def refresh(self) -> None:
+        """Re-reads the key set from `source`. Raises JWKSUnavailable when it cannot be fetched or parsed."""
+        if self.source is None:
+            return
+        try:
+            jwks = self._fetch()
+        except (httpx.HTTPError, OSError, ValueError) as e:
+            raise JWKSUnavailable(f"Could not fetch the JWKS from {self.source}: {e}") from e
+        self._load(jwks)
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the last good key set
+                logger.warning("JWKS refresh failed", source=self.source, error=str(e))
+
+    def start(self) -> None:
+        """Starts the background refresh thread (no-op for in-memory key sets)."""
+        if self.source is None or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._refresh_loop, name="jwks-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def get_key(self, kid: Optional[str], algorithm: str) -> Key:
+        """
+        Returns the verification key for a token header, refreshing the set for unknown kids.
+        Raises JWTError for an unknown kid, JWKError for an unusable key and JWKSUnavailable when
+        the set has to be fetched and cannot be.
+        """
+        if not self._loaded:
+            self.refresh()
+        key = self._lookup(kid, algorithm)
+        if key is None and self.source is not None and time.monotonic() - self._last_refresh >= self.min_refresh_interval:
+            self.refresh()
+            key = self._lookup(kid, algorithm)
+        if key is None:
+            raise JWTError(f"No signing key found for kid '{kid}'")
+        return key
+
+    def _lookup(self, kid: Optional[str], algorithm: str) -> Optional[Key]:
+        with self._lock:
+            cached = self._keys.get((kid, algorithm))
+            if cached is not None:
+                return cached
+            key_data = self._jwks_by_kid.get(kid)
+            if key_data is None and kid is None and len(self._jwks_by_kid) == 1:
+                # Tokens without a kid are accepted when the set holds a single key
+                key_data = next(iter(self._jwks_by_kid.values()))
+            if key_data is None:
+                return None
+            key = jwk.construct(key_data, algorithm)
+            self._keys[(kid, algorithm)] = key
+            return key
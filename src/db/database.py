@@ -1,28 +1,156 @@
 # app/db/database.py
+import time
 from sqlmodel import create_engine, SQLModel, Session
-from sqlalchemy.engine import Engine
-from typing import Generator
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 
 # Import ALL your models here so SQLModel.metadata can find them
 # Even if you don't use them directly in this file,
 # their mere import registers them with SQLModel.metadata
 
 from src.db.models.student import Student
+from src.db.models.student_change import StudentChange
 
 from src.core.config import settings
+from src.db.instrumentation import instrument_engine
+from src.db.routing import ReplicaSet, RoutingSession
 
 engine: Engine | None = None # Initialize as None
+async_engine: AsyncEngine | None = None
+replicas: ReplicaSet | None = None
+async_replicas: ReplicaSet | None = None
+
+# Async driver used for each backend when ASYNC_DATABASE_URL is not set explicitly
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def engine_options(url: URL) -> Dict[str, Any]:
+    """Pool, liveness and statement-timeout arguments for create_engine/create_async_engine, from settings."""
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PING == "pre_ping"}
+    backend = url.get_backend_name()
+    if backend == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in a single connection (SingletonThreadPool / StaticPool): nothing to size
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if backend == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+def install_idle_ping(engine: Engine, idle_seconds: float) -> None:
+    """
+    Cheaper alternative to pool_pre_ping: only connections that sat idle in the pool for longer than
+    `idle_seconds` are pinged on checkout. A failed ping raises DisconnectionError, which makes the
+    pool discard the connection and retry the checkout with a fresh one.
+    """
+    @event.listens_for(engine, "checkin")
+    def checkin(dbapi_connection, connection_record):
+        connection_record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        last_checkin = connection_record.info.get("last_checkin")
+        if last_checkin is None or time.monotonic() - last_checkin < idle_seconds:
+            return
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        except Exception as e:
+            raise exc.DisconnectionError(f"Idle connection failed liveness check: {e}") from e
+
+def configure_engine(engine: Engine, name: str) -> None:
+    # Shared post-creation setup; takes the sync Engine (AsyncEngine.sync_engine for async engines)
+    if settings.DB_POOL_PING == "idle":
+        install_idle_ping(engine, settings.DB_POOL_PING_IDLE_SECONDS)
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine, name=name, slow_checkout_seconds=settings.DB_POOL_SLOW_CHECKOUT_SECONDS)
 
 def get_engine() -> Engine:
     global engine
     if engine is None:
+        url = make_url(settings.DATABASE_URL)
         engine = create_engine(
-            settings.DATABASE_URL,
+            url,
             # echo=True if settings.ENVIRONMENT == 'development' else False,
-            pool_pre_ping=True # Helps with stale connections
+            **engine_options(url)
         )
+        configure_engine(engine, name="primary")
     return engine
 
+def to_async_url(database_url: str) -> URL:
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver known for '{backend}', set ASYNC_DATABASE_URL explicitly.")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+def get_async_database_url() -> URL:
+    if settings.ASYNC_DATABASE_URL:
+        return make_url(settings.ASYNC_DATABASE_URL)
+    return to_async_url(settings.DATABASE_URL)
+
+def get_async_engine() -> AsyncEngine:
+    global async_engine
+    if async_engine is None:
+        url = get_async_database_url()
+        async_engine = create_async_engine(url, **engine_options(url))
+        configure_engine(async_engine.sync_engine, name="primary_async")
+    return async_engine
+
+def get_replicas() -> Optional[ReplicaSet]:
+    """Sync replica engines from DATABASE_REPLICA_URLS, or None when no replicas are configured."""
+    global replicas
+    if replicas is None and settings.DATABASE_REPLICA_URLS:
+        replica_engines = []
+        for index, replica_url in enumerate(settings.DATABASE_REPLICA_URLS):
+            url = make_url(replica_url)
+            replica_engine = create_engine(url, **engine_options(url))
+            configure_engine(replica_engine, name=f"replica{index}")
+            replica_engines.append(replica_engine)
+        replicas = ReplicaSet(
+            replica_engines,
+            retry_seconds=settings.DATABASE_REPLICA_RETRY_SECONDS,
+            sticky_seconds=settings.DATABASE_REPLICA_STICKY_SECONDS
+        )
+    return replicas
+
+def get_async_replicas() -> Optional[ReplicaSet]:
+    """Async counterpart of get_replicas; holds the sync_engine of each async replica engine."""
+    global async_replicas
+    if async_replicas is None and settings.DATABASE_REPLICA_URLS:
+        replica_engines = []
+        for index, replica_url in enumerate(settings.DATABASE_REPLICA_URLS):
+            url = to_async_url(replica_url)
+            replica_engine = create_async_engine(url, **engine_options(url))
+            configure_engine(replica_engine.sync_engine, name=f"replica{index}_async")
+            replica_engines.append(replica_engine.sync_engine)
+        async_replicas = ReplicaSet(
+            replica_engines,
+            retry_seconds=settings.DATABASE_REPLICA_RETRY_SECONDS,
+            sticky_seconds=settings.DATABASE_REPLICA_STICKY_SECONDS
+        )
+    return async_replicas
+
+def new_session() -> Session:
+    """Session bound to the primary; read_only service methods are routed to a replica when configured."""
+    return RoutingSession(get_engine(), replicas=get_replicas())
+
+def new_async_session() -> AsyncSession:
+    return AsyncSession(get_async_engine(), sync_session_class=RoutingSession, replicas=get_async_replicas())
+
 def create_db_and_tables():
     # SQLModel.metadata.create_all() uses the engine to connect
     # and create all tables defined with table=True in your imported models.
@@ -30,5 +158,9 @@ def create_db_and_tables():
     print("Database tables created (or already exist).")
 
 def get_session() -> Generator[Session, None, None]:
-    with Session(get_engine()) as session:
-        yield session
\ No newline at end of file
+    with new_session() as session:
+        yield session
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    async with new_async_session() as session:
+        yield session
@@ -0,0 +1,44 @@
+# app/db/explain.py
+
+import json
+from typing import Any, Dict, List
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN of a SQLAlchemy statement, compiled with its bound parameters like any other statement
+    (session.execute(Explain(select(...)))). PostgreSQL returns the plan as JSON, SQLite its
+    EXPLAIN QUERY PLAN rows.
+    """
+    inherit_cache = False
+
+    def __init__(self, statement: Executable):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _explain_postgresql(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+@compiles(Explain, "sqlite")
+def _explain_sqlite(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN QUERY PLAN " + compiler.process(element.statement, **kw)
+
+
+def postgresql_plan(value: Any) -> Dict[str, Any]:
+    """Top plan node of an EXPLAIN (FORMAT JSON) result (psycopg2 decodes the JSON, asyncpg returns text)."""
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value[0]["Plan"]
+
+
+def plan_nodes(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Every node of a PostgreSQL JSON plan, depth first."""
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
@@ -0,0 +1,115 @@
+# app/db/instrumentation.py
+
+import time
+from functools import wraps
+from typing import Dict, Optional
+
+import structlog
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+
+from src.core.metrics import (
+    db_pool_checkout_timeouts_total,
+    db_pool_checkout_wait_seconds,
+    db_statement_duration_seconds,
+    db_statement_rows,
+    request_db_time,
+)
+
+logger = structlog.get_logger(__name__)
+
+# Instrumented engines by name, read by collect_pool_metrics at scrape time
+instrumented_engines: Dict[str, Engine] = {}
+
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK", "EXPLAIN"}
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in SQL_OPERATIONS else "OTHER"
+
+
+def instrument_engine(engine: Engine, name: str = "primary", slow_checkout_seconds: Optional[float] = None) -> None:
+    """
+    Records per-statement timing and row counts, and pool checkout wait time, for a sync Engine
+    (pass AsyncEngine.sync_engine for async engines). Statement time is also added to the
+    current request's SQL total when called inside a request. Checkouts slower than
+    `slow_checkout_seconds` are logged with the pool status.
+    """
+    if getattr(engine, "_metrics_instrumented", False):
+        return
+    engine._metrics_instrumented = True
+    instrumented_engines[name] = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        operation = _operation(statement)
+        db_statement_duration_seconds.observe(elapsed, engine=name, operation=operation)
+        rowcount = getattr(cursor, "rowcount", -1)
+        if rowcount is not None and rowcount >= 0:
+            db_statement_rows.observe(rowcount, engine=name, operation=operation)
+        accumulator = request_db_time.get()
+        if accumulator is not None:
+            accumulator[0] += elapsed
+            accumulator[1] += 1
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # Keep the start-time stack balanced when a statement fails
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+
+    # Time spent obtaining a pooled connection (queueing for a free slot plus any new connect)
+    raw_connection = engine.raw_connection
+
+    @wraps(raw_connection)
+    def timed_raw_connection(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return raw_connection(*args, **kwargs)
+        except exc.TimeoutError:
+            db_pool_checkout_timeouts_total.inc(engine=name)
+            logger.error("Database pool exhausted", engine=name, pool=engine.pool.status())
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            db_pool_checkout_wait_seconds.observe(waited, engine=name)
+            accumulator = request_db_time.get()
+            if accumulator is not None:
+                accumulator[2] += waited
+            if slow_checkout_seconds is not None and waited > slow_checkout_seconds:
+                logger.warning(
+                    "Slow database connection checkout",
+                    engine=name,
+                    waited_ms=round(waited * 1000, 1),
+                    pool=engine.pool.status()
+                )
+
+    engine.raw_connection = timed_raw_connection
+
+
+def collect_pool_metrics():
+    """Metrics collector (see src.core.metrics) reporting live pool occupancy for every instrumented engine."""
+    samples = {"size": [], "checked_out": [], "checked_in": [], "overflow": []}
+    for name, engine in list(instrumented_engines.items()):
+        pool = engine.pool
+        # Only QueuePool-style pools track occupancy; SQLite's single-connection pools do not
+        if not hasattr(pool, "checkedout"):
+            continue
+        labels = {"engine": name}
+        samples["size"].append((labels, pool.size()))
+        samples["checked_out"].append((labels, pool.checkedout()))
+        samples["checked_in"].append((labels, pool.checkedin()))
+        samples["overflow"].append((labels, pool.overflow()))
+    return [
+        ("db_pool_size", "gauge", "Configured number of persistent pool connections.", samples["size"]),
+        ("db_pool_checked_out", "gauge", "Connections currently in use.", samples["checked_out"]),
+        ("db_pool_checked_in", "gauge", "Idle connections available in the pool.", samples["checked_in"]),
+        ("db_pool_overflow", "gauge", "Overflow connections currently open beyond the pool size (negative while the pool is filling).", samples["overflow"]),
+    ]
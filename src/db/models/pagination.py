@@ -25,6 +25,14 @@ class PaginatedResponse(BaseModel, Generic[T]):
     to_item: Optional[int] = Field(None, alias="to",
                                    description="The ending item number for the current page (1-indexed).")
 
+    # Opaque keyset cursor for the page after this one; None on the last page.
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor to fetch the next page, null on the last page.")
+
+    # How `total` was obtained; null where the listing does not say.
+    total_mode: Optional[str] = Field(
+        None, description="How `total` was obtained: exact, cached (may lag writes briefly) or estimate (planner statistics)."
+    )
+
     # Optional fields for URLs (can be added if you want to dynamically generate links)
     # first_page_url: Optional[str] = None
     # last_page_url: Optional[str] = None
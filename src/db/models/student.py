@@ -1,10 +1,16 @@
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any, List, Required
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Literal, Required, Tuple, Type
 from uuid import UUID, uuid4
 
-from sqlalchemy import func
+from pydantic import create_model, field_validator
+from sqlalchemy import DDL, DateTime, Index, event, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, SQLModel, Column, JSON, Relationship
 
+# JSONB on PostgreSQL so department can be searched through a GIN index, plain JSON elsewhere
+DepartmentJSON = JSON().with_variant(JSONB(), "postgresql")
+
 
 # StudentBase defines the common fields for Student
 class StudentBase(SQLModel):
@@ -13,26 +19,45 @@ class StudentBase(SQLModel):
     id_semester: str
     email: str = Field(unique=True, index=True)
     # department is a JSON field.
-    department: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    department: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(DepartmentJSON))
 
 # Student is the actual database table model
 # Note the 'table="student"' argument to explicitly set the table name
 class Student(StudentBase, table=True):
     __tablename__ = "student"
+    __table_args__ = (
+        # Composite indexes backing the keyset (cursor) pagination orderings
+        Index("ix_student_created_at_id", "created_at", "id"),
+        Index("ix_student_name_id", "name", "id"),
+        # List filters: semester equality, name prefix/substring (trigram) and department key/value (containment)
+        Index("ix_student_id_semester", "id_semester"),
+        Index(
+            "ix_student_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_student_department", "department", postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True, index=True)
     created_at: Optional[datetime] = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         nullable=False,  # DB column is NOT NULL
+        sa_type=DateTime(timezone=True),  # Aware UTC values; asyncpg rejects them for a naive column
         sa_column_kwargs={"server_default": func.now()}  # DB sets default on insert
     )
     created_by: Optional[str] = Field(default=None, nullable=True)
     updated_at: Optional[datetime] = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         nullable=False,  # DB column is NOT NULL
+        sa_type=DateTime(timezone=True),
         sa_column_kwargs={"server_default": func.now()}  # DB sets default on insert
     )
     updated_by: Optional[str] = Field(default=None, nullable=True)
 
+# ix_student_name_trgm needs the pg_trgm operator classes (create_all only; Alembic does the same)
+event.listen(
+    Student.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
 
 # StudentCreate is used for incoming data when creating a new Student record
 class StudentCreate(StudentBase):
@@ -41,6 +66,24 @@ class StudentCreate(StudentBase):
 # StudentRead is used for outgoing data when reading Student records
 class StudentRead(StudentBase):
     id: UUID
+    # Loaded from the row for ETag/Last-Modified but never serialized into response bodies
+    updated_at: Optional[datetime] = Field(default=None, exclude=True)
+
+# Fields a sparse fieldset (?fields=) can pick, in StudentRead order
+STUDENT_READ_FIELDS = ("name", "student_id", "id_semester", "email", "department", "id")
+
+@lru_cache(maxsize=256)
+def student_read_model(fields: Tuple[str, ...]) -> Type[SQLModel]:
+    """
+    StudentRead restricted to a sparse fieldset (a tuple in STUDENT_READ_FIELDS order), built once per
+    field set. id and updated_at are always loaded, for ETags and cursors, but id is only serialized
+    when it was asked for.
+    """
+    definitions: Dict[str, Any] = {name: (StudentRead.model_fields[name].annotation, ...) for name in fields}
+    if "id" not in fields:
+        definitions["id"] = (Optional[UUID], Field(default=None, exclude=True))
+    definitions["updated_at"] = (Optional[datetime], Field(default=None, exclude=True))
+    return create_model(f"StudentRead_{'_'.join(fields)}", __base__=SQLModel, **definitions)
 
 # StudentUpdate is used for incoming data when updating an existing Student record
 class StudentUpdate(SQLModel):
@@ -48,4 +91,38 @@ class StudentUpdate(SQLModel):
     student_id: Optional[str] = Field(default=None, unique=True, index=True)
     id_semester: Optional[str] = Field(default=None)
     email: Optional[str] = Field(default=None, unique=True, index=True)
-    department: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
\ No newline at end of file
+    department: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+
+    # Fields are optional so a PATCH can leave them out, but none of the columns accepts NULL
+    @field_validator("name", "student_id", "id_semester", "email", "department")
+    @classmethod
+    def reject_null(cls, value: Any) -> Any:
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+# StudentFilter holds the optional filters of the student list and export
+class StudentFilter(SQLModel):
+    name: Optional[str] = None  # Case-insensitive name search
+    name_match: Literal["prefix", "contains"] = "prefix"
+    id_semester: Optional[str] = None
+    department: Dict[str, str] = {}  # department keys that must hold these (string) values
+
+# StudentBatchResponse is returned by the batch lookup endpoint, in request order
+class StudentBatchResponse(SQLModel):
+    data: List[StudentRead] = []
+    missing: List[UUID] = []  # Requested ids that do not exist
+
+# StudentBulkResult reports the outcome of one row of a bulk create/upsert request
+class StudentBulkResult(SQLModel):
+    index: int  # Position of the row in the request body
+    status: str  # "created", "updated" or "conflict"
+    id: Optional[UUID] = None
+    detail: Optional[str] = None
+
+# StudentBulkResponse is returned by the bulk create/upsert endpoint
+class StudentBulkResponse(SQLModel):
+    created: int = 0
+    updated: int = 0
+    conflicts: int = 0
+    results: List[StudentBulkResult] = []
@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Literal, Optional
+from uuid import UUID
+
+from sqlalchemy import BigInteger, DateTime, Integer
+from sqlmodel import Field, SQLModel, Column, JSON
+
+# BIGINT on PostgreSQL; SQLite only autoincrements an INTEGER PRIMARY KEY
+SequenceInteger = BigInteger().with_variant(Integer(), "sqlite")
+
+
+# StudentChange is the transactional outbox of student writes: a row is inserted in the same
+# transaction as the write it describes, and `seq` orders the change feed
+class StudentChange(SQLModel, table=True):
+    __tablename__ = "student_change"
+    # Without AUTOINCREMENT SQLite reuses the seq of pruned rows, which would rewind the feed
+    __table_args__ = {"sqlite_autoincrement": True}
+    seq: Optional[int] = Field(default=None, sa_column=Column(SequenceInteger, primary_key=True, autoincrement=True))
+    student_uuid: UUID
+    operation: str  # "created", "updated" or "deleted"
+    # The student as StudentRead (JSON) after the write; None for deletes
+    data: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), nullable=False, index=True, sa_type=DateTime(timezone=True)
+    )
+
+# StudentChangeEvent is one change as sent by the change feed
+class StudentChangeEvent(SQLModel):
+    seq: int
+    operation: Literal["created", "updated", "deleted"]
+    id: UUID  # The student's UUID
+    student: Optional[Dict[str, Any]] = None  # StudentRead after the write; null for deletes
+    at: datetime
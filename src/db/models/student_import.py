@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+from uuid import UUID
+
+from sqlmodel import SQLModel
+
+
+# StudentImportRowError reports a row of an import file that was not written
+class StudentImportRowError(SQLModel):
+    row: int  # Line of the file (CSV) or sheet row (Excel); the header is row 1
+    status: Literal["invalid", "conflict"]
+    detail: str
+
+# StudentImportJob is the progress and outcome of one uploaded import file
+class StudentImportJob(SQLModel):
+    id: UUID
+    status: Literal["pending", "running", "completed", "failed"] = "pending"
+    filename: Optional[str] = None
+    format: Literal["csv", "xlsx"]
+    upsert: bool = False
+    bytes: int = 0  # Size of the uploaded file
+    rows: int = 0  # Data rows processed so far
+    created: int = 0
+    updated: int = 0
+    invalid: int = 0
+    conflicts: int = 0
+    errors: List[StudentImportRowError] = []  # The first STUDENT_IMPORT_MAX_ERRORS rejected rows
+    rows_per_second: Optional[float] = None
+    detail: Optional[str] = None  # Why the job failed
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
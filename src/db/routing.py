@@ -0,0 +1,136 @@
+# app/db/routing.py
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator, Optional, Sequence, TypeVar
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+# monotonic() of the last commit that wrote through a RoutingSession in this process
+_last_write_at = float("-inf")
+
+
+class ReplicaSet:
+    """
+    Round-robin over replica engines. A replica that fails is skipped for `retry_seconds`,
+    after which it is handed out again; next() returns None while every replica is down.
+    """
+    def __init__(self, engines: Sequence[Engine], retry_seconds: float = 30.0, sticky_seconds: float = 1.0):
+        self.engines = list(engines)
+        self.retry_seconds = retry_seconds
+        self.sticky_seconds = sticky_seconds
+        self._cycle = itertools.cycle(self.engines)
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def next(self) -> Optional[Engine]:
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                replica = next(self._cycle)
+                if self._down_until.get(replica, 0.0) <= now:
+                    return replica
+        return None
+
+    def mark_down(self, replica: Engine) -> None:
+        with self._lock:
+            self._down_until[replica] = time.monotonic() + self.retry_seconds
+
+    def recently_written(self) -> bool:
+        return time.monotonic() - _last_write_at < self.sticky_seconds
+
+
+class RoutingSession(Session):
+    """
+    Session that sends the statements of read_only methods to a replica.
+
+    Everything else (writes, flushes, reads outside read_only) uses the session's own bind, the primary.
+    Once a session has written, or while this process committed a write within the replica set's
+    sticky window, reads stay on the primary too so callers see their own writes.
+    """
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+        self.wrote = False
+        self._replica: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._replica is not None and not self._flushing:
+            return self._replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+    def _replica_eligible(self) -> bool:
+        return (
+            self.replicas is not None
+            and self._replica is None
+            and not self.wrote
+            and not (self.new or self.dirty or self.deleted)
+            and not self.replicas.recently_written()
+        )
+
+    @contextmanager
+    def use_replica(self) -> Iterator[Optional[Engine]]:
+        """Routes the session's statements to the next healthy replica; yields None (primary) when not eligible."""
+        replica = self.replicas.next() if self._replica_eligible() else None
+        self._replica = replica
+        try:
+            yield replica
+        finally:
+            self._replica = None
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _track_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.wrote = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _track_flush(session, flush_context):
+    session.wrote = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _track_commit(session):
+    global _last_write_at
+    if session.wrote:
+        _last_write_at = time.monotonic()
+
+
+def read_only(method: Callable[..., T]) -> Callable[..., T]:
+    """
+    Marks a service method (on an object with a `session` attribute) as safe to serve from a replica.
+    If the replica fails with an OperationalError it is taken out of rotation and the call is retried
+    on the primary.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs) -> T:
+        session = self.session
+        if not isinstance(session, RoutingSession) or session.replicas is None:
+            return method(self, *args, **kwargs)
+        with session.use_replica() as replica:
+            if replica is None:
+                return method(self, *args, **kwargs)
+            try:
+                return method(self, *args, **kwargs)
+            except OperationalError as e:
+                logger.warning("Replica query failed, retrying on the primary", replica=repr(replica.url), error=str(e.orig))
+                session.replicas.mark_down(replica)
+                # Nothing was written in this session (see _replica_eligible), so dropping the
+                # broken replica connection with a rollback loses no work
+                session.rollback()
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
@@ -1,11 +1,28 @@
+import asyncio
 import pendulum
 import structlog
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
+from datetime import datetime
+from src.api.v1.deps import open_request_session
 from src.core.config import settings
 from src.core.logging_config import configure_logging
+from src.core.metrics import registry as metrics_registry
+from src.core.middleware import (
+    AdmissionControlMiddleware, BodyLimitMiddleware, CompressionMiddleware, MetricsMiddleware, ProfilingMiddleware,
+    RateLimitMiddleware
+)
+from src.db.instrumentation import collect_pool_metrics
+from src.services.async_student_service import AsyncStudentService
+from src.services.student_cache import collect_student_cache_metrics
+from src.services import student_import
+from src.services.student_changes import (
+    PostgresChangeListener, collect_change_feed_metrics, get_change_notifier, prune_student_changes_periodically
+)
+from src.services.student_count_cache import collect_student_count_cache_metrics
 
 # Import endpoints
 from src.api.v1.endpoints import (
@@ -16,10 +33,25 @@ from src.api.v1.endpoints import (
 configure_logging()
 logger = structlog.get_logger()
 
+async def prune_student_changes(before: datetime) -> int:
+    async with open_request_session() as session:
+        return await AsyncStudentService(session).prune_student_changes(before)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting application", env=settings.ENVIRONMENT)
+    background = []
+    notifier = get_change_notifier()
+    if notifier is not None:
+        background.append(asyncio.create_task(prune_student_changes_periodically(prune_student_changes)))
+        if settings.STUDENT_CHANGES_LISTEN and settings.DATABASE_URL.startswith("postgresql"):
+            background.append(asyncio.create_task(PostgresChangeListener(notifier, settings.DATABASE_URL).run()))
     yield
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    if student_import.student_importer is not None:
+        await student_import.student_importer.close()
     logger.info("Shutting down application")
 
 # Docs only in dev
@@ -50,6 +82,65 @@ app.add_middleware(
     TrustedHostMiddleware,
     allowed_hosts = ["*"]
 )
+# Refuse oversized imports before form parsing spools them to disk; the importer checks the file size exactly
+app.add_middleware(
+    BodyLimitMiddleware,
+    limits={f"{settings.API_V1_STR}/student/imports": settings.STUDENT_IMPORT_MAX_BYTES + student_import.MULTIPART_OVERHEAD_BYTES},
+)
+# Compress list pages and exports; inside the metrics middleware, so its CPU time is part of the request time
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        level=settings.COMPRESSION_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+# Profile selected requests; outside compression, so its CPU time is in the profile, and inside
+# admission control, so queueing is not. Not installed unless configured, so it costs nothing when off
+if settings.PROFILING_TOKEN or settings.PROFILING_SAMPLE_RATE > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        directory=settings.PROFILING_DIR,
+        profiler=settings.PROFILING_FORMAT,
+        header=settings.PROFILING_HEADER,
+        token=settings.PROFILING_TOKEN,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        min_duration=settings.PROFILING_MIN_DURATION_SECONDS,
+        interval=settings.PROFILING_INTERVAL_SECONDS,
+        exclude_paths=(settings.METRICS_PATH, f"{settings.API_V1_STR}/student/changes"),
+    )
+# Shed load before it reaches the database: a per-worker concurrency cap sized to the connection pool,
+# and per-client rate limits outside it so throttled clients never take a queue slot.
+# Change feed streams stay open indefinitely and only borrow a connection per read, so they are not capped
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        max_concurrent=settings.ADMISSION_MAX_CONCURRENT or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        max_wait=settings.ADMISSION_MAX_WAIT_SECONDS,
+        exclude_paths=(settings.METRICS_PATH, f"{settings.API_V1_STR}/student/changes"),
+    )
+if settings.RATE_LIMIT_PER_SECOND > 0:
+    app.add_middleware(
+        RateLimitMiddleware,
+        rate=settings.RATE_LIMIT_PER_SECOND,
+        burst=settings.RATE_LIMIT_BURST,
+        max_clients=settings.RATE_LIMIT_MAX_CLIENTS,
+        exclude_paths=(settings.METRICS_PATH,),
+    )
+# Metrics go last so they wrap every other middleware and see the full request time
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, exclude_paths=(settings.METRICS_PATH,))
+    metrics_registry.register_collector(collect_pool_metrics)
+    metrics_registry.register_collector(collect_student_cache_metrics)
+    metrics_registry.register_collector(collect_student_count_cache_metrics)
+    metrics_registry.register_collector(collect_change_feed_metrics)
+
+    @app.get(settings.METRICS_PATH, include_in_schema=False)
+    async def metrics():
+        # Prometheus text exposition format; rendered only when scraped
+        return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Main route
 @app.get("/")
 async def root():
@@ -0,0 +1,269 @@
+# app/services/async_student_service.py
+
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+from uuid import UUID
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models.student import StudentCreate, StudentRead, StudentUpdate, StudentBulkResponse, StudentFilter
+from src.db.models.student_change import StudentChange
+from src.core.config import settings
+from src.services.student_cache import StudentCache
+from src.services.student_changes import ChangeNotifier
+from src.services.student_count_cache import StudentCountCache
+from src.services.student_service import StudentFields, StudentService, student_read_type
+from src.utils.dataloader import DataLoader
+
+T = TypeVar("T")
+
+# Fields the list filters look at: updating one of them can change a filtered total
+FILTERED_FIELDS = frozenset({"name", "id_semester", "department"})
+
+class AsyncStudentService:
+    """
+    Awaitable counterpart of StudentService used by the async endpoints.
+
+    With an AsyncSession (DATABASE_ASYNC=true) the StudentService logic runs through
+    AsyncSession.run_sync, so the I/O is driven by the async driver on the event loop and
+    no threadpool slot is held while waiting on the database. With a plain Session the
+    same calls are offloaded to the threadpool, which matches the old `def` endpoints.
+
+    When a StudentCache is given, single-student lookups are served from it (a hit never
+    touches the session) and every write invalidates the keys of the rows it touched.
+    When a DataLoader is given, cache misses of get_student_by_id go through it, so concurrent
+    lookups in the worker share one IN query instead of using this session.
+    When a StudentCountCache is given, "cached" listing totals come from it and every write
+    that can change a total drops them.
+    When a ChangeNotifier is given, every committed write wakes this worker's change feed streams.
+    """
+    def __init__(
+        self,
+        session: Union[Session, AsyncSession],
+        cache: Optional[StudentCache] = None,
+        loader: Optional[DataLoader[UUID, StudentRead]] = None,
+        counts: Optional[StudentCountCache] = None,
+        changes: Optional[ChangeNotifier] = None
+    ):
+        self.session = session
+        self.cache = cache
+        self.loader = loader
+        self.counts = counts
+        self.changes = changes
+
+    async def _run(self, call: Callable[[StudentService], T]) -> T:
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(lambda sync_session: call(StudentService(sync_session)))
+        return await run_in_threadpool(call, StudentService(self.session))
+
+    async def _cached_lookup(self, field: str, value, call: Callable[[StudentService], Optional[StudentRead]]) -> Optional[StudentRead]:
+        if self.cache is None:
+            return await self._run(call)
+        student = self.cache.get_by_field(field, value)
+        if student is None:
+            generation = self.cache.generation()
+            student = await self._run(call)
+            if student is not None:
+                self.cache.store(student, generation)
+        return student
+
+    async def create_student(self, student_create: StudentCreate) -> StudentRead:
+        student = await self._run(lambda service: service.create_student(student_create))
+        if self.cache is not None:
+            self.cache.invalidate_student(student)
+        if self.counts is not None:
+            self.counts.invalidate()
+        if self.changes is not None:
+            self.changes.notify()
+        return student
+
+    async def bulk_create_students(self, students_create: List[StudentCreate], upsert: bool = False) -> StudentBulkResponse:
+        response = await self._run(lambda service: service.bulk_create_students(students_create, upsert=upsert))
+        if self.cache is not None:
+            for result in response.results:
+                if result.id is not None:
+                    row = students_create[result.index]
+                    self.cache.invalidate(result.id, row.student_id, row.email)
+        if response.created or response.updated:
+            if self.counts is not None:
+                self.counts.invalidate()
+            if self.changes is not None:
+                self.changes.notify()
+        return response
+
+    async def get_all_students(
+        self, offset: int = 0, limit: int = 100, order_by: str = "created_at", fields: StudentFields = None
+    ) -> List[StudentRead]:
+        return await self._run(
+            lambda service: service.get_all_students(offset=offset, limit=limit, order_by=order_by, fields=fields)
+        )
+
+    async def get_students_page(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        order_by: str = "created_at",
+        after: Optional[List[Any]] = None,
+        filters: Optional[StudentFilter] = None,
+        fields: StudentFields = None
+    ) -> Tuple[List[StudentRead], Optional[List[Any]]]:
+        return await self._run(
+            lambda service: service.get_students_page(
+                limit=limit, offset=offset, order_by=order_by, after=after, filters=filters, fields=fields
+            )
+        )
+
+    async def get_students_page_versions(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        order_by: str = "created_at",
+        after: Optional[List[Any]] = None,
+        filters: Optional[StudentFilter] = None
+    ) -> Tuple[List[Tuple[UUID, datetime]], bool]:
+        return await self._run(
+            lambda service: service.get_students_page_versions(
+                limit=limit, offset=offset, order_by=order_by, after=after, filters=filters
+            )
+        )
+
+    async def iter_students(self, order_by: str = "created_at", filters: Optional[StudentFilter] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        if isinstance(self.session, AsyncSession):
+            dialect = self.session.get_bind().dialect.name
+            result = await self.session.stream(StudentService.export_statement(order_by, filters, dialect))
+            async for partition in result.mappings().partitions():
+                yield partition
+        else:
+            async for partition in iterate_in_threadpool(StudentService(self.session).iter_students(order_by, filters)):
+                yield partition
+
+    async def count_students(self, filters: Optional[StudentFilter] = None) -> int:
+        return await self._run(lambda service: service.count_students(filters))
+
+    async def total_students(self, filters: Optional[StudentFilter] = None, mode: str = "exact") -> Tuple[int, str]:
+        """
+        Total for a listing in the requested mode ("exact", "cached" or "estimate"). Returns the total
+        and the mode that actually produced it: an estimate below STUDENT_COUNT_EXACT_BELOW rows is
+        replaced by an exact count, a missing estimate falls back to "cached", and a cache miss is
+        answered with a fresh (so "exact") count.
+        """
+        if mode == "estimate":
+            estimate = await self._run(lambda service: service.estimate_students(filters))
+            if estimate is not None and estimate >= settings.STUDENT_COUNT_EXACT_BELOW:
+                return estimate, "estimate"
+            mode = "cached" if estimate is None else "exact"
+        if mode == "cached" and self.counts is not None:
+            total, generation = self.counts.get(filters)
+            if total is not None:
+                return total, "cached"
+            total = await self.count_students(filters)
+            self.counts.store(filters, total, generation)
+            return total, "exact"
+        return await self.count_students(filters), "exact"
+
+    async def get_student_by_id(self, student_id: UUID, fields: StudentFields = None) -> Optional[StudentRead]:
+        """
+        With `fields`, a cached student is projected onto the fieldset; a miss reads only those columns
+        (bypassing the loader) and is not cached, since the cache holds whole students.
+        """
+        if self.cache is not None:
+            student = self.cache.get(student_id)
+            if student is not None:
+                return student_read_type(fields).model_validate(student) if fields is not None else student
+        if fields is not None:
+            return await self._run(lambda service: service.get_student_by_id(student_id, fields=fields))
+        # Taken before the read: a write that lands while it runs keeps the result out of the cache
+        generation = self.cache.generation() if self.cache is not None else None
+        if self.loader is not None:
+            student = await self.loader.load(student_id)
+        else:
+            student = await self._run(lambda service: service.get_student_by_id(student_id))
+        if student is not None and self.cache is not None:
+            self.cache.store(student, generation)
+        return student
+
+    async def get_student_version(self, student_id: UUID) -> Optional[datetime]:
+        # Served from the cached record, which keeps updated_at in every backend
+        if self.cache is not None:
+            student = self.cache.get(student_id)
+            if student is not None and student.updated_at is not None:
+                return student.updated_at
+        return await self._run(lambda service: service.get_student_version(student_id))
+
+    async def get_students_by_ids(self, student_ids: List[UUID], fields: StudentFields = None) -> List[StudentRead]:
+        """
+        Cached students plus one IN query for the rest; unknown ids are skipped, order is not preserved.
+        With `fields` the students are projected onto the fieldset, and the rest are read column-only and not cached.
+        """
+        students: List[StudentRead] = []
+        remaining = student_ids
+        if self.cache is not None:
+            read_type = student_read_type(fields)
+            remaining = []
+            for student_id in student_ids:
+                student = self.cache.get(student_id)
+                if student is None:
+                    remaining.append(student_id)
+                else:
+                    students.append(read_type.model_validate(student) if fields is not None else student)
+        if remaining:
+            generation = self.cache.generation() if self.cache is not None else None
+            loaded = await self._run(lambda service: service.get_students_by_ids(remaining, fields=fields))
+            if self.cache is not None and fields is None:
+                for student in loaded:
+                    self.cache.store(student, generation)
+            students.extend(loaded)
+        return students
+
+    async def get_student_by_email(self, email: str) -> Optional[StudentRead]:
+        return await self._cached_lookup(
+            "email", email, lambda service: service.get_student_by_email(email)
+        )
+
+    async def get_student_by_email_and_id(self, email: str, student_id) -> Optional[StudentRead]:
+        if self.cache is not None:
+            student = self.cache.get_by_field("email", email)
+            if student is not None and student.student_id == student_id:
+                return student
+        generation = self.cache.generation() if self.cache is not None else None
+        student = await self._run(lambda service: service.get_student_by_email_and_id(email, student_id))
+        if student is not None and self.cache is not None:
+            self.cache.store(student, generation)
+        return student
+
+    async def update_student(
+        self,
+        student_id: UUID,
+        student_update: StudentUpdate,
+        if_match: Optional[List[datetime]] = None
+    ) -> Optional[StudentRead]:
+        student = await self._run(lambda service: service.update_student(student_id, student_update, if_match=if_match))
+        if self.cache is not None:
+            # Old student_id/email keys still point at this id; they fail validation once the record is gone
+            self.cache.invalidate(student_id)
+            if student is not None:
+                self.cache.invalidate_student(student)
+        if self.counts is not None and student is not None and FILTERED_FIELDS & student_update.model_fields_set:
+            self.counts.invalidate()
+        if self.changes is not None and student is not None:
+            self.changes.notify()
+        return student
+
+    async def delete_student(self, student_id: UUID) -> bool:
+        deleted = await self._run(lambda service: service.delete_student(student_id))
+        if self.cache is not None:
+            self.cache.invalidate(student_id)
+        if self.counts is not None and deleted:
+            self.counts.invalidate()
+        if self.changes is not None and deleted:
+            self.changes.notify()
+        return deleted
+
+    async def get_student_changes(self, after: int, limit: int = 500) -> List[StudentChange]:
+        return await self._run(lambda service: service.get_student_changes(after, limit=limit))
+
+    async def get_student_change_bounds(self) -> Tuple[Optional[int], Optional[int]]:
+        return await self._run(lambda service: service.get_student_change_bounds())
+
+    async def prune_student_changes(self, before: datetime) -> int:
+        return await self._run(lambda service: service.prune_student_changes(before))
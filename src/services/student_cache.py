@@ -0,0 +1,158 @@
+# app/services/student_cache.py
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID, uuid4
+from src.core.cache import CacheBackend, create_cache_backend
+from src.core.config import settings
+from src.db.models.student import StudentRead
+
+_GENERATION_KEY = "student:generation"
+
+# CachedStudent is a StudentRead as stored in the cache. StudentRead never serializes updated_at, so
+# this copy does: a hit from a shared backend can still answer ETag/Last-Modified and 304 checks
+class CachedStudent(StudentRead):
+    updated_at: Optional[datetime] = None
+
+class StudentCache:
+    """
+    Read-through cache for single-student lookups.
+
+    Records are stored once under their primary key; lookups by student_id or email go through
+    secondary keys that only hold the primary key. A secondary hit is trusted only if the record
+    it points to still carries the looked-up value, so stale secondaries left behind by an
+    update or delete simply turn into misses.
+
+    Fills are guarded by a generation token, as in StudentCountCache: callers read generation()
+    before going to the database and pass it to store(). Every invalidation replaces the token, so
+    a row read before a concurrent write commits is dropped instead of being served for the TTL.
+    """
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_fills = 0
+
+    @staticmethod
+    def _id_key(student_uuid: Any) -> str:
+        return f"student:id:{student_uuid}"
+
+    @staticmethod
+    def _secondary_key(field: str, value: Any) -> str:
+        return f"student:{field}:{value}"
+
+    def _load(self, student_uuid: Any) -> Optional[StudentRead]:
+        value = self.backend.get(self._id_key(student_uuid))
+        if value is None:
+            return None
+        if isinstance(value, CachedStudent):
+            # In-process backends hand back the stored object; callers get a StudentRead (no validation)
+            return StudentRead.model_construct(**dict(value))
+        return StudentRead.model_validate(value)
+
+    def get(self, student_uuid: Any) -> Optional[StudentRead]:
+        """Looks up a cached student by UUID; returns None on a miss."""
+        student = self._load(student_uuid)
+        if student is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return student
+
+    def get_by_field(self, field: str, value: Any) -> Optional[StudentRead]:
+        """Looks up a cached student by `student_id` or `email`; returns None on a miss."""
+        student = None
+        student_uuid = self.backend.get(self._secondary_key(field, value))
+        if student_uuid is not None:
+            student = self._load(student_uuid)
+            if student is not None and getattr(student, field) != value:
+                student = None
+        if student is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return student
+
+    def generation(self) -> str:
+        generation = self.backend.get(_GENERATION_KEY)
+        if generation is None:
+            generation = uuid4().hex
+            self.backend.set(_GENERATION_KEY, generation)
+        return generation
+
+    def store(self, student: StudentRead, generation: str) -> None:
+        """Caches a student read after generation() returned `generation`, unless a write invalidated since."""
+        if self.backend.get(_GENERATION_KEY) != generation:
+            self.stale_fills += 1
+            return
+        keys = (
+            self._id_key(student.id),
+            self._secondary_key("student_id", student.student_id),
+            self._secondary_key("email", student.email),
+        )
+        self.backend.set(keys[0], CachedStudent.model_construct(**dict(student)))
+        self.backend.set(keys[1], str(student.id))
+        self.backend.set(keys[2], str(student.id))
+        # invalidate() moves the generation before deleting, so a write that raced the sets is seen here
+        if self.backend.get(_GENERATION_KEY) != generation:
+            self.backend.delete(*keys)
+            self.stale_fills += 1
+
+    def invalidate(self, student_uuid: Optional[UUID] = None, student_id: Optional[str] = None, email: Optional[str] = None) -> None:
+        """Drops every key derived from the given values, and voids the generation of fills in flight."""
+        self.backend.set(_GENERATION_KEY, uuid4().hex)
+        keys = []
+        if student_uuid is not None:
+            keys.append(self._id_key(student_uuid))
+        if student_id is not None:
+            keys.append(self._secondary_key("student_id", student_id))
+        if email is not None:
+            keys.append(self._secondary_key("email", email))
+        self.backend.delete(*keys)
+        self.invalidations += 1
+
+    def invalidate_student(self, student: StudentRead) -> None:
+        self.invalidate(student.id, student.student_id, student.email)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "stale_fills": self.stale_fills,
+            "backend": self.backend.stats(),
+        }
+
+
+student_cache: Optional[StudentCache] = None
+_student_cache_initialized = False
+
+def collect_student_cache_metrics():
+    """Metrics collector (see src.core.metrics) exposing the student cache counters at scrape time."""
+    if student_cache is None:
+        return []
+    stats = student_cache.stats()
+    return [
+        ("student_cache_hits_total", "counter", "Student lookups served from the cache.", [({}, stats["hits"])]),
+        ("student_cache_misses_total", "counter", "Student lookups that went to the database.", [({}, stats["misses"])]),
+        ("student_cache_invalidations_total", "counter", "Cache invalidations issued by student writes.", [({}, stats["invalidations"])]),
+        ("student_cache_stale_fills_total", "counter", "Reads not cached because a write landed while they ran.", [({}, stats["stale_fills"])]),
+    ]
+
+def get_student_cache() -> Optional[StudentCache]:
+    """Returns the process-wide StudentCache, or None when STUDENT_CACHE_BACKEND is "none"."""
+    global student_cache, _student_cache_initialized
+    if not _student_cache_initialized:
+        backend = create_cache_backend(
+            settings.STUDENT_CACHE_BACKEND,
+            max_entries=settings.STUDENT_CACHE_MAX_ENTRIES,
+            ttl=settings.STUDENT_CACHE_TTL_SECONDS,
+            redis_url=settings.REDIS_URL,
+        )
+        student_cache = StudentCache(backend) if backend is not None else None
+        _student_cache_initialized = True
+    return student_cache
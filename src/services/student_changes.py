@@ -0,0 +1,168 @@
+# app/services/student_changes.py
+
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional, Set
+
+import structlog
+from sqlalchemy.engine import make_url
+
+from src.core.config import settings
+from src.services.student_service import STUDENT_CHANGES_CHANNEL
+
+try:
+    import asyncpg
+except ImportError:  # Only needed for STUDENT_CHANGES_LISTEN on PostgreSQL
+    asyncpg = None
+
+logger = structlog.get_logger(__name__)
+
+# How often committed changes older than STUDENT_CHANGES_RETENTION_HOURS are deleted
+PRUNE_INTERVAL_SECONDS = 3600.0
+# Delay before the LISTEN connection is re-established after it fails
+LISTEN_RETRY_SECONDS = 5.0
+
+
+def _stopping() -> bool:
+    """
+    True when the current task was cancelled. Cancelling a task while a database call runs in the
+    thread pool can surface as an error from the session cleanup instead of CancelledError.
+    """
+    task = asyncio.current_task()
+    return task is not None and task.cancelling() > 0
+
+
+class ChangeSubscription:
+    """
+    Wake-up flag of one change feed stream. The stream clears it before reading the feed and
+    waits on it when it found nothing, so a change committed in between is never slept through.
+    """
+    def __init__(self, notifier: "ChangeNotifier"):
+        self.notifier = notifier
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    def clear(self) -> None:
+        self.event.clear()
+
+    async def wait(self, timeout: float) -> bool:
+        """True when woken by a change, False when `timeout` seconds passed without one."""
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def __enter__(self) -> "ChangeSubscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.notifier.unsubscribe(self)
+
+
+class ChangeNotifier:
+    """
+    Wakes the change feed streams of this worker when student changes are committed.
+
+    notify() is called after every student write (from the event loop, the threadpool or a
+    PostgreSQL NOTIFY), so it only schedules the wake-ups on each stream's loop. Writes in other
+    workers are picked up by the LISTEN connection, or else by the streams' periodic poll.
+    """
+    def __init__(self):
+        self._subscriptions: Set[ChangeSubscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> ChangeSubscription:
+        subscription = ChangeSubscription(self)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ChangeSubscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    def notify(self) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.event.set)
+            except RuntimeError:  # The stream's loop is already closed
+                self.unsubscribe(subscription)
+
+
+class PostgresChangeListener:
+    """
+    LISTENs on the student changes channel with one dedicated asyncpg connection per worker and
+    wakes the local streams on every NOTIFY. The connection is re-established when it drops;
+    meanwhile the streams fall back to polling, and a wake-up after reconnecting catches them up.
+    """
+    def __init__(self, notifier: ChangeNotifier, database_url: str, retry_seconds: float = LISTEN_RETRY_SECONDS):
+        self.notifier = notifier
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self.retry_seconds = retry_seconds
+
+    async def run(self) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(STUDENT_CHANGES_CHANNEL, lambda *_: self.notifier.notify())
+                logger.info("Listening for student changes", channel=STUDENT_CHANGES_CHANNEL)
+                self.notifier.notify()
+                await closed.wait()
+                logger.warning("Student changes listener connection closed")
+            except asyncio.CancelledError:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+                raise
+            except Exception as e:
+                if _stopping():
+                    raise asyncio.CancelledError() from e
+                logger.warning("Student changes listener failed", error=str(e))
+            await asyncio.sleep(self.retry_seconds)
+
+
+async def prune_student_changes_periodically(prune: Callable[[datetime], Awaitable[int]]) -> None:
+    """Calls `prune` with the STUDENT_CHANGES_RETENTION_HOURS cutoff every PRUNE_INTERVAL_SECONDS."""
+    while True:
+        before = datetime.now(timezone.utc) - timedelta(hours=settings.STUDENT_CHANGES_RETENTION_HOURS)
+        try:
+            pruned = await prune(before)
+            if pruned:
+                logger.info("Pruned student changes", rows=pruned, before=before.isoformat())
+        except Exception as e:
+            if _stopping():
+                raise asyncio.CancelledError() from e  # Shutting down: do not sleep through it
+            logger.warning("Pruning student changes failed", error=str(e))
+        await asyncio.sleep(PRUNE_INTERVAL_SECONDS)
+
+
+change_notifier: Optional[ChangeNotifier] = None
+_change_notifier_initialized = False
+
+
+def collect_change_feed_metrics():
+    """Metrics collector (see src.core.metrics) exposing the open change feed streams at scrape time."""
+    if change_notifier is None:
+        return []
+    return [
+        ("student_change_streams", "gauge", "Open student change feed streams.", [({}, change_notifier.subscribers)]),
+    ]
+
+
+def get_change_notifier() -> Optional[ChangeNotifier]:
+    """Returns the process-wide ChangeNotifier, or None when STUDENT_CHANGES_ENABLED is off."""
+    global change_notifier, _change_notifier_initialized
+    if not _change_notifier_initialized:
+        change_notifier = ChangeNotifier() if settings.STUDENT_CHANGES_ENABLED else None
+        _change_notifier_initialized = True
+    return change_notifier
@@ -0,0 +1,82 @@
+# app/services/student_count_cache.py
+
+import hashlib
+import json
+from typing import Optional, Tuple
+from uuid import uuid4
+from src.core.cache import CacheBackend, create_cache_backend
+from src.core.config import settings
+from src.db.models.student import StudentFilter
+
+_GENERATION_KEY = "student:count:generation"
+
+class StudentCountCache:
+    """
+    Listing totals (COUNT(*) results) cached per filter set.
+
+    Every key embeds a generation token. A student write replaces the token, which orphans all
+    cached totals at once; they simply expire. Callers read the generation before counting and
+    store the total under it, so a total counted while a write lands is never served after it.
+    The "memory" backend is per worker: other workers only see the write once their TTL runs out.
+    """
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(generation: str, filters: Optional[StudentFilter]) -> str:
+        payload = json.dumps(filters.model_dump() if filters is not None else {}, sort_keys=True, separators=(",", ":"))
+        return f"student:count:{generation}:{hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()}"
+
+    def generation(self) -> str:
+        generation = self.backend.get(_GENERATION_KEY)
+        if generation is None:
+            generation = uuid4().hex
+            self.backend.set(_GENERATION_KEY, generation)
+        return generation
+
+    def get(self, filters: Optional[StudentFilter]) -> Tuple[Optional[int], str]:
+        """Returns the cached total (None on a miss) and the generation to store a fresh count under."""
+        generation = self.generation()
+        total = self.backend.get(self._key(generation, filters))
+        if total is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return total, generation
+
+    def store(self, filters: Optional[StudentFilter], total: int, generation: str) -> None:
+        self.backend.set(self._key(generation, filters), total)
+
+    def invalidate(self) -> None:
+        """Drops every cached total."""
+        self.backend.set(_GENERATION_KEY, uuid4().hex)
+        self.invalidations += 1
+
+
+student_count_cache: Optional[StudentCountCache] = None
+_student_count_cache_initialized = False
+
+def collect_student_count_cache_metrics():
+    """Metrics collector (see src.core.metrics) exposing the listing total cache counters at scrape time."""
+    if student_count_cache is None:
+        return []
+    return [
+        ("student_count_cache_hits_total", "counter", "Listing totals served from the cache.", [({}, student_count_cache.hits)]),
+        ("student_count_cache_misses_total", "counter", "Listing totals counted in the database.", [({}, student_count_cache.misses)]),
+    ]
+
+def get_student_count_cache() -> Optional[StudentCountCache]:
+    """Returns the process-wide StudentCountCache, or None when STUDENT_COUNT_CACHE_BACKEND is "none"."""
+    global student_count_cache, _student_count_cache_initialized
+    if not _student_count_cache_initialized:
+        backend = create_cache_backend(
+            settings.STUDENT_COUNT_CACHE_BACKEND,
+            ttl=settings.STUDENT_COUNT_CACHE_TTL_SECONDS,
+            redis_url=settings.REDIS_URL,
+        )
+        student_count_cache = StudentCountCache(backend) if backend is not None else None
+        _student_count_cache_initialized = True
+    return student_count_cache
@@ -0,0 +1,303 @@
+# app/services/student_import.py
+
+import asyncio
+import csv
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from uuid import UUID, uuid4
+
+import aiofiles
+import aiofiles.os
+import structlog
+from fastapi import UploadFile
+from pydantic import ValidationError
+
+from src.core.cache import CacheBackend, create_cache_backend
+from src.core.config import settings
+from src.core.exceptions import ImportFileTooLarge, UnsupportedImportFormat
+from src.core.metrics import student_import_rows_total
+from src.db.models.student import StudentBulkResponse, StudentCreate
+from src.db.models.student_import import StudentImportJob, StudentImportRowError
+
+try:
+    import openpyxl
+except ImportError:  # Excel imports are only available with openpyxl installed
+    openpyxl = None
+
+logger = structlog.get_logger(__name__)
+
+# Columns read from an import file, matching the CSV export; other columns (e.g. the exported id) are ignored
+IMPORT_COLUMNS = ("name", "student_id", "id_semester", "email", "department")
+REQUIRED_COLUMNS = ("name", "student_id", "id_semester", "email")
+# Bytes read from the upload and written to the spool file at a time
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Allowance for the multipart framing and the other form fields around the file, on top of the file
+# size limit, when the request body is capped before it is parsed (see BodyLimitMiddleware)
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Bulk conflict details point at other rows by their index in the batch ("email duplicates row 3")
+BATCH_ROW_REFERENCE = re.compile(r"row (\d+)")
+
+# Writes one validated batch in its own transaction (see AsyncStudentService.bulk_create_students)
+BatchWriter = Callable[[List[StudentCreate], bool], Awaitable[StudentBulkResponse]]
+
+
+def import_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    """"csv" or "xlsx", from the file extension or else the upload's content type."""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv" or (not extension and content_type in ("text/csv", "application/csv")):
+        return "csv"
+    if extension == ".xlsx" or content_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet":
+        if openpyxl is None:
+            raise UnsupportedImportFormat("Excel imports need the openpyxl package; upload a CSV file instead")
+        return "xlsx"
+    raise UnsupportedImportFormat(f"Unsupported import file '{filename}', expected .csv or .xlsx")
+
+
+def _check_header(header: List[str]) -> None:
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"Import file is missing the columns: {', '.join(missing)}")
+
+
+def read_csv_rows(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(line number, record) for every data row of a CSV file with a header row."""
+    with open(path, newline="", encoding="utf-8-sig") as file:
+        reader = csv.DictReader(file)
+        _check_header([column.strip() for column in reader.fieldnames or []])
+        for record in reader:
+            if any(record.values()):
+                yield reader.line_num, {key.strip(): value for key, value in record.items() if key is not None}
+
+
+def read_xlsx_rows(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(row number, record) for every data row of the first sheet of an Excel file with a header row."""
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(value).strip() if value is not None else "" for value in next(rows, ())]
+        _check_header(header)
+        for number, values in enumerate(rows, start=2):
+            if any(value is not None for value in values):
+                yield number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def student_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    """StudentCreate input from a file record: cells as strings, department as JSON text."""
+    fields: Dict[str, Any] = {}
+    for column in IMPORT_COLUMNS:
+        value = record.get(column)
+        if value is None or value == "":
+            continue
+        if column == "department":
+            fields[column] = json.loads(value) if isinstance(value, str) else value
+        elif isinstance(value, float) and value.is_integer():
+            fields[column] = str(int(value))  # Excel stores numeric ids as floats
+        else:
+            fields[column] = str(value).strip()
+    return fields
+
+
+def validate_rows(rows: List[Tuple[int, Dict[str, Any]]]) -> Tuple[List[Tuple[int, StudentCreate]], List[StudentImportRowError]]:
+    valid: List[Tuple[int, StudentCreate]] = []
+    errors: List[StudentImportRowError] = []
+    for number, record in rows:
+        try:
+            valid.append((number, StudentCreate.model_validate(student_fields(record))))
+        except ValidationError as e:
+            detail = "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors())
+            errors.append(StudentImportRowError(row=number, status="invalid", detail=detail))
+        except ValueError as e:
+            errors.append(StudentImportRowError(row=number, status="invalid", detail=f"department: {e}"))
+    return valid, errors
+
+
+class StudentImportStore:
+    """Import jobs by id, in a cache backend so that any worker can report a job's progress."""
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    def get(self, job_id: UUID) -> Optional[StudentImportJob]:
+        job = self.backend.get(f"student:import:{job_id}")
+        return StudentImportJob.model_validate(job) if job is not None else None
+
+    def save(self, job: StudentImportJob) -> None:
+        self.backend.set(f"student:import:{job.id}", job.model_dump(mode="json"))
+
+
+class StudentImporter:
+    """
+    Runs student imports from uploaded CSV/Excel files as background jobs.
+
+    accept() streams the upload to a spool file in fixed-size chunks, so a large file never sits in
+    memory, and schedules the job. A job reads and validates the file STUDENT_IMPORT_BATCH_SIZE rows
+    at a time on the shared thread pool, one batch ahead of the database: while a batch is written in
+    its own transaction, the next one is already being parsed. Invalid rows and conflicts are reported
+    per row; progress is saved to the store after every batch.
+    """
+    def __init__(
+        self,
+        store: StudentImportStore,
+        directory: str,
+        batch_size: int = 1000,
+        workers: int = 2,
+        max_jobs: int = 2,
+        max_bytes: int = 100 * 1024 * 1024,
+        max_errors: int = 1000
+    ):
+        self.store = store
+        self.directory = directory
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.max_errors = max_errors
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="student-import")
+        self._slots = asyncio.Semaphore(max_jobs)
+        self._tasks: Set[asyncio.Task] = set()
+        os.makedirs(directory, exist_ok=True)
+
+    async def accept(self, upload: UploadFile, upsert: bool, write_batch: BatchWriter) -> StudentImportJob:
+        job = StudentImportJob(
+            id=uuid4(),
+            filename=upload.filename,
+            format=import_format(upload.filename, upload.content_type),
+            upsert=upsert,
+            submitted_at=datetime.now(timezone.utc),
+        )
+        path = os.path.join(self.directory, f"{job.id}.{job.format}")
+        try:
+            async with aiofiles.open(path, "wb") as spool:
+                while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+                    job.bytes += len(chunk)
+                    if job.bytes > self.max_bytes:
+                        raise ImportFileTooLarge(f"Import files are limited to {self.max_bytes} bytes")
+                    await spool.write(chunk)
+        except BaseException:
+            await aiofiles.os.remove(path)
+            raise
+        self.store.save(job)
+        logger.info("Student import accepted", job_id=job.id, format=job.format, bytes=job.bytes, upsert=upsert)
+        task = asyncio.create_task(self._run(job, path, write_batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def _reject(self, job: StudentImportJob, errors: List[StudentImportRowError]) -> None:
+        for error in errors:
+            if error.status == "invalid":
+                job.invalid += 1
+            else:
+                job.conflicts += 1
+            student_import_rows_total.inc(outcome=error.status)
+        job.errors.extend(errors[:max(self.max_errors - len(job.errors), 0)])
+
+    async def _write(self, job: StudentImportJob, batch: List[Tuple[int, StudentCreate]], write_batch: BatchWriter) -> None:
+        try:
+            response = await write_batch([student for _, student in batch], job.upsert)
+        except ValueError as e:
+            # The batch lost a race with a concurrent write and was rolled back as a whole
+            self._reject(job, [StudentImportRowError(row=number, status="conflict", detail=str(e)) for number, _ in batch])
+            return
+        job.created += response.created
+        job.updated += response.updated
+        student_import_rows_total.inc(response.created, outcome="created")
+        student_import_rows_total.inc(response.updated, outcome="updated")
+        self._reject(job, [
+            StudentImportRowError(
+                row=batch[result.index][0],
+                status="conflict",
+                detail=BATCH_ROW_REFERENCE.sub(lambda match: f"row {batch[int(match.group(1))][0]}", result.detail or "conflict"),
+            )
+            for result in response.results if result.status == "conflict"
+        ])
+
+    async def _run(self, job: StudentImportJob, path: str, write_batch: BatchWriter) -> None:
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            job.status = "running"
+            job.started_at = datetime.now(timezone.utc)
+            self.store.save(job)
+            started = time.monotonic()
+            rows = read_xlsx_rows(path) if job.format == "xlsx" else read_csv_rows(path)
+            # A cancelled job can still have a batch being read on the pool; closing waits for it
+            reading = threading.Lock()
+
+            def next_batch():
+                with reading:
+                    batch = list(islice(rows, self.batch_size))
+                return len(batch), validate_rows(batch)
+
+            def close_rows():
+                with reading:
+                    rows.close()
+
+            try:
+                pending = loop.run_in_executor(self.executor, next_batch)
+                while True:
+                    count, (valid, errors) = await pending
+                    if not count:
+                        break
+                    pending = loop.run_in_executor(self.executor, next_batch)
+                    self._reject(job, errors)
+                    if valid:
+                        await self._write(job, valid, write_batch)
+                    job.rows += count
+                    job.rows_per_second = round(job.rows / max(time.monotonic() - started, 1e-6), 1)
+                    self.store.save(job)
+                job.status = "completed"
+            except asyncio.CancelledError:
+                job.status, job.detail = "failed", "Import interrupted by shutdown"
+                raise
+            except Exception as e:
+                job.status, job.detail = "failed", str(e)
+                logger.warning("Student import failed", job_id=job.id, error=str(e))
+            finally:
+                await loop.run_in_executor(self.executor, close_rows)
+                job.finished_at = datetime.now(timezone.utc)
+                self.store.save(job)
+                await aiofiles.os.remove(path)
+        logger.info(
+            "Student import finished",
+            job_id=job.id, status=job.status, rows=job.rows, created=job.created, updated=job.updated,
+            invalid=job.invalid, conflicts=job.conflicts, rows_per_second=job.rows_per_second
+        )
+
+    async def close(self) -> None:
+        """Cancels the running jobs (they are reported as failed) and stops the thread pool."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+student_importer: Optional[StudentImporter] = None
+_student_importer_initialized = False
+
+
+def get_student_importer() -> StudentImporter:
+    """Returns the process-wide StudentImporter."""
+    global student_importer, _student_importer_initialized
+    if not _student_importer_initialized:
+        backend = create_cache_backend(
+            settings.STUDENT_IMPORT_BACKEND, ttl=settings.STUDENT_IMPORT_TTL_SECONDS, redis_url=settings.REDIS_URL
+        )
+        student_importer = StudentImporter(
+            StudentImportStore(backend),
+            settings.STUDENT_IMPORT_DIR or os.path.join(tempfile.gettempdir(), "student-imports"),
+            batch_size=settings.STUDENT_IMPORT_BATCH_SIZE,
+            workers=settings.STUDENT_IMPORT_WORKERS,
+            max_jobs=settings.STUDENT_IMPORT_MAX_JOBS,
+            max_bytes=settings.STUDENT_IMPORT_MAX_BYTES,
+            max_errors=settings.STUDENT_IMPORT_MAX_ERRORS,
+        )
+        _student_importer_initialized = True
+    return student_importer
@@ -1,13 +1,127 @@
 # app/services/student_service.py
 
-from typing import List, Optional, Dict, Any
-from uuid import UUID
-from sqlmodel import Session, select
-from src.db.models.student import Student, StudentCreate, StudentRead, StudentUpdate
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Dict, Any, Tuple, Type
+from uuid import UUID, uuid4
+from sqlalchemy import ColumnElement, Select, delete, func, insert as sql_insert, or_, text, tuple_, type_coerce, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel, select
+from src.core.config import settings
+from src.core.exceptions import StudentConflict, StudentVersionConflict
+from src.db.explain import Explain, postgresql_plan
+from src.db.routing import read_only
+from src.db.models.student import (
+    Student, StudentCreate, StudentRead, StudentUpdate, StudentBulkResult, StudentBulkResponse, StudentFilter,
+    student_read_model
+)
+from src.db.models.student_change import StudentChange
+from src.utils.etag import as_utc
 import structlog
 
 logger = structlog.get_logger(__name__)
 
+# Supported list orderings. Each ends with the primary key so the ordering is total,
+# and each is backed by a composite index (ix_student_created_at_id, ix_student_name_id).
+STUDENT_SORT_COLUMNS = {
+    "created_at": (Student.created_at, Student.id),
+    "name": (Student.name, Student.id),
+}
+
+def sort_key(order_by: str, key: Any) -> List[Any]:
+    """
+    The sort key of a cursor (the `after` of get_students_page) checked against the columns of
+    `order_by` and coerced to their types. Raises ValueError when it does not fit them.
+    """
+    columns = STUDENT_SORT_COLUMNS[order_by]
+    if not isinstance(key, list) or len(key) != len(columns):
+        raise ValueError(f"key must be a list of {len(columns)} values for order_by={order_by}")
+    values = []
+    for column, value in zip(columns, key):
+        # TypeDecorators such as sqlmodel's AutoString only know their type through the type they wrap
+        python_type = getattr(column.type, "impl_instance", column.type).python_type
+        try:
+            if isinstance(value, python_type):
+                pass
+            elif python_type is datetime and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            elif python_type is UUID and isinstance(value, str):
+                value = UUID(value)
+            else:
+                raise TypeError
+        except (TypeError, ValueError):
+            raise ValueError(f"key value {value!r} does not fit {column.key}") from None
+        # Cursors issued on SQLite carry naive datetimes; asyncpg only binds aware ones
+        values.append(as_utc(value) if python_type is datetime else value)
+    return values
+
+def is_unique_violation(error: IntegrityError) -> bool:
+    """Whether an IntegrityError is a unique violation (student_id/email taken) rather than another constraint."""
+    orig = error.orig
+    # psycopg2 exposes pgcode, psycopg 3 and SQLAlchemy's asyncpg adapter sqlstate; SQLite only has the message
+    code = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+    if code is not None:
+        return code == "23505"
+    return str(orig).startswith("UNIQUE constraint failed")
+
+# Columns emitted by the export, in StudentRead field order
+EXPORT_COLUMNS = (Student.name, Student.student_id, Student.id_semester, Student.email, Student.department, Student.id)
+
+# Dialect-specific INSERT constructs that support ON CONFLICT, used by the bulk path
+DIALECT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+# Columns overwritten when a bulk upsert hits an existing student_id
+BULK_UPSERT_COLUMNS = ("name", "id_semester", "email", "department", "updated_at")
+
+# PostgreSQL advisory lock serializing change feed appends, and the channel NOTIFY'd on commit
+STUDENT_CHANGES_LOCK_KEY = 7_305_117
+STUDENT_CHANGES_CHANNEL = "student_changes"
+
+# A sparse fieldset: StudentRead field names in STUDENT_READ_FIELDS order, None for every field
+StudentFields = Optional[Tuple[str, ...]]
+
+def student_select(fields: StudentFields = None, *extra_columns) -> Select:
+    """
+    select(Student), or for a sparse fieldset a column-only SELECT of its columns plus id and
+    updated_at (and `extra_columns`), so unrequested columns such as department are never read or decoded.
+    """
+    if fields is None:
+        return select(Student)
+    columns = [getattr(Student, name) for name in fields] + [Student.id, Student.updated_at, *extra_columns]
+    return select(*dict.fromkeys(columns))
+
+def student_read_type(fields: StudentFields = None) -> Type[SQLModel]:
+    """The read model for rows of student_select(fields)."""
+    return StudentRead if fields is None else student_read_model(fields)
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def student_filter_conditions(filters: Optional[StudentFilter], dialect: str) -> List[ColumnElement]:
+    """
+    WHERE conditions for the list/export filters, shaped so PostgreSQL can use the filter indexes:
+    ILIKE with a literal pattern for the trigram index on name, and JSONB containment (@>)
+    for the GIN index on department. Other databases compare the extracted department values.
+    """
+    if filters is None:
+        return []
+    conditions = []
+    if filters.name:
+        escaped = _escape_like(filters.name)
+        pattern = f"{escaped}%" if filters.name_match == "prefix" else f"%{escaped}%"
+        conditions.append(Student.name.ilike(pattern, escape="\\"))
+    if filters.id_semester is not None:
+        conditions.append(Student.id_semester == filters.id_semester)
+    if filters.department:
+        if dialect == "postgresql":
+            conditions.append(type_coerce(Student.department, postgresql.JSONB).contains(filters.department))
+        else:
+            conditions.extend(Student.department[key].as_string() == value for key, value in filters.department.items())
+    return conditions
+
 class StudentService:
     """
     Service class to encapsulate student-related business logic and database operations.
@@ -15,36 +129,324 @@ class StudentService:
     def __init__(self, session: Session):
         self.session = session
 
+    def record_changes(self, changes: List[Dict[str, Any]]) -> None:
+        """
+        Appends change feed rows (student_uuid, operation, data) to the current transaction.
+
+        Called as the last statement before the commit. On PostgreSQL it first takes a transaction
+        advisory lock, held until the commit, so change rows become visible in `seq` order and a feed
+        reader that has seen seq N never misses a smaller seq committed later; the NOTIFY is delivered
+        at commit. SQLite serializes writers anyway.
+        """
+        if not settings.STUDENT_CHANGES_ENABLED or not changes:
+            return
+        if self.session.get_bind().dialect.name == "postgresql":
+            self.session.exec(text("SELECT pg_advisory_xact_lock(:key)"), params={"key": STUDENT_CHANGES_LOCK_KEY})
+            self.session.exec(text(f"NOTIFY {STUDENT_CHANGES_CHANNEL}"))
+        now = datetime.now(timezone.utc)
+        self.session.exec(sql_insert(StudentChange), params=[{**change, "created_at": now} for change in changes])
+
     def create_student(self, student_create: StudentCreate) -> StudentRead:
         try:
             db_student = Student.model_validate(student_create)
             self.session.add(db_student)
+            self.session.flush()
+            # Every column is set client-side, so the student is complete without a refresh SELECT
+            student = StudentRead.model_validate(db_student)
+            self.record_changes([
+                {"student_uuid": student.id, "operation": "created", "data": student.model_dump(mode="json")}
+            ])
             self.session.commit()
-            self.session.refresh(db_student)
-            return StudentRead.model_validate(db_student)
+            return student
         except Exception as e:
             self.session.rollback()
             raise ValueError(f"An unexpected error occurred: {e}")
 
-    def get_all_students(self, offset: int = 0, limit: int = 100) -> List[StudentRead]:
+    def bulk_create_students(self, students_create: List[StudentCreate], upsert: bool = False) -> StudentBulkResponse:
+        """
+        Inserts (or, with upsert=True, inserts-or-updates by student_id) many students in one transaction.
+
+        Rows are written with batched multi-row INSERT ... ON CONFLICT statements instead of one
+        INSERT/COMMIT/SELECT per student. Rows that would violate the student_id/email unique
+        constraints are reported per row as conflicts rather than failing the whole request.
+        """
+        dialect = self.session.get_bind().dialect.name
+        if dialect not in DIALECT_INSERTS:
+            raise ValueError(f"Bulk insert is not supported on '{dialect}'")
+        insert = DIALECT_INSERTS[dialect]
+        table = Student.__table__
+        batch_size = settings.STUDENT_BULK_BATCH_SIZE
+
+        results: List[Optional[StudentBulkResult]] = [None] * len(students_create)
+
+        def conflict(index: int, detail: str):
+            results[index] = StudentBulkResult(index=index, status="conflict", detail=detail)
+
+        # Reject rows that collide with an earlier row of the same request
+        candidates: Dict[int, StudentCreate] = {}
+        seen_student_ids: Dict[str, int] = {}
+        seen_emails: Dict[str, int] = {}
+        for index, student_create in enumerate(students_create):
+            if student_create.student_id in seen_student_ids:
+                conflict(index, f"student_id duplicates row {seen_student_ids[student_create.student_id]}")
+            elif student_create.email in seen_emails:
+                conflict(index, f"email duplicates row {seen_emails[student_create.email]}")
+            else:
+                seen_student_ids[student_create.student_id] = index
+                seen_emails[student_create.email] = index
+                candidates[index] = student_create
+
+        # Look up existing owners of the requested keys (chunked to bound the IN lists)
+        existing_by_student_id: Dict[str, str] = {}  # student_id -> email
+        existing_by_email: Dict[str, str] = {}  # email -> student_id
+        candidate_list = list(candidates.values())
+        for start in range(0, len(candidate_list), batch_size):
+            chunk = candidate_list[start:start + batch_size]
+            rows = self.session.exec(
+                select(Student.student_id, Student.email)
+                .where(or_(
+                    Student.student_id.in_([s.student_id for s in chunk]),
+                    Student.email.in_([s.email for s in chunk]),
+                ))
+            ).all()
+            for student_id, email in rows:
+                existing_by_student_id[student_id] = email
+                existing_by_email[email] = student_id
+
+        # Rows are built as plain dicts: validating a Student table model per row costs more than the INSERT
+        now = datetime.now(timezone.utc)
+        to_write: Dict[int, Dict[str, Any]] = {}
+        for index, student_create in candidates.items():
+            email_owner = existing_by_email.get(student_create.email)
+            if student_create.student_id in existing_by_student_id and not upsert:
+                conflict(index, "student_id already exists")
+            elif email_owner is not None and email_owner != student_create.student_id:
+                conflict(index, "email already exists")
+            else:
+                to_write[index] = {**student_create.model_dump(), "id": uuid4(), "created_at": now, "updated_at": now}
+
+        statement = insert(table)
+        if upsert:
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.student_id],
+                set_={column: statement.excluded[column] for column in BULK_UPSERT_COLUMNS},
+            )
+        else:
+            # Rows inserted concurrently by another request are skipped and reported below
+            statement = statement.on_conflict_do_nothing()
+        statement = statement.returning(table.c.id, table.c.student_id)
+
+        written: Dict[str, UUID] = {}
+        pending = list(to_write.items())
+        try:
+            for start in range(0, len(pending), batch_size):
+                rows = [row for _, row in pending[start:start + batch_size]]
+                for student_uuid, student_id in self.session.exec(statement, params=rows):
+                    written[student_id] = student_uuid
+            self.record_changes([
+                {
+                    "student_uuid": written[row["student_id"]],
+                    "operation": "updated" if row["student_id"] in existing_by_student_id else "created",
+                    "data": {
+                        **{field: row[field] for field in ("name", "student_id", "id_semester", "email", "department")},
+                        "id": str(written[row["student_id"]]),
+                    },
+                }
+                for row in to_write.values() if row["student_id"] in written
+            ])
+            self.session.commit()
+        except IntegrityError as e:
+            self.session.rollback()
+            raise ValueError(f"Bulk write conflicted with a concurrent change: {e.orig}")
+
+        for index, row in to_write.items():
+            student_uuid = written.get(row["student_id"])
+            if student_uuid is None:
+                conflict(index, "student_id or email already exists")
+            elif row["student_id"] in existing_by_student_id:
+                results[index] = StudentBulkResult(index=index, status="updated", id=student_uuid)
+            else:
+                results[index] = StudentBulkResult(index=index, status="created", id=student_uuid)
+
+        response = StudentBulkResponse(results=results)
+        for result in results:
+            if result.status == "created":
+                response.created += 1
+            elif result.status == "updated":
+                response.updated += 1
+            else:
+                response.conflicts += 1
+        logger.info(
+            "Bulk student write finished",
+            rows=len(students_create), created=response.created, updated=response.updated, conflicts=response.conflicts
+        )
+        return response
+
+    @read_only
+    def get_all_students(
+        self, offset: int = 0, limit: int = 100, order_by: str = "created_at", fields: StudentFields = None
+    ) -> List[StudentRead]:
         students = self.session.exec(
-            select(Student)
+            student_select(fields, *STUDENT_SORT_COLUMNS[order_by])
+            .order_by(*STUDENT_SORT_COLUMNS[order_by])
             .offset(offset)
             .limit(limit)
         ).all()
-        return [StudentRead.model_validate(student) for student in students]
+        read_type = student_read_type(fields)
+        return [read_type.model_validate(student) for student in students]
+
+    @read_only
+    def get_students_page(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        order_by: str = "created_at",
+        after: Optional[List[Any]] = None,
+        filters: Optional[StudentFilter] = None,
+        fields: StudentFields = None
+    ) -> Tuple[List[StudentRead], Optional[List[Any]]]:
+        """
+        Fetches one page of students (matching `filters`, if given) in a deterministic order.
+
+        When `after` (a sort key returned by a previous call) is given, the page is read with a
+        keyset seek on the ordering index instead of OFFSET, so deep pages cost the same as the first.
+        With `fields` only those columns are read and the page holds student_read_model(fields) rows.
+        Returns the page and the sort key of its last row, or None when no further rows exist.
+        """
+        sort_columns = STUDENT_SORT_COLUMNS[order_by]
+        students = self.session.exec(
+            self.page_statement(self.filtered(student_select(fields, *sort_columns), filters), limit, offset, order_by, after)
+        ).all()
+        next_key = None
+        if len(students) > limit:
+            students = students[:limit]
+            next_key = [getattr(students[-1], column.key) for column in sort_columns]
+        read_type = student_read_type(fields)
+        return [read_type.model_validate(student) for student in students], next_key
+
+    @read_only
+    def get_students_page_versions(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        order_by: str = "created_at",
+        after: Optional[List[Any]] = None,
+        filters: Optional[StudentFilter] = None
+    ) -> Tuple[List[Tuple[UUID, datetime]], bool]:
+        """
+        Column-only counterpart of get_students_page for conditional requests: returns the
+        (id, updated_at) pairs of the same page and whether another page follows.
+        """
+        rows = self.session.exec(
+            self.page_statement(self.filtered(select(Student.id, Student.updated_at), filters), limit, offset, order_by, after)
+        ).all()
+        return [tuple(row) for row in rows[:limit]], len(rows) > limit
+
+    def filtered(self, statement: Select, filters: Optional[StudentFilter]) -> Select:
+        conditions = student_filter_conditions(filters, self.session.get_bind().dialect.name)
+        return statement.where(*conditions) if conditions else statement
+
+    @staticmethod
+    def page_statement(statement: Select, limit: int, offset: int, order_by: str, after: Optional[List[Any]]) -> Select:
+        """Applies the page ordering and position to `statement`, reading one extra row to detect a next page."""
+        sort_columns = STUDENT_SORT_COLUMNS[order_by]
+        statement = statement.order_by(*sort_columns)
+        if after is not None:
+            statement = statement.where(tuple_(*sort_columns) > tuple_(*after))
+        else:
+            statement = statement.offset(offset)
+        return statement.limit(limit + 1)
 
-    def get_student_by_id(self, student_id: str) -> Optional[StudentRead]:
+    @staticmethod
+    def export_statement(order_by: str = "created_at", filters: Optional[StudentFilter] = None, dialect: str = "") -> Select:
+        """Column-only SELECT used for exports: plain rows, no ORM objects in the identity map."""
+        return (
+            select(*EXPORT_COLUMNS)
+            .where(*student_filter_conditions(filters, dialect))
+            .order_by(*STUDENT_SORT_COLUMNS[order_by])
+            .execution_options(stream_results=True, yield_per=settings.STUDENT_EXPORT_BATCH_SIZE)
+        )
 
+    def iter_students(self, order_by: str = "created_at", filters: Optional[StudentFilter] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yields every student (matching `filters`, if given) as batches of row mappings, read through
+        a server-side cursor so memory stays bounded by STUDENT_EXPORT_BATCH_SIZE regardless of table size.
+        """
+        result = self.session.exec(self.export_statement(order_by, filters, self.session.get_bind().dialect.name))
+        for partition in result.mappings().partitions():
+            yield partition
+
+    @read_only
+    def count_students(self, filters: Optional[StudentFilter] = None) -> int:
+        return self.session.exec(self.filtered(select(func.count()).select_from(Student), filters)).one()
+
+    @read_only
+    def estimate_students(self, filters: Optional[StudentFilter] = None) -> Optional[int]:
+        """
+        Approximate count of students (matching `filters`, if given) from planner statistics instead
+        of a COUNT(*): on PostgreSQL pg_class.reltuples for the whole table and the planner's row
+        estimate for a filtered list; on SQLite the table size recorded by ANALYZE (unfiltered only).
+        Returns None when no estimate is available, e.g. before the table was first analyzed.
+        """
+        dialect = self.session.get_bind().dialect.name
+        conditions = student_filter_conditions(filters, dialect)
+        if dialect == "postgresql":
+            if not conditions:
+                reltuples = self.session.exec(
+                    text("SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+                    params={"table": Student.__tablename__}
+                ).scalar()
+                # -1 means never vacuumed or analyzed
+                return int(reltuples) if reltuples is not None and reltuples >= 0 else None
+            plan = postgresql_plan(self.session.exec(Explain(select(Student.id).where(*conditions))).scalar())
+            return int(plan["Plan Rows"])
+        if dialect == "sqlite" and not conditions:
+            analyzed = self.session.exec(text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")).first()
+            if analyzed is None:
+                return None
+            stat = self.session.exec(
+                text("SELECT stat FROM sqlite_stat1 WHERE tbl = :table LIMIT 1"), params={"table": Student.__tablename__}
+            ).scalar()
+            # The first number of a sqlite_stat1 row is the row count of the table (or index)
+            return int(stat.split()[0]) if stat else None
+        return None
+
+    @read_only
+    def get_student_by_id(self, student_id: UUID, fields: StudentFields = None) -> Optional[StudentRead]:
+        """Looks up a student by their UUID (primary key), reading only `fields` when given."""
         student = self.session.exec(
-            select(Student)
-            .where(Student.student_id == student_id)
+            student_select(fields)
+            .where(Student.id == student_id)
         ).first()
         if student:
-            return StudentRead.model_validate(student)
+            return student_read_type(fields).model_validate(student)
         return None
 
+    @read_only
+    def get_student_version(self, student_id: UUID) -> Optional[datetime]:
+        """Returns only the student's updated_at (None if it does not exist), for conditional requests."""
+        return self.session.exec(
+            select(Student.updated_at)
+            .where(Student.id == student_id)
+        ).first()
 
+    @read_only
+    def get_students_by_ids(self, student_ids: List[UUID], fields: StudentFields = None) -> List[StudentRead]:
+        """
+        Looks up many students by UUID in one IN query, reading only `fields` when given;
+        unknown ids are skipped, order is not preserved.
+        """
+        if not student_ids:
+            return []
+        students = self.session.exec(
+            student_select(fields)
+            .where(Student.id.in_(student_ids))
+        ).all()
+        read_type = student_read_type(fields)
+        return [read_type.model_validate(student) for student in students]
+
+
+    @read_only
     def get_student_by_email(self, email: str) -> Optional[StudentRead]:
         student = self.session.exec(
             select(Student)
@@ -55,6 +457,7 @@ class StudentService:
             return StudentRead.model_validate(student)
         return None
 
+    @read_only
     def get_student_by_email_and_id(self, email: str, student_id) -> Optional[StudentRead]:
         student = self.session.exec(
             select(Student)
@@ -66,34 +469,93 @@ class StudentService:
             return StudentRead.model_validate(student)
         return None
 
-    def update_student(self, student_id: UUID, student_update: StudentUpdate) -> Optional[StudentRead]:
-        """Updates an existing student record by their UUID."""
-        logger.info(f"Attempting to update student with ID: {student_id}", student_uuid=student_id, update_data=student_update.model_dump(exclude_unset=True))
-        db_student = self.session.get(Student, student_id)
-        if not db_student:
-            logger.warning("Student not found for update", student_uuid=student_id)
-            return None
+    def update_student(
+        self,
+        student_id: UUID,
+        student_update: StudentUpdate,
+        if_match: Optional[List[datetime]] = None
+    ) -> Optional[StudentRead]:
+        """
+        Updates an existing student record by their UUID in a single UPDATE ... RETURNING.
 
-        # Apply updates from the Pydantic model
-        update_data = student_update.model_dump(exclude_unset=True) # Only get fields that were actually set
-        for key, value in update_data.items():
-            setattr(db_student, key, value)
+        With `if_match` (the updated_at versions the caller last read) the row is only updated while
+        its updated_at is still one of them, otherwise StudentVersionConflict is raised. The check is
+        part of the UPDATE's WHERE clause, so no row is locked beyond the statement itself.
+        Returns None when the student does not exist. Raises StudentConflict when the new student_id or
+        email belongs to another student, ValueError when the row breaks any other constraint.
+        """
+        # The update payload is already logged by the endpoint; a constant event name keeps it sampleable
+        logger.info("Attempting to update student", student_uuid=student_id)
+        values = student_update.model_dump(exclude_unset=True) # Only get fields that were actually set
+        # updated_at drives the ETag/Last-Modified validators, so it must move on every write
+        values["updated_at"] = datetime.now(timezone.utc)
+        statement = update(Student).where(Student.id == student_id)
+        if if_match is not None:
+            # Compared in UTC: SQLite compares the stored text, PostgreSQL needs aware values
+            statement = statement.where(Student.updated_at.in_([as_utc(version) for version in if_match]))
+        try:
+            db_student = self.session.exec(statement.values(**values).returning(Student)).scalars().first()
+            # Read before the commit expires the instance, which would cost a refresh SELECT
+            student = StudentRead.model_validate(db_student) if db_student else None
+            if student is not None:
+                self.record_changes([
+                    {"student_uuid": student.id, "operation": "updated", "data": student.model_dump(mode="json")}
+                ])
+            self.session.commit()
+        except IntegrityError as e:
+            self.session.rollback()
+            if is_unique_violation(e):
+                raise StudentConflict(f"Update conflicts with an existing student: {e.orig}")
+            raise ValueError(f"Update violates a constraint: {e.orig}")
 
-        self.session.add(db_student)
-        self.session.commit()
-        self.session.refresh(db_student)
-        logger.info("Student updated successfully", student_uuid=db_student.id)
-        return StudentRead.model_validate(db_student)
+        if student is None:
+            # Only the failure path pays for telling a stale version from a missing student
+            if if_match is not None and self.session.exec(select(Student.id).where(Student.id == student_id)).first():
+                logger.info("Student version mismatch on update", student_uuid=student_id)
+                raise StudentVersionConflict(f"Student {student_id} was modified since the requested version")
+            logger.warning("Student not found for update", student_uuid=student_id)
+            return None
+        logger.info("Student updated successfully", student_uuid=student_id)
+        return student
 
     def delete_student(self, student_id: UUID) -> bool:
-        """Deletes a student record by their UUID."""
-        logger.info(f"Attempting to delete student with ID: {student_id}", student_uuid=student_id)
-        student = self.session.get(Student, student_id)
-        if not student:
+        """Deletes a student record by their UUID in a single DELETE ... RETURNING."""
+        logger.info("Attempting to delete student", student_uuid=student_id)
+        deleted = self.session.exec(
+            delete(Student)
+            .where(Student.id == student_id)
+            .returning(Student.id)
+        ).first()
+        if deleted is None:
             logger.warning("Student not found for deletion", student_uuid=student_id)
             return False
 
-        self.session.delete(student)
+        self.record_changes([{"student_uuid": student_id, "operation": "deleted", "data": None}])
         self.session.commit()
         logger.info("Student deleted successfully", student_uuid=student_id)
-        return True
\ No newline at end of file
+        return True
+
+    @read_only
+    def get_student_changes(self, after: int, limit: int = 500) -> List[StudentChange]:
+        """Change feed rows with seq > `after`, oldest first."""
+        return list(self.session.exec(
+            select(StudentChange)
+            .where(StudentChange.seq > after)
+            .order_by(StudentChange.seq)
+            .limit(limit)
+        ).all())
+
+    @read_only
+    def get_student_change_bounds(self) -> Tuple[Optional[int], Optional[int]]:
+        """Smallest and largest retained change seq; (None, None) when the feed is empty."""
+        # One subquery per bound: SQLite only answers a lone MIN()/MAX() from the index, both together scan
+        first, last = self.session.exec(select(
+            select(func.min(StudentChange.seq)).scalar_subquery(), select(func.max(StudentChange.seq)).scalar_subquery()
+        )).one()
+        return first, last
+
+    def prune_student_changes(self, before: datetime) -> int:
+        """Deletes change feed rows created before `before`; returns how many were removed."""
+        pruned = self.session.exec(delete(StudentChange).where(StudentChange.created_at < before)).rowcount
+        self.session.commit()
+        return pruned
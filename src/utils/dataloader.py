@@ -0,0 +1,66 @@
+# app/utils/dataloader.py
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """
+    Coalesces concurrent single-key loads into batched calls, DataLoader-style.
+
+    Every load() made while the event loop runs the current batch of ready callbacks is queued;
+    the queue is dispatched on the next loop iteration as one `batch_load(keys)` call per
+    `max_batch_size` distinct keys. Callers asking for the same key share one result.
+    batch_load returns a mapping of the keys it found; missing keys resolve to None.
+
+    A loader is bound to the event loop it is first used on.
+    """
+    def __init__(self, batch_load: Callable[[List[K]], Awaitable[Dict[K, V]]], max_batch_size: int = 100):
+        self.batch_load = batch_load
+        self.max_batch_size = max_batch_size
+        self._queue: Dict[K, List[asyncio.Future]] = {}
+        self._dispatch_scheduled = False
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.keys_loaded = 0
+
+    async def load(self, key: K) -> Optional[V]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.setdefault(key, []).append(future)
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(self._dispatch)
+        return await future
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, {}
+        self._dispatch_scheduled = False
+        keys = list(queue)
+        for start in range(0, len(keys), self.max_batch_size):
+            batch = {key: queue[key] for key in keys[start:start + self.max_batch_size]}
+            task = asyncio.ensure_future(self._run_batch(batch))
+            # Keep a reference until the batch finishes so the task is not garbage collected
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: Dict[K, List[asyncio.Future]]) -> None:
+        self.batches += 1
+        self.keys_loaded += len(batch)
+        try:
+            found = await self.batch_load(list(batch))
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for key, futures in batch.items():
+            value = found.get(key)
+            for future in futures:
+                # A caller that was cancelled while waiting has already resolved its future
+                if not future.done():
+                    future.set_result(value)
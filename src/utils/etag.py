@@ -0,0 +1,114 @@
+# app/utils/etag.py
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Content codings CompressionMiddleware may apply; each marks the ETags of its responses (see encoded_etag)
+CONTENT_CODINGS = ("br", "gzip", "deflate")
+
+
+def as_utc(value: datetime) -> datetime:
+    """
+    `value` as an aware UTC datetime. SQLite hands back naive datetimes, which are stored in UTC;
+    normalising keeps validators identical across databases and values bindable by asyncpg.
+    """
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def student_etag(updated_at: datetime) -> str:
+    """
+    Strong ETag of a single student: its updated_at in microseconds since the epoch. The version is
+    readable back from the tag (see parse_if_match), so If-Match is checked by the UPDATE itself.
+    """
+    return f'"{(as_utc(updated_at) - EPOCH) // timedelta(microseconds=1)}"'
+
+
+def page_etag(total: int, has_more: bool, versions: Iterable[Tuple[Any, datetime]]) -> str:
+    """
+    Strong ETag of a list page: the (id, updated_at) of its rows plus the total and whether a next page
+    exists. Everything else in the body follows from the request's query parameters, i.e. from the URL.
+    """
+    digest = hashlib.blake2b(f"{total}:{int(has_more)}".encode("utf-8"), digest_size=16)
+    for student_id, updated_at in versions:
+        digest.update(f"|{student_id}:{as_utc(updated_at).isoformat()}".encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    ETag of a representation compressed with `encoding`: the tag with "-<encoding>" appended inside its
+    quotes. A strong ETag promises byte-identical bodies, so each coding needs a tag of its own.
+    """
+    if len(etag) < 2 or etag[-1] != '"':
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _without_coding(tag: str) -> str:
+    """`tag` with the suffix of encoded_etag removed: the conditional headers name the version, not the coding."""
+    for encoding in CONTENT_CODINGS:
+        if tag.endswith(f'-{encoding}"'):
+            return f'{tag[:-len(encoding) - 2]}"'
+    return tag
+
+
+def student_validators(updated_at: datetime) -> Dict[str, str]:
+    """ETag and Last-Modified headers of a single student."""
+    return {"ETag": student_etag(updated_at), "Last-Modified": http_date(updated_at)}
+
+
+def parse_if_match(if_match: str) -> Optional[List[datetime]]:
+    """
+    The student versions (updated_at values) named by an If-Match header, or None for "*" (any version).
+    If-Match uses strong comparison, so weak and unrecognised tags name no version. Tags of a compressed
+    representation name the version they were derived from.
+    """
+    if if_match.strip() == "*":
+        return None
+    versions = []
+    for candidate in if_match.split(","):
+        tag = _without_coding(candidate.strip())
+        if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit():
+            versions.append(EPOCH + timedelta(microseconds=int(tag[1:-1])))
+    return versions
+
+
+def http_date(value: datetime) -> str:
+    """Formats a datetime as an HTTP date for Last-Modified."""
+    return format_datetime(as_utc(value), usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 prescribes for this header), in any content coding."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(_without_coding(candidate.removeprefix("W/")) == etag for candidate in candidates)
+
+
+def not_modified_since(if_modified_since: str, updated_at: datetime) -> bool:
+    """If-Modified-Since check at HTTP date (whole second) precision; invalid dates never match."""
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return as_utc(updated_at).replace(microsecond=0) <= since
+
+
+def is_not_modified(
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+    etag: str,
+    updated_at: Optional[datetime] = None
+) -> bool:
+    """Evaluates the conditional GET headers; If-None-Match takes precedence over If-Modified-Since."""
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if if_modified_since is not None and updated_at is not None:
+        return not_modified_since(if_modified_since, updated_at)
+    return False
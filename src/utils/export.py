@@ -0,0 +1,34 @@
+# app/utils/export.py
+
+import csv
+import io
+import json
+from typing import Any, Dict, List, Sequence
+
+
+def rows_to_ndjson(rows: List[Dict[str, Any]]) -> str:
+    """
+    Renders rows as newline-delimited JSON, one object per line.
+    Uses the same compact separators and non-ASCII handling as FastAPI's JSONResponse.
+    """
+    return "".join(
+        json.dumps(dict(row), default=str, ensure_ascii=False, separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+def rows_to_csv(rows: List[Dict[str, Any]], columns: Sequence[str], header: bool = False) -> str:
+    """
+    Renders rows as CSV. Dict/list values (e.g. JSON columns) are written as JSON strings.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    for row in rows:
+        writer.writerow([
+            json.dumps(row[column], ensure_ascii=False, separators=(",", ":"))
+            if isinstance(row[column], (dict, list)) else row[column]
+            for column in columns
+        ])
+    return buffer.getvalue()
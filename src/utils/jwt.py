@@ -1,75 +1,208 @@
+import hashlib
+import time
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials  # For Bearer token extraction
 import structlog
 from jose import jwt, JWTError
+from jose.exceptions import JOSEError
 from pydantic import ValidationError
 
+from src.core.cache import TTLLRUCache
+from src.core.config import settings
+from src.core.exceptions import JWKSUnavailable
+from src.core.security import JWKSProvider
 from src.db.models.user import CurrentUser
 
 logger = structlog.get_logger(__name__)
 
 bearer_schema = HTTPBearer()
 
+# Verified tokens keyed by SHA-256 of the raw token; entries never outlive the token's exp
+token_cache = TTLLRUCache(
+    max_entries=settings.JWT_TOKEN_CACHE_MAX_ENTRIES,
+    ttl=settings.JWT_TOKEN_CACHE_TTL_SECONDS
+)
+# Tokens that failed verification, with the error message, so a replayed bad token costs no signature check;
+# the TTL is short because a token can become valid (nbf, a key added to the JWKS)
+rejected_token_cache = TTLLRUCache(
+    max_entries=settings.JWT_TOKEN_CACHE_MAX_ENTRIES,
+    ttl=settings.JWT_REJECTED_TOKEN_CACHE_TTL_SECONDS
+)
+
+jwks_provider: Optional[JWKSProvider] = None
+
+
+class VerifiedToken:
+    """A token that passed verification, with its claims and the CurrentUser built from them."""
+    __slots__ = ("payload", "user")
+
+    def __init__(self, payload: dict):
+        self.payload = payload
+        self.user: Optional[CurrentUser] = None
+
+
+def clear_token_caches() -> None:
+    token_cache.clear()
+    rejected_token_cache.clear()
+
+
+def get_jwks_provider() -> JWKSProvider:
+    global jwks_provider
+    if jwks_provider is None:
+        if not settings.JWT_JWKS_URL:
+            raise JWTError("JWT verification is not configured (JWT_JWKS_URL is not set)")
+        jwks_provider = JWKSProvider(
+            source=settings.JWT_JWKS_URL,
+            refresh_interval=settings.JWKS_REFRESH_SECONDS,
+            on_rotate=clear_token_caches
+        )
+        jwks_provider.start()
+    return jwks_provider
+
+
+def set_jwks_provider(provider: Optional[JWKSProvider]) -> None:
+    """Replaces the key provider, e.g. with an in-memory JWKSProvider(jwks=...) in tests."""
+    global jwks_provider
+    if jwks_provider is not None:
+        jwks_provider.stop()
+    jwks_provider = provider
+    if provider is not None:
+        provider.on_rotate = clear_token_caches
+    clear_token_caches()
+
 
-def verify_access_token(token: str, credentials_exception):
+def decode_access_token(token: str) -> dict:
     """
-    Verifies a JWT access token and returns the payload.
-    Raises credentials_exception if token is invalid or expired.
+    Verifies the token signature against the JWKS and validates exp/nbf/iat (and aud/iss when configured).
+    Raises JOSEError (JWTError, JWKError, ...) if the token is not acceptable and JWKSUnavailable
+    if the keys to check it cannot be fetched.
+    """
+    if not settings.JWT_VERIFY:
+        return jwt.get_unverified_claims(token)
+
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get("alg")
+    if algorithm not in settings.JWT_ALGORITHMS:
+        raise JWTError(f"Algorithm '{algorithm}' is not allowed")
+    key = get_jwks_provider().get_key(header.get("kid"), algorithm)
+    return jwt.decode(
+        token,
+        key,
+        algorithms=settings.JWT_ALGORITHMS,
+        audience=settings.JWT_AUDIENCE,
+        issuer=settings.JWT_ISSUER,
+        options={
+            "verify_aud": settings.JWT_AUDIENCE is not None,
+            "leeway": settings.JWT_LEEWAY_SECONDS,
+        }
+    )
+
+
+def authenticate_token(token: str) -> VerifiedToken:
     """
+    Returns the verified token, serving repeat presentations of the same token from token_cache.
+    Raises JOSEError if the token is not acceptable (again from rejected_token_cache for a while),
+    JWKSUnavailable if it cannot be checked now; that outcome is not cached.
+    """
+    cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    verified = _cached(cache_key)
+    if verified is not None:
+        return verified
+
     try:
-        payload = jwt.decode(token, key="", algorithms=[],
-                    options= {
-                        "verify_signature": False,
-                        "verify_aud": False,
-                        "verify_exp": False,
-                        "verify_nbf": False,
-                        "verify_iat": False,
-                        "verify_at_hash": False,
-                        "verify_jti": False,
-                    }
-                )
-        return payload
-    except JWTError as e:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Could not validate credentials: {e}",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        payload = decode_access_token(token)
+    except JOSEError as e:
+        rejected_token_cache.set(cache_key, str(e))
+        raise
+    verified = VerifiedToken(payload)
+    ttl = settings.JWT_TOKEN_CACHE_TTL_SECONDS
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        ttl = min(ttl, exp + settings.JWT_LEEWAY_SECONDS - time.time())
+    if ttl > 0:
+        token_cache.set(cache_key, verified, ttl=ttl)
+    return verified
 
-def get_current_user_payload(credentials: HTTPAuthorizationCredentials = Depends(bearer_schema)):
+
+def _cached(cache_key: str) -> Optional[VerifiedToken]:
+    error = rejected_token_cache.get(cache_key)
+    if error is not None:
+        raise JWTError(error)  # A new exception each time: re-raising one would grow its traceback
+    return token_cache.get(cache_key)
+
+
+def get_cached_token(token: str) -> Optional[VerifiedToken]:
     """
-    Dependency to get the decoded JWT payload from the request.
-    It verifies the token and raises HTTPException if invalid.
+    Returns the token if it was verified recently and is still in token_cache, raises JWTError if it
+    was rejected recently, and returns None when it must be verified. Never verifies anything.
     """
-    credentials_exception = HTTPException(
+    return _cached(hashlib.sha256(token.encode("utf-8")).hexdigest())
+
+
+def invalid_credentials(error: JOSEError) -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
+        detail=f"Could not validate credentials: {error}",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    # Verify the token using your security logic
-    payload = verify_access_token(credentials.credentials, credentials_exception)
-    return payload
 
-def get_current_user(payload: dict = Depends(get_current_user_payload)) -> CurrentUser:
+def verification_unavailable(error: JWKSUnavailable) -> HTTPException:
+    # The token may well be valid: tell the client to retry instead of to re-authenticate
+    logger.warning("Token verification unavailable", error=str(error))
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Token verification is temporarily unavailable",
+        headers={"Retry-After": "5"},
+    )
+
+
+def verify_access_token(token: str) -> dict:
+    """
+    Verifies a JWT access token and returns the payload.
+    Raises HTTPException: 401 if the token is invalid or expired, 503 if it cannot be checked now.
+    """
     try:
-        current_user_data = {
-            "email": payload.get("email"),
-            "username": payload.get("preferred_username"),  # Maps to 'username' in CurrentUser
-            "name": payload.get("name"),  # Maps to 'fullname' in CurrentUser
-            "id": payload.get("sub")  # 'sub' is a common standard claim for unique user ID
-        }
-        user = CurrentUser(**current_user_data)
-        return user
+        return authenticate_token(token).payload
+    except JOSEError as e:
+        raise invalid_credentials(e)
+    except JWKSUnavailable as e:
+        raise verification_unavailable(e)
+
+def get_current_user_payload(credentials: HTTPAuthorizationCredentials = Depends(bearer_schema)):
+    """
+    Dependency to get the decoded JWT payload from the request.
+    It verifies the token and raises HTTPException if invalid.
+    """
+    return verify_access_token(credentials.credentials)
+
+def build_current_user(payload: dict) -> CurrentUser:
+    current_user_data = {
+        "email": payload.get("email"),
+        "username": payload.get("preferred_username"),  # Maps to 'username' in CurrentUser
+        "name": payload.get("name"),  # Maps to 'fullname' in CurrentUser
+        "id": payload.get("sub")  # 'sub' is a common standard claim for unique user ID
+    }
+    return CurrentUser(**current_user_data)
 
+def user_for_token(verified: VerifiedToken) -> CurrentUser:
+    """The CurrentUser of a verified token, built once per cached token. Raises ValidationError on bad claims."""
+    if verified.user is None:
+        verified.user = build_current_user(verified.payload)
+    return verified.user
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_schema)) -> CurrentUser:
+    try:
+        return user_for_token(authenticate_token(credentials.credentials))
+    except JOSEError as e:
+        raise invalid_credentials(e)
+    except JWKSUnavailable as e:
+        raise verification_unavailable(e)
     except ValidationError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Token payload invalid or missing required user claims: {e.errors()}",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Unable to continue data processing."
-        )
\ No newline at end of file
@@ -1,7 +1,11 @@
 # app/utils/pagination.py
 
+import base64
+import json
+from datetime import datetime
 from math import ceil
-from typing import List, TypeVar, Generic, Optional, Type
+from typing import Any, Dict, List, TypeVar, Generic, Optional, Type
+from uuid import UUID
 
 # Assuming your PaginatedResponse model is defined here:
 from src.db.models.pagination import PaginatedResponse
@@ -17,7 +21,9 @@ def create_paginated_response(
         total_count: int,
         offset: int,
         limit: int,
-        ReadModel: Type[R]  # Pass the Pydantic ReadModel class itself (e.g., GraduationRead)
+        ReadModel: Type[R],  # Pass the Pydantic ReadModel class itself (e.g., GraduationRead)
+        next_cursor: Optional[str] = None,
+        total_mode: Optional[str] = None
 ) -> PaginatedResponse[R]:
     """
     Generates a PaginatedResponse object with calculated pagination metadata.
@@ -30,6 +36,9 @@ def create_paginated_response(
         limit (int): The limit (number of items per page) used for the current query.
         ReadModel (Type[R]): The Pydantic model class (e.g., GraduationRead) to which
                              each item in raw_data_list should be converted.
+        next_cursor (Optional[str]): Opaque cursor for the following page (see encode_cursor),
+                                     None when this is the last page.
+        total_mode (Optional[str]): How total_count was obtained ("exact", "cached" or "estimate").
 
     Returns:
         PaginatedResponse[R]: An instance of the generic PaginatedResponse model
@@ -73,5 +82,48 @@ def create_paginated_response(
         current_page=current_page,
         last_page=last_page,
         from_item=from_item,
-        to_item=to_item
-    )
\ No newline at end of file
+        to_item=to_item,
+        next_cursor=next_cursor,
+        total_mode=total_mode
+    )
+
+
+def _encode_cursor_value(value: Any) -> Any:
+    # Tag the non-JSON types used in sort keys so they round-trip with their original type
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"$uuid": str(value)}
+    raise TypeError(f"Unsupported cursor value type: {type(value).__name__}")
+
+
+def _decode_cursor_value(obj: Dict[str, Any]) -> Any:
+    if "$dt" in obj:
+        return datetime.fromisoformat(obj["$dt"])
+    if "$uuid" in obj:
+        return UUID(obj["$uuid"])
+    return obj
+
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """
+    Encodes a keyset pagination position into an opaque, URL-safe cursor string.
+    Datetime and UUID values are preserved with their types.
+    """
+    raw = json.dumps(payload, default=_encode_cursor_value, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decodes a cursor produced by encode_cursor.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw, object_hook=_decode_cursor_value)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"not a cursor ({e})")
+    if not isinstance(payload, dict):
+        raise ValueError("expected an object")
+    return payload
\ No newline at end of file
@@ -0,0 +1,32 @@
+# app/utils/responses.py
+
+import re
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+# Number tokens that pydantic-core writes differently from json.dumps: exponent floats
+# (1e16 vs 1e+16, 1e-7 vs 1e-07), floats in [1e-5, 1e-4), which pydantic-core writes in fixed
+# notation (0.000025 vs 2.5e-05), and non-finite values, which json.dumps rejects.
+# Bodies are compact, so a number token always follows ':', ',' or '['. A match inside a
+# string only costs the slow path, never a different body.
+_STDLIB_ONLY_NUMBER = re.compile(rb"[:,\[]-?(?:\d+(?:\.\d+)?[eE]|0\.0000[1-9]|NaN|Infinity)")
+
+
+class ModelJSONResponse(JSONResponse):
+    """
+    JSONResponse for content that is already validated: pydantic models, or lists and dicts of them.
+
+    FastAPI validates whatever an endpoint returns against `response_model` a second time and then runs
+    it through jsonable_encoder and json.dumps. Returning this response skips all of that (keep
+    `response_model` on the route for the OpenAPI schema) and serializes the models straight to bytes
+    with pydantic-core. The body is byte-for-byte what the default response would have produced.
+    """
+    def render(self, content: Any) -> bytes:
+        body = to_json(content, by_alias=True)
+        if _STDLIB_ONLY_NUMBER.search(body):
+            # Rare: let the default encoder format these numbers exactly as before
+            return super().render(jsonable_encoder(content, by_alias=True))
+        return body
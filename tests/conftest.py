@@ -0,0 +1,44 @@
+import os
+import tempfile
+
+# Settings() requires DATABASE_URL at import time. The API tests run the app on a throwaway SQLite file;
+# the plan tests create their own engines
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='student-tests-'), 'app.db')}")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import SQLModel
+
+from src.db.database import get_engine
+from src.services.student_cache import get_student_cache
+from src.services.student_count_cache import get_student_count_cache
+from tests.query_plans import TABLES
+
+
+@pytest.fixture
+def client():
+    """TestClient of the app on empty student tables, with the process-wide caches emptied."""
+    from src.main import app
+
+    engine = get_engine()
+    SQLModel.metadata.drop_all(engine, tables=TABLES)
+    SQLModel.metadata.create_all(engine, tables=TABLES)
+    for cache in (get_student_cache(), get_student_count_cache()):
+        if cache is not None:
+            cache.backend.clear()
+    with TestClient(app) as client:
+        yield client
+
+
+def create_student(client, number: int, **fields) -> dict:
+    body = {
+        "name": f"Student {number}",
+        "student_id": f"T{number:06d}",
+        "id_semester": "2024/1",
+        "email": f"student{number}@example.com",
+        **fields,
+    }
+    response = client.post("/api/v1/student/", json=body)
+    assert response.status_code == 201, response.text
+    return response.json()
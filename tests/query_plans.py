@@ -0,0 +1,95 @@
+"""
+Helpers shared by the query plan tests: a seeded student table, capture of the SQL a StudentService
+call executes, and EXPLAIN of a captured statement on SQLite and PostgreSQL.
+"""
+import json
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlmodel import Session, SQLModel
+
+from src.db.explain import plan_nodes, postgresql_plan
+from src.db.models.student import Student, StudentCreate
+from src.db.models.student_change import StudentChange
+from src.services.student_service import StudentService
+
+ROWS = 5000
+SEMESTERS = 40
+# Student writes also append to the change feed table
+TABLES = [Student.__table__, StudentChange.__table__]
+
+
+def seed(engine) -> None:
+    SQLModel.metadata.drop_all(engine, tables=TABLES)
+    SQLModel.metadata.create_all(engine, tables=TABLES)
+    faculties = ["Teknik", "Ekonomi", "Hukum", "Kedokteran", "Sastra", "MIPA", "Pertanian", "Psikologi"]
+    students = [
+        StudentCreate(
+            name=f"Student {number:06d} {['Budi', 'Siti', 'Andi', 'Dewi', 'Rina'][number % 5]}",
+            student_id=f"PLAN{number:07d}",
+            id_semester=f"20{10 + number % SEMESTERS // 2}/{number % 2 + 1}",
+            email=f"plan{number}@example.com",
+            department={"faculty": faculties[number % len(faculties)], "code": f"D{number % 97:02d}"},
+        )
+        for number in range(ROWS)
+    ]
+    with Session(engine) as session:
+        StudentService(session).bulk_create_students(students)
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+
+
+def is_select(statement: str) -> bool:
+    return statement.lstrip().upper().startswith("SELECT")
+
+
+def captured_statements(
+    engine, call: Callable[[StudentService], object], keep: Callable[[str], bool] = is_select
+) -> List[Tuple[str, object]]:
+    """Runs call(StudentService) and returns the (statement, parameters) it executed that `keep` accepts."""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if keep(statement):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with Session(engine) as session:
+            call(StudentService(session))
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert statements, "the service call executed no matching statement"
+    return statements
+
+
+def sqlite_plan(engine, statement: str, parameters) -> str:
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def postgres_plan(engine, statement: str, parameters) -> dict:
+    """
+    Top node of the statement's JSON plan. The tables are small, so sequential scans are switched off:
+    a statement that can use an index does, and one that cannot gets the planner's disable cost.
+    """
+    with engine.connect() as connection:
+        connection.exec_driver_sql("SET enable_seqscan = off")
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+        connection.rollback()
+    return postgresql_plan(plan)
+
+
+def postgres_plan_indexes(engine, statement: str, parameters) -> List[str]:
+    return [node["Index Name"] for node in plan_nodes(postgres_plan(engine, statement, parameters)) if "Index Name" in node]
+
+
+def render_plan(plan: Optional[dict]) -> str:
+    """Compact JSON of a PostgreSQL plan for the artifacts (node types, relations, indexes, costs)."""
+    def summary(node):
+        keep = {key: node[key] for key in ("Node Type", "Relation Name", "Index Name", "Total Cost", "Plan Rows") if key in node}
+        if node.get("Plans"):
+            keep["Plans"] = [summary(child) for child in node["Plans"]]
+        return keep
+    return json.dumps(summary(plan), indent=2) if plan is not None else ""
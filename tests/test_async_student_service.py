@@ -0,0 +1,83 @@
+"""
+AsyncStudentService on the async drivers (DATABASE_ASYNC=true): aiosqlite always, asyncpg when
+TEST_POSTGRES_URL points at a disposable PostgreSQL database. asyncpg is strict about binding aware
+datetimes, so every write and timestamp comparison of the service goes through it here.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.exceptions import StudentVersionConflict
+from src.db.database import to_async_url
+from src.db.models.student import StudentCreate, StudentUpdate
+from src.services.async_student_service import AsyncStudentService
+from tests.query_plans import TABLES
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def async_url(request, tmp_path):
+    if request.param == "sqlite":
+        return f"sqlite+aiosqlite:///{tmp_path / 'async.db'}"
+    if not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    return to_async_url(POSTGRES_URL)
+
+
+def run(url, scenario):
+    """Runs scenario(AsyncStudentService) on fresh student tables of the database at `url`."""
+    async def main():
+        engine = create_async_engine(url)
+        try:
+            async with engine.begin() as connection:
+                await connection.run_sync(lambda sync: SQLModel.metadata.drop_all(sync, tables=TABLES))
+                await connection.run_sync(lambda sync: SQLModel.metadata.create_all(sync, tables=TABLES))
+            async with AsyncSession(engine) as session:
+                return await scenario(AsyncStudentService(session))
+        finally:
+            async with engine.begin() as connection:
+                await connection.run_sync(lambda sync: SQLModel.metadata.drop_all(sync, tables=TABLES))
+            await engine.dispose()
+    return asyncio.run(main())
+
+
+def new_student(number: int) -> StudentCreate:
+    return StudentCreate(
+        name=f"Async {number}", student_id=f"ASYNC{number:04d}", id_semester="2024/1", email=f"async{number}@example.com"
+    )
+
+
+def test_writes_and_timestamp_comparisons(async_url):
+    async def scenario(service: AsyncStudentService):
+        created = await service.create_student(new_student(1))
+        assert (await service.get_student_by_id(created.id)).name == "Async 1"
+
+        version = await service.get_student_version(created.id)
+        updated = await service.update_student(created.id, StudentUpdate(name="Renamed"), if_match=[version])
+        assert updated.name == "Renamed"
+        with pytest.raises(StudentVersionConflict):
+            await service.update_student(created.id, StudentUpdate(name="Stale"), if_match=[version])
+
+        bulk = await service.bulk_create_students([new_student(2), new_student(3)])
+        assert bulk.created == 2
+        page, next_key = await service.get_students_page(limit=1)
+        assert next_key is not None
+        rest, _ = await service.get_students_page(limit=10, after=next_key)
+        assert {student.id for student in page + rest} == {created.id, *(result.id for result in bulk.results)}
+
+        assert len(await service.get_student_changes(0)) == 4
+        assert await service.prune_student_changes(datetime.now(timezone.utc) - timedelta(hours=1)) == 0
+        assert await service.prune_student_changes(datetime.now(timezone.utc) + timedelta(seconds=1)) == 4
+
+        assert await service.delete_student(created.id)
+        assert await service.get_student_by_id(created.id) is None
+        assert await service.update_student(uuid4(), StudentUpdate(name="Nobody")) is None
+
+    run(async_url, scenario)
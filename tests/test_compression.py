@@ -0,0 +1,118 @@
+"""CompressionMiddleware: negotiation, the minimum size, streamed bodies, Vary and per-coding ETags."""
+import asyncio
+import json
+import zlib
+
+import pytest
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+from src.core.middleware import CompressionMiddleware
+from src.utils.etag import encoded_etag, etag_matches, parse_if_match, student_etag
+from tests.conftest import create_student
+
+
+def call(app, accept_encoding: str = "gzip") -> list:
+    """Runs `app` for one GET and returns the ASGI messages it sent."""
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode("latin-1"))]}
+    messages, requested = [], []
+
+    async def receive():
+        if requested:
+            await asyncio.Event().wait()  # The client stays connected
+        requested.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(CompressionMiddleware(app, minimum_size=100)(scope, receive, send))
+    return messages
+
+
+def headers_of(messages) -> dict:
+    return {name.decode("latin-1"): value.decode("latin-1") for name, value in messages[0]["headers"]}
+
+
+def body_of(messages) -> bytes:
+    return b"".join(message.get("body", b"") for message in messages[1:])
+
+
+def gunzip(data: bytes) -> bytes:
+    return zlib.decompress(data, 31)
+
+
+def test_small_and_incompressible_bodies_pass_through():
+    for response in (
+        PlainTextResponse("short"),
+        PlainTextResponse(b"x" * 500, media_type="image/png"),
+        PlainTextResponse("x" * 500, headers={"Cache-Control": "no-transform"}),
+    ):
+        messages = call(response)
+        headers = headers_of(messages)
+        assert "content-encoding" not in headers and "vary" not in headers
+        assert body_of(messages) == response.body
+
+
+def test_large_body_is_compressed_with_a_coded_etag():
+    payload = {"data": ["student"] * 200}
+    messages = call(JSONResponse(payload, headers={"ETag": '"v1"', "Vary": "Authorization"}))
+    headers = headers_of(messages)
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Authorization, Accept-Encoding"
+    assert headers["etag"] == '"v1-gzip"'
+    assert int(headers["content-length"]) == len(body_of(messages))
+    assert json.loads(gunzip(body_of(messages))) == payload
+    # No acceptable coding: untouched
+    assert "content-encoding" not in headers_of(call(JSONResponse(payload), accept_encoding="identity"))
+
+
+def test_streamed_body_is_flushed_chunk_by_chunk():
+    chunks = [f"{number:04d},".encode("ascii") * 30 for number in range(5)]  # 150 bytes each
+
+    async def produce():
+        for chunk in chunks:
+            yield chunk
+
+    messages = call(StreamingResponse(produce(), media_type="text/csv", headers={"ETag": 'W/"p"'}), accept_encoding="deflate")
+    headers = headers_of(messages)
+    assert headers["content-encoding"] == "deflate" and "content-length" not in headers
+    assert headers["etag"] == 'W/"p-deflate"' and headers["vary"] == "Accept-Encoding"
+    # One flushed message per chunk, then the end of the stream
+    flushed = [message["body"] for message in messages[1:] if message["more_body"]]
+    assert len(flushed) == len(chunks) and not messages[-1]["more_body"]
+    # Every flushed prefix decodes to the chunks produced so far
+    decoder, received = zlib.decompressobj(), b""
+    for number, body in enumerate(flushed):
+        received += decoder.decompress(body)
+        assert received == b"".join(chunks[:number + 1])
+    assert received + decoder.decompress(messages[-1]["body"]) == b"".join(chunks) and decoder.eof
+
+
+def test_coded_etags_still_name_their_version():
+    etag = student_etag(parse_if_match('"1700000000000000"')[0])
+    for encoding in ("br", "gzip", "deflate"):
+        coded = encoded_etag(etag, encoding)
+        assert coded != etag and etag_matches(coded, etag) and etag_matches(f"W/{coded}", etag)
+        assert parse_if_match(coded) == parse_if_match(etag)
+    assert parse_if_match(f"W/{encoded_etag(etag, 'gzip')}") == []
+    assert not etag_matches('"1700000000000000-zstd"', etag)
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_conditional_requests_through_compression(client, encoding):
+    headers = {"Accept-Encoding": encoding}
+    # Large enough for a single student to pass the default COMPRESSION_MIN_SIZE
+    students = [create_student(client, number, department={"note": "x" * 1200}) for number in range(3)]
+
+    page = client.get("/api/v1/student/", headers=headers)
+    assert page.headers["Content-Encoding"] == encoding and page.headers["ETag"].endswith(f'-{encoding}"')
+    assert client.get("/api/v1/student/", headers={**headers, "If-None-Match": page.headers["ETag"]}).status_code == 304
+
+    url = f"/api/v1/student/{students[0]['id']}"
+    detail = client.get(url, headers=headers)
+    assert detail.headers["Content-Encoding"] == encoding
+    etag = detail.headers["ETag"]
+    assert etag.endswith(f'-{encoding}"')
+    assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+    assert client.patch(url, json={"name": "Renamed"}, headers={"If-Match": etag}).status_code == 200
+    assert client.patch(url, json={"name": "Stale"}, headers={"If-Match": etag}).status_code == 412
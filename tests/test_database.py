@@ -0,0 +1,99 @@
+"""Engine options from settings, and the idle ping that replaces connections that died in the pool."""
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.pool import QueuePool
+
+from src.core.config import settings
+from src.db.database import engine_options, install_idle_ping
+
+
+@pytest.fixture
+def pool_settings(monkeypatch):
+    for name, value in dict(
+        DB_POOL_SIZE=7, DB_MAX_OVERFLOW=3, DB_POOL_TIMEOUT=4.5, DB_POOL_RECYCLE=600, DB_POOL_PING="pre_ping", DB_STATEMENT_TIMEOUT_MS=0
+    ).items():
+        monkeypatch.setattr(settings, name, value)
+    return monkeypatch
+
+
+def test_engine_options_size_the_pool(pool_settings):
+    pool = {"pool_size": 7, "max_overflow": 3, "pool_timeout": 4.5, "pool_recycle": 600}
+    assert engine_options(make_url("sqlite:///students.db")) == {"pool_pre_ping": True, **pool}
+    assert engine_options(make_url("postgresql://app@db/students")) == {"pool_pre_ping": True, **pool}
+    # In-memory SQLite is one connection: no pool to size
+    assert engine_options(make_url("sqlite://")) == {"pool_pre_ping": True}
+
+    for ping in ("idle", "none"):
+        pool_settings.setattr(settings, "DB_POOL_PING", ping)
+        assert engine_options(make_url("sqlite:///students.db"))["pool_pre_ping"] is False
+
+
+def test_engine_options_set_the_statement_timeout_per_driver(pool_settings):
+    pool_settings.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    assert engine_options(make_url("postgresql+psycopg2://app@db/students"))["connect_args"] == {"options": "-c statement_timeout=5000"}
+    assert engine_options(make_url("postgresql+asyncpg://app@db/students"))["connect_args"] == {
+        "server_settings": {"statement_timeout": "5000"}
+    }
+    assert "connect_args" not in engine_options(make_url("sqlite:///students.db"))
+
+
+class FlakyConnection:
+    """A sqlite3 connection that can be made to fail like one the server closed."""
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.broken = False
+        self.pings = 0
+
+    def cursor(self):
+        if self.broken:
+            raise sqlite3.OperationalError("server closed the connection unexpectedly")
+        return PingCounter(self, self.connection.cursor())
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+
+class PingCounter:
+    def __init__(self, owner: FlakyConnection, cursor):
+        self.owner = owner
+        self.cursor = cursor
+
+    def execute(self, statement, *args):
+        if statement == "SELECT 1":
+            self.owner.pings += 1
+        return self.cursor.execute(statement, *args)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+def test_idle_ping_only_checks_idle_connections_and_replaces_dead_ones(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("src.db.database.time.monotonic", lambda: now[0])
+    connections = []
+
+    def connect():
+        connections.append(FlakyConnection(str(tmp_path / "pool.db")))
+        return connections[-1]
+
+    engine = create_engine("sqlite://", creator=connect, poolclass=QueuePool, pool_size=1, max_overflow=0)
+    install_idle_ping(engine, idle_seconds=30.0)
+
+    def query():
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT 42")).scalar()
+
+    assert query() == 42 and query() == 42
+    assert len(connections) == 1 and connections[0].pings == 0  # Back to back: no ping
+
+    now[0] += 31.0
+    assert query() == 42
+    assert connections[0].pings == 1
+
+    # The connection died while idle: the checkout ping fails and the pool reconnects
+    connections[0].broken = True
+    now[0] += 31.0
+    assert query() == 42
+    assert len(connections) == 2 and connections[1].pings == 0
@@ -0,0 +1,108 @@
+"""DataLoader coalescing of concurrent single-id reads, and one loader per event loop."""
+import asyncio
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from src.api.v1.endpoints.student import get_student_loader
+from src.utils.dataloader import DataLoader
+from tests.conftest import create_student
+
+
+def recording_loader(max_batch_size: int = 100, fail: bool = False):
+    batches = []
+
+    async def batch_load(keys):
+        batches.append(keys)
+        await asyncio.sleep(0)
+        if fail:
+            raise RuntimeError("database down")
+        return {key: key.upper() for key in keys if key != "missing"}
+
+    return DataLoader(batch_load, max_batch_size=max_batch_size), batches
+
+
+def test_concurrent_loads_share_one_batch():
+    async def main():
+        loader, batches = recording_loader()
+        results = await asyncio.gather(*(loader.load(key) for key in ["a", "b", "a", "missing", "c"]))
+        assert results == ["A", "B", "A", None, "C"]
+        assert batches == [["a", "b", "missing", "c"]]
+        # Loads issued after the batch was dispatched start the next one
+        assert await loader.load("a") == "A"
+        assert batches[1:] == [["a"]] and loader.batches == 2 and loader.keys_loaded == 5
+
+    asyncio.run(main())
+
+
+def test_batches_are_split_at_max_batch_size_and_errors_reach_every_caller():
+    async def main():
+        loader, batches = recording_loader(max_batch_size=2)
+        assert await asyncio.gather(*(loader.load(key) for key in "abcde")) == list("ABCDE")
+        assert batches == [["a", "b"], ["c", "d"], ["e"]]
+
+        failing, _ = recording_loader(fail=True)
+        results = await asyncio.gather(failing.load("a"), failing.load("a"), failing.load("b"), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    asyncio.run(main())
+
+
+def test_a_cancelled_caller_does_not_affect_the_others():
+    async def main():
+        loader, batches = recording_loader()
+        cancelled = asyncio.ensure_future(loader.load("a"))
+        kept = asyncio.ensure_future(loader.load("a"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        assert await kept == "A"
+        assert cancelled.cancelled() and batches == [["a"]]
+
+    asyncio.run(main())
+
+
+def test_each_event_loop_gets_its_own_loader():
+    async def loaders():
+        return get_student_loader(), get_student_loader()
+
+    first, same = asyncio.run(loaders())
+    second, _ = asyncio.run(loaders())
+    assert first is same
+    assert second is not first
+
+
+def test_concurrent_detail_requests_are_coalesced(client):
+    students = [create_student(client, number) for number in range(4)]
+    unknown = str(uuid4())
+
+    async def main():
+        from src.main import app
+
+        loader = get_student_loader()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+            responses = await asyncio.gather(
+                *(http.get(f"/api/v1/student/{student_id}") for student_id in [*(s["id"] for s in students), unknown])
+            )
+        return loader, responses
+
+    loader, responses = asyncio.run(main())
+    assert [response.status_code for response in responses] == [200] * 4 + [404]
+    assert [response.json()["id"] for response in responses[:4]] == [student["id"] for student in students]
+    # Requests reach the loader at slightly different times, but never one query per id
+    assert loader.keys_loaded == 5 and loader.batches < 5
+
+
+@pytest.mark.parametrize("method", ["get", "post"])
+def test_batch_endpoint_keeps_request_order(client, method):
+    students = [create_student(client, number) for number in range(3)]
+    unknown = str(uuid4())
+    ids = [students[2]["id"], unknown, students[0]["id"]]
+    if method == "get":
+        response = client.get("/api/v1/student/batch", params={"ids": ",".join(ids)})
+    else:
+        response = client.post("/api/v1/student/batch", json={"ids": ids})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [student["id"] for student in body["data"]] == [students[2]["id"], students[0]["id"]]
+    assert body["missing"] == [unknown]
@@ -0,0 +1,104 @@
+"""Idempotency-Key on POST /student/: replays, key reuse, concurrent retries and released failures."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.responses import JSONResponse, Response
+
+from src.core.cache import TTLLRUCache
+from src.core.exceptions import IdempotencyRequestInProgress
+from src.core.idempotency import IdempotencyStore
+from tests.conftest import create_student
+
+
+def body(number: int) -> dict:
+    return {"name": f"Student {number}", "student_id": f"T{number:06d}", "id_semester": "2024/1", "email": f"student{number}@example.com"}
+
+
+def test_retry_is_replayed_without_creating_twice(client):
+    headers = {"Idempotency-Key": "replay-1"}
+    first = client.post("/api/v1/student/", json=body(1), headers=headers)
+    retry = client.post("/api/v1/student/", json=body(1), headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true" and "Idempotent-Replayed" not in first.headers
+    assert client.get("/api/v1/student/", params={"limit": 10}).json()["total"] == 1
+
+
+def test_key_reused_for_another_body_is_422(client):
+    headers = {"Idempotency-Key": "reused-1"}
+    assert client.post("/api/v1/student/", json=body(1), headers=headers).status_code == 201
+    response = client.post("/api/v1/student/", json=body(2), headers=headers)
+    assert response.status_code == 422
+    # A stored error response is replayed like any other
+    create_student(client, 3)
+    conflict = client.post("/api/v1/student/", json=body(3), headers={"Idempotency-Key": "conflict-1"})
+    retry = client.post("/api/v1/student/", json=body(3), headers={"Idempotency-Key": "conflict-1"})
+    assert conflict.status_code == retry.status_code == 409 and retry.headers["Idempotent-Replayed"] == "true"
+
+
+def test_concurrent_retry_waits_for_the_first_response():
+    async def main():
+        store = IdempotencyStore(TTLLRUCache(max_entries=10), wait_seconds=5.0)
+        calls, release = [], asyncio.Event()
+
+        async def call():
+            calls.append(1)
+            await release.wait()
+            return JSONResponse({"id": 1}, status_code=201)
+
+        first = asyncio.create_task(store.run("k", "f", call))
+        while not calls:
+            await asyncio.sleep(0)
+        retry = asyncio.create_task(store.run("k", "f", call))
+        await asyncio.sleep(0.01)
+        assert not retry.done()
+        release.set()
+        responses = await asyncio.gather(first, retry)
+        assert len(calls) == 1
+        assert [response.status_code for response in responses] == [201, 201]
+        assert responses[1].body == responses[0].body and responses[1].headers["idempotent-replayed"] == "true"
+        assert not store._inflight
+
+    asyncio.run(main())
+
+
+def test_server_errors_and_exceptions_release_the_key():
+    async def main():
+        store = IdempotencyStore(TTLLRUCache(max_entries=10))
+        outcomes = [Response(status_code=503), RuntimeError("boom"), HTTPException(status_code=404, detail="missing")]
+
+        async def call():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        assert (await store.run("k", "f", call)).status_code == 503
+        with pytest.raises(RuntimeError):
+            await store.run("k", "f", call)
+        # Neither was stored, so this retry runs; its 4xx is kept and replayed
+        assert (await store.run("k", "f", call)).status_code == 404
+        replayed = await store.run("k", "f", call)
+        assert replayed.status_code == 404 and replayed.headers["idempotent-replayed"] == "true"
+        assert not outcomes
+
+    asyncio.run(main())
+
+
+class ClaimedElsewhere(TTLLRUCache):
+    """A backend on which another worker always wins the claim and its record is never readable."""
+    def get(self, key):
+        return None
+
+    def add(self, key, value, ttl=None):
+        return False
+
+
+def test_lost_claims_give_up_at_the_deadline():
+    async def call():
+        raise AssertionError("must not run")
+
+    store = IdempotencyStore(ClaimedElsewhere(max_entries=10), wait_seconds=0.05)
+    with pytest.raises(IdempotencyRequestInProgress):
+        asyncio.run(asyncio.wait_for(store.run("k", "f", call), 2.0))
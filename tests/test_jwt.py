@@ -0,0 +1,151 @@
+"""Token verification against a JWKS: signatures, key rotation, JWKS outages and the verified and rejected token caches."""
+import json
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import JWTError, jwk, jwt
+
+from src.core.exceptions import JWKSUnavailable
+from src.core.security import JWKSProvider
+from src.utils import jwt as jwt_module
+from src.utils.jwt import authenticate_token, get_cached_token, get_current_user, set_jwks_provider, verify_access_token
+
+
+def rsa_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def private_pem(key) -> bytes:
+    return key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+
+
+def public_jwk(key, kid: str) -> dict:
+    public_pem = key.public_key().public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return {**jwk.construct(public_pem, "RS256").to_dict(), "kid": kid, "use": "sig"}
+
+
+def token(key, kid: str, expires_in: float = 300.0, **claims) -> str:
+    payload = {"sub": "user-1", "email": "user@example.com", "preferred_username": "user", "exp": time.time() + expires_in, **claims}
+    return jwt.encode(payload, private_pem(key), algorithm="RS256", headers={"kid": kid})
+
+
+def status_of(call) -> int:
+    with pytest.raises(HTTPException) as raised:
+        call()
+    return raised.value.status_code
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return rsa_key(), rsa_key()
+
+
+@pytest.fixture
+def jwks_file(tmp_path, keys):
+    path = tmp_path / "jwks.json"
+    path.write_text(json.dumps({"keys": [public_jwk(keys[0], "k1")]}))
+    yield path
+    set_jwks_provider(None)
+
+
+def test_valid_token_and_bad_signature(jwks_file, keys):
+    set_jwks_provider(JWKSProvider(source=str(jwks_file)))
+    assert verify_access_token(token(keys[0], "k1"))["sub"] == "user-1"
+    assert get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token(keys[0], "k1"))).username == "user"
+
+    forged = token(keys[1], "k1")  # Signed by another key under the known kid
+    with pytest.raises(JWTError):
+        authenticate_token(forged)
+    assert status_of(lambda: verify_access_token(forged)) == 401
+    assert status_of(lambda: get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=forged))) == 401
+    assert status_of(lambda: verify_access_token("not-a-token")) == 401
+
+
+def test_unknown_kid_refreshes_the_key_set(jwks_file, keys):
+    set_jwks_provider(JWKSProvider(source=str(jwks_file), min_refresh_interval=0.0))
+    verify_access_token(token(keys[0], "k1"))  # Loads the set with k1 only
+
+    jwks_file.write_text(json.dumps({"keys": [public_jwk(keys[0], "k1"), public_jwk(keys[1], "k2")]}))
+    assert verify_access_token(token(keys[1], "k2"))["sub"] == "user-1"
+    assert status_of(lambda: verify_access_token(token(keys[1], "k3"))) == 401
+
+
+def test_malformed_key_in_the_set_is_rejected_with_401(tmp_path, keys):
+    path = tmp_path / "jwks.json"
+    path.write_text(json.dumps({"keys": [{"kid": "k1", "kty": "EC", "crv": "P-256"}]}))
+    set_jwks_provider(JWKSProvider(source=str(path)))
+    try:
+        assert status_of(lambda: verify_access_token(token(keys[0], "k1"))) == 401
+    finally:
+        set_jwks_provider(None)
+
+
+def test_jwks_outage_is_503(keys):
+    # Nothing listens on the discard port: the fetch fails with a connection error
+    set_jwks_provider(JWKSProvider(source="http://127.0.0.1:9/jwks.json", http_timeout=0.5))
+    try:
+        with pytest.raises(JWKSUnavailable):
+            authenticate_token(token(keys[0], "k1"))
+        assert status_of(lambda: verify_access_token(token(keys[0], "k1"))) == 503
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token(keys[0], "k1"))
+        assert status_of(lambda: get_current_user(credentials)) == 503
+    finally:
+        set_jwks_provider(None)
+
+
+def test_missing_jwks_file_is_503(tmp_path, keys):
+    set_jwks_provider(JWKSProvider(source=str(tmp_path / "missing.json")))
+    try:
+        assert status_of(lambda: verify_access_token(token(keys[0], "k1"))) == 503
+    finally:
+        set_jwks_provider(None)
+
+
+def test_token_cache_entry_expires_with_the_token(jwks_file, keys):
+    set_jwks_provider(JWKSProvider(source=str(jwks_file)))
+    short_lived = token(keys[0], "k1", expires_in=0.5)
+    long_lived = token(keys[0], "k1")
+    authenticate_token(short_lived)
+    authenticate_token(long_lived)
+    assert get_cached_token(short_lived) is not None
+
+    time.sleep(0.6)
+    assert get_cached_token(short_lived) is None
+    assert get_cached_token(long_lived) is not None
+
+
+def test_rejected_tokens_are_not_verified_again_until_the_keys_change(jwks_file, keys, monkeypatch):
+    set_jwks_provider(JWKSProvider(source=str(jwks_file)))
+    decoded = []
+    decode = jwt_module.decode_access_token
+    monkeypatch.setattr(jwt_module, "decode_access_token", lambda value: decoded.append(value) or decode(value))
+
+    forged = token(keys[1], "k1")
+    assert get_cached_token(forged) is None
+    for _ in range(3):
+        assert status_of(lambda: verify_access_token(forged)) == 401
+    assert decoded == [forged]
+    with pytest.raises(JWTError, match="Signature verification failed"):
+        get_cached_token(forged)
+
+    # A key rotation may make the token valid: it is verified again
+    set_jwks_provider(JWKSProvider(source=str(jwks_file)))
+    assert get_cached_token(forged) is None
+    with pytest.raises(JWTError):
+        authenticate_token(forged)
+    assert decoded == [forged, forged]
+
+
+def test_outages_are_not_cached_as_rejections(keys):
+    set_jwks_provider(JWKSProvider(source="http://127.0.0.1:9/jwks.json", http_timeout=0.5))
+    try:
+        valid = token(keys[0], "k1")
+        with pytest.raises(JWKSUnavailable):
+            authenticate_token(valid)
+        assert get_cached_token(valid) is None
+    finally:
+        set_jwks_provider(None)
@@ -0,0 +1,142 @@
+"""Admission control (FIFO slot handoff, 503 with Retry-After) and per-client rate limiting (429)."""
+import asyncio
+import base64
+import json
+
+import httpx
+from starlette.responses import PlainTextResponse
+
+from src.core.middleware import AdmissionControlMiddleware, RateLimitMiddleware
+from src.core.security import JWKSProvider
+from src.utils.jwt import authenticate_token, set_jwks_provider
+
+
+async def ok(scope, receive, send):
+    await PlainTextResponse("ok")(scope, receive, send)
+
+
+def client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+async def until(condition, timeout: float = 2.0) -> None:
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.001)
+    await asyncio.wait_for(poll(), timeout)
+
+
+def unsigned_token(kid: str = "k1") -> str:
+    # Only the header is read before the key lookup, so the signature does not matter here
+    def part(value):
+        return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii").rstrip("=")
+    return f"{part({'alg': 'RS256', 'kid': kid})}.{part({'sub': 'user-1'})}.c2ln"
+
+
+def test_admission_hands_slots_over_in_arrival_order():
+    async def main():
+        started, release = [], asyncio.Event()
+
+        async def app(scope, receive, send):
+            started.append(scope["path"])
+            if scope["path"] == "/first":
+                await release.wait()
+            await ok(scope, receive, send)
+
+        middleware = AdmissionControlMiddleware(app, max_concurrent=1, max_queue=5, max_wait=5.0)
+        async with client(middleware) as http:
+            first = asyncio.create_task(http.get("/first"))
+            await until(lambda: started == ["/first"])
+            waiting = []
+            for number in range(3):
+                waiting.append(asyncio.create_task(http.get(f"/queued{number}")))
+                await until(lambda: len(middleware._waiters) == number + 1)
+            release.set()
+            responses = await asyncio.gather(first, *waiting)
+        assert [response.status_code for response in responses] == [200] * 4
+        assert started == ["/first", "/queued0", "/queued1", "/queued2"]
+        assert middleware.active == 0 and not middleware._waiters
+
+    asyncio.run(main())
+
+
+def test_admission_sheds_with_503_and_retry_after():
+    async def main():
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await release.wait()
+            await ok(scope, receive, send)
+
+        middleware = AdmissionControlMiddleware(app, max_concurrent=1, max_queue=1, max_wait=0.05, retry_after=2)
+        async with client(middleware) as http:
+            holder = asyncio.create_task(http.get("/"))
+            await until(lambda: middleware.active == 1)
+            queued = asyncio.create_task(http.get("/"))
+            await until(lambda: len(middleware._waiters) == 1)
+            full = await http.get("/")  # The queue is full: rejected without waiting
+            timed_out = await queued  # Got no slot within max_wait
+            release.set()
+            assert (await holder).status_code == 200
+        for response in (full, timed_out):
+            assert response.status_code == 503
+            assert response.headers["Retry-After"] == "2"
+        assert middleware.active == 0
+
+    asyncio.run(main())
+
+
+def test_rate_limit_answers_429_per_client():
+    async def main():
+        middleware = RateLimitMiddleware(ok, rate=1.0, burst=2, exclude_paths=("/metrics",))
+        async with client(middleware) as http:
+            statuses = [(await http.get("/")).status_code for _ in range(3)]
+            limited = await http.get("/")
+            excluded = await http.get("/metrics")
+        assert statuses == [200, 200, 429]
+        assert limited.status_code == 429 and int(limited.headers["Retry-After"]) >= 1
+        assert excluded.status_code == 200
+
+    asyncio.run(main())
+
+
+def test_rate_limit_falls_back_to_the_address_when_tokens_cannot_be_verified(tmp_path):
+    async def main():
+        middleware = RateLimitMiddleware(ok, rate=1.0, burst=1)
+        async with client(middleware) as http:
+            first = await http.get("/", headers={"Authorization": f"Bearer {unsigned_token()}"})
+            second = await http.get("/", headers={"Authorization": f"Bearer {unsigned_token('k2')}"})
+        # Both unverifiable tokens share the client address bucket
+        assert (first.status_code, second.status_code) == (200, 429)
+
+    malformed = tmp_path / "jwks.json"
+    malformed.write_text(json.dumps({"keys": [{"kid": "k1", "kty": "EC", "crv": "P-256"}]}))
+    # JWKS outage (nothing listens on the discard port), then a key the set cannot construct
+    for provider in (JWKSProvider(source="http://127.0.0.1:9/jwks.json", http_timeout=0.5), JWKSProvider(source=str(malformed))):
+        set_jwks_provider(provider)
+        try:
+            asyncio.run(main())
+        finally:
+            set_jwks_provider(None)
+
+
+def test_rate_limit_does_not_verify_a_replayed_invalid_token_again(tmp_path, monkeypatch):
+    malformed = tmp_path / "jwks.json"
+    malformed.write_text(json.dumps({"keys": [{"kid": "k1", "kty": "EC", "crv": "P-256"}]}))
+    verified = []
+    monkeypatch.setattr("src.core.middleware.authenticate_token", lambda token: verified.append(token) or authenticate_token(token))
+
+    async def main():
+        middleware = RateLimitMiddleware(ok, rate=1.0, burst=3)
+        async with client(middleware) as http:
+            statuses = [
+                (await http.get("/", headers={"Authorization": f"Bearer {unsigned_token()}"})).status_code for _ in range(4)
+            ]
+        assert statuses == [200, 200, 200, 429]
+
+    set_jwks_provider(JWKSProvider(source=str(malformed)))
+    try:
+        asyncio.run(main())
+    finally:
+        set_jwks_provider(None)
+    assert verified == [unsigned_token()]
@@ -0,0 +1,99 @@
+"""Logging off the request path: the bounded log queue drops records when full, and events are sampled by name."""
+import logging
+import logging.handlers
+import random
+import threading
+
+import pytest
+import structlog
+
+from src.core.logging_config import BoundedQueueHandler, EventSampler, LazyValue, resolve_lazy_values
+from src.core.metrics import log_events_sampled_out_total, log_records_dropped_total
+
+
+class Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((self.format(record), threading.current_thread()))
+
+
+@pytest.fixture
+def queue_logger():
+    logger = logging.getLogger("tests.logging.queue")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handlers = []
+
+    def install(handler):
+        handlers.append(handler)
+        logger.addHandler(handler)
+        return logger
+
+    yield install
+    for handler in handlers:
+        logger.removeHandler(handler)
+
+
+def test_full_queue_drops_and_counts_records(queue_logger):
+    handler = BoundedQueueHandler(maxsize=2)
+    logger = queue_logger(handler)
+    dropped = log_records_dropped_total.value()
+
+    for number in range(5):
+        logger.info("record %d of %s", number, "five")  # Never blocks, although nothing drains the queue
+    assert handler.dropped == 3 and log_records_dropped_total.value() == dropped + 3
+    queued = [handler.queue.get_nowait() for _ in range(2)]
+    # Queued as they were logged, unformatted: the arguments are merged on the listener thread
+    assert [(record.msg, record.args) for record in queued] == [("record %d of %s", (0, "five")), ("record %d of %s", (1, "five"))]
+
+
+def test_listener_formats_and_writes_records_on_its_own_thread(queue_logger):
+    handler = BoundedQueueHandler(maxsize=100)
+    capture = Capture()
+    listener = logging.handlers.QueueListener(handler.queue, capture)
+    listener.start()
+    try:
+        queue_logger(handler).info("hello %s", "world")
+    finally:
+        listener.stop()  # Flushes what is queued
+    assert [message for message, _ in capture.records] == ["hello world"]
+    assert capture.records[0][1] is not threading.current_thread()
+    assert handler.dropped == 0
+
+
+def test_sampler_keeps_the_configured_fraction(monkeypatch):
+    sampler = EventSampler({"API call: get_student": 0.25, "never": 0.0})
+    generator = random.Random(15)
+    monkeypatch.setattr("src.core.logging_config.random.random", generator.random)
+    sampled_out = log_events_sampled_out_total.value(event="API call: get_student")
+
+    kept = 0
+    for _ in range(10000):
+        try:
+            sampler(None, "info", {"event": "API call: get_student"})
+            kept += 1
+        except structlog.DropEvent:
+            pass
+    assert 2300 < kept < 2700
+    assert log_events_sampled_out_total.value(event="API call: get_student") == sampled_out + 10000 - kept
+
+    event = {"event": "never", "student_id": 1}
+    for method_name in ("warning", "error", "critical"):
+        assert sampler(None, method_name, dict(event)) == event  # Never sampled
+    with pytest.raises(structlog.DropEvent):
+        sampler(None, "debug", dict(event))
+    assert sampler(None, "info", {"event": "other"}) == {"event": "other"}  # No rate: always kept
+
+
+def test_sampled_out_events_do_not_compute_lazy_fields():
+    computed = []
+    logger = structlog.wrap_logger(
+        structlog.ReturnLogger(),
+        processors=[EventSampler({"sampled": 0.0}), resolve_lazy_values, structlog.processors.KeyValueRenderer(key_order=["event"])],
+    )
+    assert logger.info("sampled", detail=LazyValue(lambda: computed.append("sampled"))) is None  # Dropped
+    assert logger.info("kept", detail=LazyValue(lambda: computed.append("kept") or 42)) == "event='kept' detail=42"
+    assert computed == ["kept"]
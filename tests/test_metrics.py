@@ -0,0 +1,73 @@
+"""Prometheus metrics: exposition format, and the names and labels the app records per request and statement."""
+import re
+
+from src.core.metrics import MetricsRegistry, db_statement_duration_seconds, http_requests_total
+from tests.conftest import create_student
+
+
+def sample(text: str, name: str, **labels: str) -> float:
+    """The value of one sample in an exposition, labels given in their rendered order."""
+    rendered = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    series = f"{name}{{{rendered}}}" if labels else name
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    assert match, f"{series} not in the exposition"
+    return float(match.group(1))
+
+
+def test_registry_renders_the_text_exposition_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route", "status"))
+    assert registry.counter("requests_total", "Other help.", ("route",)) is requests  # Registered once per name
+    requests.inc(route='/a"b\\', status="200")
+    requests.inc(2, route="/c\nd", status="500")
+    registry.gauge("in_flight", "In flight.").set(3)
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 7.0):
+        latency.observe(value, route="/a")
+    registry.register_collector(lambda: [("pool_size", "gauge", "Pool size.", [({"engine": "primary"}, 5)])])
+
+    assert registry.render() == "\n".join([
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b\\\\",status="200"} 1',
+        'requests_total{route="/c\\nd",status="500"} 2',
+        "# HELP in_flight In flight.",
+        "# TYPE in_flight gauge",
+        "in_flight 3",
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_count{route="/a"} 4',
+        'latency_seconds_sum{route="/a"} 7.65',
+        "# HELP pool_size Pool size.",
+        "# TYPE pool_size gauge",
+        'pool_size{engine="primary"} 5',
+    ]) + "\n"
+
+
+def test_requests_are_labelled_by_route_template(client):
+    student = create_student(client, 1)
+    route = "/api/v1/student/{student_id}"
+    before = http_requests_total.value(method="GET", route=route, status="200")
+    unmatched = http_requests_total.value(method="GET", route="unmatched", status="404")
+    selects = db_statement_duration_seconds.count(engine="primary", operation="SELECT")
+
+    for _ in range(2):
+        client.get(f"/api/v1/student/{student['id']}")  # A miss, then a cache hit
+    assert client.get("/no/such/path").status_code == 404
+
+    response = client.get("/metrics")
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    # The route label is the template, not the path with the id in it
+    assert sample(text, "http_requests_total", method="GET", route=route, status="200") == before + 2
+    assert sample(text, "http_requests_total", method="GET", route="unmatched", status="404") == unmatched + 1
+    assert sample(text, "http_request_duration_seconds_count", method="GET", route=route) >= 2
+    assert sample(text, "http_request_db_statements_bucket", method="GET", route=route, le="0") >= 1  # The cache hit
+    assert sample(text, "db_statement_duration_seconds_count", engine="primary", operation="SELECT") == selects + 1
+    assert sample(text, "http_requests_in_flight") == 0  # The scrape is excluded from the request metrics
+    for name in ("student_cache_hits_total", "student_cache_misses_total", "db_pool_checked_out", "student_change_streams"):
+        assert f"\n# TYPE {name} " in text
+    assert "/metrics" not in text
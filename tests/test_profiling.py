@@ -0,0 +1,91 @@
+"""Request profiling: off unless configured, then only for requests with the token or sampled ones worth keeping."""
+import asyncio
+import pstats
+import time
+from datetime import datetime, timezone
+
+import httpx
+from fastapi import FastAPI
+
+from src.core.config import settings
+from src.core.middleware import ProfilingMiddleware
+from src.core.profiling import profile_filename
+
+
+def busy_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/student/{student_id}")
+    def busy(student_id: str):
+        deadline = time.perf_counter() + 0.03
+        while time.perf_counter() < deadline:
+            pass
+        return {"id": student_id}
+
+    @app.get("/metrics")
+    def metrics():
+        return {}
+
+    return app
+
+
+def requests(middleware: ProfilingMiddleware, *headers: dict, path: str = "/student/1") -> None:
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=middleware), base_url="http://test") as http:
+            for request_headers in headers:
+                assert (await http.get(path, headers=request_headers)).status_code == 200
+    asyncio.run(main())
+
+
+def test_the_app_does_not_install_the_profiler_by_default():
+    from src.main import app
+
+    assert not settings.PROFILING_TOKEN and settings.PROFILING_SAMPLE_RATE == 0
+    assert ProfilingMiddleware not in [middleware.cls for middleware in app.user_middleware]
+
+
+def test_only_requests_with_the_token_are_profiled(tmp_path):
+    middleware = ProfilingMiddleware(busy_app(), directory=str(tmp_path), token="secret", interval=0.001)
+    requests(middleware, {}, {"X-Profile": "wrong"}, {"X-Profile": "secre"})
+    assert list(tmp_path.iterdir()) == []
+
+    requests(middleware, {"X-Profile": "secret"})
+    (profile,) = tmp_path.iterdir()
+    assert profile.name.endswith(".collapsed") and "-GET-student_student_id-" in profile.name
+    stacks = profile.read_text().splitlines()
+    assert stacks and all(line.rsplit(" ", 1)[1].isdigit() for line in stacks)
+    assert any("busy (tests/test_profiling.py:" in line for line in stacks)  # The threadpool is sampled too
+    assert middleware.active is False
+
+
+def test_sampled_requests_faster_than_min_duration_are_discarded(tmp_path):
+    middleware = ProfilingMiddleware(busy_app(), directory=str(tmp_path), sample_rate=1.0, min_duration=10.0)
+    requests(middleware, {}, {})
+    assert list(tmp_path.iterdir()) == []
+
+    middleware.min_duration = 0.0
+    requests(middleware, {})
+    requests(middleware, {}, path="/metrics")  # Excluded
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_no_token_and_no_sample_rate_profiles_nothing(tmp_path):
+    middleware = ProfilingMiddleware(busy_app(), directory=str(tmp_path), sample_rate=0.0)
+    requests(middleware, {}, {"X-Profile": ""})
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_pstats_profiles_load(tmp_path):
+    middleware = ProfilingMiddleware(busy_app(), directory=str(tmp_path), profiler="pstats", token="secret")
+    requests(middleware, {"X-Profile": "secret"})
+    (profile,) = tmp_path.iterdir()
+    assert profile.suffix == ".prof"
+    assert pstats.Stats(str(profile)).total_calls > 0
+
+
+def test_profile_filename():
+    started = datetime(2026, 10, 18, 10, 15, 0, 123456, tzinfo=timezone.utc)
+    assert profile_filename(started, "GET", "/api/v1/student/{student_id}", 0.1534, "prof") == (
+        "20261018T101500123-GET-api_v1_student_student_id-153ms.prof"
+    )
+    assert profile_filename(started, "POST", "/", 0.0, "collapsed").endswith("-POST-root-0ms.collapsed")
@@ -0,0 +1,46 @@
+"""ModelJSONResponse bodies are byte-identical to the json.dumps output of the default response."""
+import json
+import math
+import random
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from src.db.models.student import StudentRead
+from src.utils.responses import ModelJSONResponse
+
+EDGE_VALUES = [
+    1e-05, 2.5e-05, -9.999e-05, 0.0001, 1e-07, 5e-324, 1e16, 1.5e16, 1e15, 1.7976931348623157e308,
+    -0.0, 0.0, 0.1, 1 / 3, 2 ** 64, 10 ** 30, -(2 ** 63), 0, True, None, "0.00001", "é",
+]
+
+
+def stdlib_body(content) -> bytes:
+    # What starlette's JSONResponse.render produces
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+@pytest.mark.parametrize("value", EDGE_VALUES, ids=repr)
+def test_edge_values_render_like_json_dumps(value):
+    for content in ({"x": value}, [value, {"y": [value]}]):
+        assert ModelJSONResponse(content).body == stdlib_body(content)
+
+
+@pytest.mark.parametrize("value", [math.nan, math.inf, -math.inf], ids=repr)
+def test_non_finite_floats_are_rejected_like_json_dumps(value):
+    with pytest.raises(ValueError):
+        stdlib_body({"x": value})
+    with pytest.raises(ValueError):
+        ModelJSONResponse({"x": value})
+
+
+def test_random_floats_and_models_render_like_json_dumps():
+    generator = random.Random(20261018)
+    values = [generator.choice([1, -1]) * generator.random() * 10 ** generator.uniform(-30, 30) for _ in range(5000)]
+    assert ModelJSONResponse({"values": values}).body == stdlib_body({"values": values})
+
+    student = StudentRead(
+        id="6f1c2a0e-8d5b-4c3e-9a7f-2b1d0e4c5a6b", name="Ana", student_id="S1", id_semester="2024/1",
+        email="ana@example.com", department={"ratio": 2.5e-05, "big": 1e16, "nested": [1e-05, -0.0]}
+    )
+    assert ModelJSONResponse([student]).body == stdlib_body(jsonable_encoder([student]))
@@ -0,0 +1,118 @@
+"""Read replica routing: round-robin, replicas taken out of rotation, primary fallback and read-your-writes."""
+from typing import List
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlmodel import Session, SQLModel, select
+
+from src.db.models.student import Student, StudentCreate
+from src.db.routing import ReplicaSet, RoutingSession
+from src.services.student_service import StudentService
+from tests.query_plans import TABLES
+
+
+def database(tmp_path, name: str, *names: str):
+    """SQLite engine whose student table holds one student per name, and the log of statements it ran."""
+    engine = create_engine(f"sqlite:///{tmp_path / name}.db")
+    if names:
+        SQLModel.metadata.create_all(engine, tables=TABLES)
+        with Session(engine) as session:
+            service = StudentService(session)
+            for number, student_name in enumerate(names):
+                service.create_student(StudentCreate(
+                    name=student_name, student_id=f"R{number}", id_semester="2024/1", email=f"{number}@example.com"
+                ))
+    statements: List[str] = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    return engine, statements
+
+
+def names(service: StudentService) -> List[str]:
+    return [student.name for student in service.get_all_students(order_by="name")]
+
+
+@pytest.fixture
+def primary(tmp_path):
+    return database(tmp_path, "primary", "On primary")
+
+
+def test_replicas_are_used_in_turn_and_skipped_while_down(tmp_path, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("src.db.routing.time.monotonic", lambda: now[0])
+    first, second = create_engine("sqlite://"), create_engine("sqlite://")
+    replicas = ReplicaSet([first, second], retry_seconds=30.0)
+    assert [replicas.next() for _ in range(3)] == [first, second, first]
+
+    replicas.mark_down(second)
+    assert [replicas.next() for _ in range(2)] == [first, first]
+    replicas.mark_down(first)
+    assert replicas.next() is None
+    now[0] += 30.0  # Both retry windows are over
+    assert {replicas.next(), replicas.next()} == {first, second}
+
+
+def test_read_only_methods_go_to_the_replica(tmp_path, primary):
+    primary_engine, primary_statements = primary
+    replica_engine, replica_statements = database(tmp_path, "replica", "On replica")
+    with RoutingSession(primary_engine, replicas=ReplicaSet([replica_engine], sticky_seconds=0.0)) as session:
+        service = StudentService(session)
+        assert names(service) == ["On replica"]
+        assert service.count_students() == 1 and replica_statements
+        assert not primary_statements
+        # Statements outside read_only methods use the primary
+        assert session.exec(select(Student.name)).all() == ["On primary"]
+        assert primary_statements
+
+
+def test_failing_replica_falls_back_to_the_primary(tmp_path, primary):
+    primary_engine, _ = primary
+    broken_engine, broken_statements = database(tmp_path, "broken")  # No student table: OperationalError
+    replicas = ReplicaSet([broken_engine], retry_seconds=60.0, sticky_seconds=0.0)
+    with RoutingSession(primary_engine, replicas=replicas) as session:
+        service = StudentService(session)
+        assert names(service) == ["On primary"]
+        assert len(broken_statements) == 1
+        # Out of rotation until the retry window is over
+        assert replicas.next() is None
+        assert names(service) == ["On primary"] and len(broken_statements) == 1
+
+
+def test_sessions_that_wrote_read_from_the_primary(tmp_path, primary):
+    primary_engine, _ = primary
+    replica_engine, _ = database(tmp_path, "replica", "On replica")
+    replicas = ReplicaSet([replica_engine], sticky_seconds=0.0)
+
+    with RoutingSession(primary_engine, replicas=replicas) as session:
+        service = StudentService(session)
+        # Pending changes: the read must see them, so it runs on the primary (which autoflushes them)
+        session.add(Student(name="Pending", student_id="P1", id_semester="2024/1", email="p1@example.com"))
+        assert names(service) == ["On primary", "Pending"]
+        assert session.wrote
+        session.commit()
+        # Still this session's own writes after the commit
+        assert names(service) == ["On primary", "Pending"]
+
+    with RoutingSession(primary_engine, replicas=replicas) as session:
+        service = StudentService(session)
+        service.create_student(StudentCreate(name="Created", student_id="P2", id_semester="2024/1", email="p2@example.com"))
+        assert names(service) == ["Created", "On primary", "Pending"]
+
+    # A fresh session reads from the replica again
+    with RoutingSession(primary_engine, replicas=replicas) as session:
+        assert names(StudentService(session)) == ["On replica"]
+
+
+def test_recent_commits_keep_new_sessions_on_the_primary(tmp_path, primary, monkeypatch):
+    monkeypatch.setattr("src.db.routing._last_write_at", float("-inf"))  # Forget the writes of other tests
+    primary_engine, _ = primary
+    replica_engine, _ = database(tmp_path, "replica", "On replica")
+    replicas = ReplicaSet([replica_engine], sticky_seconds=60.0)
+    with RoutingSession(primary_engine, replicas=replicas) as session:
+        assert names(StudentService(session)) == ["On replica"]
+    with RoutingSession(primary_engine, replicas=replicas) as session:
+        StudentService(session).create_student(
+            StudentCreate(name="Fresh", student_id="F1", id_semester="2024/1", email="f1@example.com")
+        )
+    # Within the sticky window other sessions of this process see the write too
+    with RoutingSession(primary_engine, replicas=replicas) as session:
+        assert names(StudentService(session)) == ["Fresh", "On primary"]
@@ -0,0 +1,160 @@
+"""Read-through student cache: reads are served from it and every write drops the keys it touched."""
+import asyncio
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlmodel import Session
+
+from src.core.cache import LocalSharedCache, TTLLRUCache
+from src.db.database import get_engine
+from src.db.models.student import StudentCreate, StudentUpdate
+from src.services import student_cache
+from src.services.async_student_service import AsyncStudentService
+from src.services.student_cache import StudentCache, get_student_cache
+from src.services.student_service import StudentService
+from src.utils.dataloader import DataLoader
+from tests.conftest import create_student
+
+
+def rename_behind_the_cache(student_id: str, name: str) -> None:
+    with Session(get_engine()) as session:
+        StudentService(session).update_student(UUID(student_id), StudentUpdate(name=name))
+
+
+def test_api_reads_are_cached_and_writes_invalidate(client):
+    student = create_student(client, 1)
+    url = f"/api/v1/student/{student['id']}"
+    assert client.get(url).json()["name"] == "Student 1"
+
+    # A write that bypasses the service is not seen: the read is a cache hit
+    hits = get_student_cache().hits
+    rename_behind_the_cache(student["id"], "Behind")
+    assert client.get(url).json()["name"] == "Student 1"
+    assert get_student_cache().hits == hits + 1
+
+    assert client.patch(url, json={"name": "Patched"}).status_code == 200
+    assert client.get(url).json()["name"] == "Patched"
+    assert client.put(url, json={"email": "moved@example.com"}).status_code == 200
+    assert client.get(url).json()["email"] == "moved@example.com"
+
+    assert client.delete(url).status_code == 204
+    assert client.get(url).status_code == 404
+
+
+def test_bulk_upsert_invalidates_updated_rows(client):
+    student = create_student(client, 1)
+    url = f"/api/v1/student/{student['id']}"
+    assert client.get(url).json()["name"] == "Student 1"
+    row = {key: student[key] for key in ("student_id", "id_semester", "email", "department")}
+    response = client.post("/api/v1/student/bulk", params={"upsert": True}, json=[{**row, "name": "Upserted"}])
+    assert response.status_code == 200, response.text
+    assert client.get(url).json()["name"] == "Upserted"
+
+
+def test_secondary_keys_follow_updates_and_deletes(client):
+    async def main(session):
+        service = AsyncStudentService(session, cache=StudentCache(TTLLRUCache(max_entries=100)))
+        created = await service.create_student(
+            StudentCreate(name="Cached", student_id="C000001", id_semester="2024/1", email="cached@example.com")
+        )
+        assert (await service.get_student_by_email("cached@example.com")).id == created.id
+        assert service.cache.misses == 1
+        assert (await service.get_student_by_email_and_id("cached@example.com", "C000001")).id == created.id
+        assert service.cache.hits == 1
+
+        await service.update_student(created.id, StudentUpdate(email="renamed@example.com"))
+        # The old email key is gone or fails validation against the record; the new one is read through
+        assert await service.get_student_by_email("cached@example.com") is None
+        assert (await service.get_student_by_email("renamed@example.com")).id == created.id
+
+        assert await service.delete_student(created.id)
+        assert await service.get_student_by_email("renamed@example.com") is None
+        assert await service.get_student_by_id(created.id) is None
+
+    with Session(get_engine()) as session:
+        asyncio.run(main(session))
+
+
+def test_shared_cache_hits_answer_validators_without_the_database(client, monkeypatch):
+    # A shared backend stores serialized records; updated_at must survive the round trip
+    monkeypatch.setattr(student_cache, "student_cache", StudentCache(LocalSharedCache()))
+    student = create_student(client, 1)
+    url = f"/api/v1/student/{student['id']}"
+    first = client.get(url)
+
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(get_engine(), "before_cursor_execute", record)
+    try:
+        hit = client.get(url)
+        not_modified = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", record)
+    assert hit.json() == first.json() and "updated_at" not in hit.json()
+    assert hit.headers["ETag"] == first.headers["ETag"] and hit.headers["Last-Modified"] == first.headers["Last-Modified"]
+    assert not_modified.status_code == 304
+    assert statements == []
+
+
+def test_a_read_that_races_a_write_is_not_cached(client):
+    student = create_student(client, 1)
+    student_uuid = UUID(student["id"])
+    cache = StudentCache(TTLLRUCache(max_entries=100))
+
+    async def main(session, writer_session):
+        writer = AsyncStudentService(writer_session, cache=cache)
+
+        writes = [StudentUpdate(name="Written")]
+
+        async def read_then_let_a_write_land(ids):
+            found = {row.id: row for row in StudentService(session).get_students_by_ids(ids)}
+            if writes:
+                await writer.update_student(student_uuid, writes.pop())
+            return found
+
+        reader = AsyncStudentService(session, cache=cache, loader=DataLoader(read_then_let_a_write_land))
+        # The in-flight request still answers with what it read...
+        assert (await reader.get_student_by_id(student_uuid)).name == "Student 1"
+        # ...but does not leave it in the cache for the TTL
+        assert cache.get(student_uuid) is None and cache.stale_fills == 1
+        assert (await reader.get_student_by_id(student_uuid)).name == "Written"
+        assert cache.get(student_uuid).name == "Written"
+
+    with Session(get_engine()) as session, Session(get_engine()) as writer_session:
+        asyncio.run(main(session, writer_session))
+
+
+class InvalidatingBackend(TTLLRUCache):
+    """Runs `on_set` once, right after the first record is written: a write landing in the middle of store()."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.on_set = None
+
+    def set(self, key, value, ttl=None):
+        super().set(key, value, ttl)
+        if self.on_set is not None and key.startswith("student:id:"):
+            on_set, self.on_set = self.on_set, None
+            on_set()
+
+
+def test_store_drops_what_it_wrote_when_an_invalidation_overtakes_it(client):
+    student = create_student(client, 1)
+    with Session(get_engine()) as session:
+        row = StudentService(session).get_student_by_id(UUID(student["id"]))
+    backend = InvalidatingBackend(max_entries=100)
+    cache = StudentCache(backend)
+
+    generation = cache.generation()
+    cache.invalidate(row.id)  # Before the fill: nothing is written
+    cache.store(row, generation)
+    assert cache.get(row.id) is None and len(backend) == 1  # Only the generation key
+
+    generation = cache.generation()
+    backend.on_set = lambda: cache.invalidate(row.id)
+    cache.store(row, generation)  # The invalidation deletes the id key, store() the secondaries
+    assert cache.get(row.id) is None and cache.get_by_field("email", row.email) is None
+    assert len(backend) == 1 and cache.stale_fills == 2
+
+    cache.store(row, cache.generation())
+    assert cache.get(row.id) == row and cache.get(row.id).updated_at == row.updated_at
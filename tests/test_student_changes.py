@@ -0,0 +1,149 @@
+"""Change feed (/student/changes): event framing, replay, Last-Event-ID resume, pruned history and live changes."""
+import asyncio
+import json
+import socket
+import threading
+import time
+from typing import Dict, List
+
+import httpx
+import pytest
+import uvicorn
+from sqlmodel import Session, delete
+
+from src.db.database import get_engine
+from src.db.models.student_change import StudentChange
+from src.services.student_changes import prune_student_changes_periodically
+from tests.conftest import create_student
+
+TIMEOUT = 10.0
+
+
+@pytest.fixture
+def server(client):
+    """Base URL of the app served by uvicorn in a thread: ASGITransport buffers whole responses, so it cannot read a stream."""
+    from src.main import app
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    instance = uvicorn.Server(uvicorn.Config(app, lifespan="off", loop="asyncio", log_level="warning", timeout_graceful_shutdown=1))
+    thread = threading.Thread(target=instance.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + TIMEOUT
+    while not instance.started:
+        assert time.monotonic() < deadline, "uvicorn did not start"
+        time.sleep(0.01)
+    yield f"http://127.0.0.1:{sock.getsockname()[1]}/api/v1"
+    instance.should_exit = True
+    thread.join(TIMEOUT)
+    sock.close()
+
+
+async def read_events(response: httpx.Response, count: int) -> List[Dict[str, str]]:
+    """The first `count` events of a text/event-stream body as {field: value}; comment lines are skipped."""
+    events, fields = [], {}
+    async for line in response.aiter_lines():
+        if line:
+            if not line.startswith(":"):
+                name, _, value = line.partition(":")
+                fields[name] = value[1:] if value.startswith(" ") else value
+        elif fields:
+            events.append(fields)
+            fields = {}
+            if len(events) == count:
+                break
+    return events
+
+
+def stream(server: str, count: int, on_open=None, **request) -> List[Dict[str, str]]:
+    """Opens the change feed, calls `on_open` once the response started, and reads `count` events within TIMEOUT."""
+    async def main():
+        async with httpx.AsyncClient(timeout=TIMEOUT) as http:
+            async with http.stream("GET", f"{server}/student/changes", **request) as response:
+                assert response.status_code == 200
+                assert response.headers["content-type"].startswith("text/event-stream")
+                assert response.headers["cache-control"] == "no-cache"
+                if on_open is not None:
+                    await asyncio.to_thread(on_open)
+                return await read_events(response, count)
+    return asyncio.run(asyncio.wait_for(main(), TIMEOUT))
+
+
+def test_replay_frames_each_change_with_its_seq(client, server):
+    first = create_student(client, 1)
+    second = create_student(client, 2)
+    assert client.patch(f"/api/v1/student/{first['id']}", json={"name": "Renamed"}).status_code == 200
+    assert client.delete(f"/api/v1/student/{second['id']}").status_code == 204
+
+    retry, *changes = stream(server, 5, params={"after": 0})
+    assert retry == {"retry": "2000"}
+    assert [(event["id"], event["event"]) for event in changes] == [
+        ("1", "created"), ("2", "created"), ("3", "updated"), ("4", "deleted")
+    ]
+    payloads = [json.loads(event["data"]) for event in changes]
+    assert [payload["seq"] for payload in payloads] == [1, 2, 3, 4]
+    assert payloads[2]["id"] == first["id"] and payloads[2]["student"]["name"] == "Renamed"
+    assert payloads[3]["id"] == second["id"] and payloads[3]["student"] is None
+    # Timestamps carry their offset, like the timestamptz columns they come from
+    assert all(payload["at"].endswith("Z") or payload["at"].endswith("+00:00") for payload in payloads)
+
+
+def test_last_event_id_resumes_after_that_seq(client, server):
+    for number in range(3):
+        create_student(client, number)
+    # Last-Event-ID takes precedence over `after`
+    _, resumed = stream(server, 2, params={"after": 0}, headers={"Last-Event-ID": "2"})
+    assert resumed["id"] == "3" and json.loads(resumed["data"])["student"]["name"] == "Student 2"
+
+
+def test_invalid_last_event_id_is_422(client):
+    response = client.get("/api/v1/student/changes", headers={"Last-Event-ID": "abc"})
+    assert response.status_code == 422
+    assert "Invalid Last-Event-ID 'abc'" in response.json()["detail"]
+
+
+def test_pruned_changes_send_a_reset(client, server):
+    for number in range(4):
+        create_student(client, number)
+    with Session(get_engine()) as session:
+        session.exec(delete(StudentChange).where(StudentChange.seq <= 2))
+        session.commit()
+
+    reset, retry, change = stream(server, 3, headers={"Last-Event-ID": "1"})
+    assert reset == {"event": "reset", "data": '{"oldest": 3}'}
+    assert retry == {"retry": "2000"}
+    assert change["id"] == "3"
+
+    # Nothing was pruned past the cursor: no reset
+    assert stream(server, 2, params={"after": 2})[1]["id"] == "3"
+
+
+def test_new_changes_are_pushed_to_open_streams(client, server):
+    create_student(client, 1)
+    # Without `after` only changes made after the stream opened are sent
+    retry, change = stream(server, 2, on_open=lambda: create_student(client, 2))
+    assert retry == {"retry": "2000"}
+    assert (change["id"], change["event"]) == ("2", "created")
+    assert json.loads(change["data"])["student"]["student_id"] == "T000002"
+
+
+def test_pruning_stops_when_cancelled_mid_prune():
+    async def main():
+        started = asyncio.Event()
+
+        async def prune(before):
+            started.set()
+            try:
+                await asyncio.sleep(TIMEOUT)
+            except asyncio.CancelledError:
+                # What an interrupted thread pool call can leave behind instead of the cancellation
+                raise RuntimeError("Method 'close()' can't be called here") from None
+
+        task = asyncio.create_task(prune_student_changes_periodically(prune))
+        await started.wait()
+        task.cancel()
+        # Not caught and logged, which would sleep until the next prune and block the shutdown
+        await asyncio.wait_for(asyncio.gather(task, return_exceptions=True), 1)
+        assert task.cancelled()
+
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+"""ETag round trips of a single student: GET -> If-None-Match, GET -> PATCH If-Match, stale versions."""
+from tests.conftest import create_student
+
+
+def test_etag_round_trip(client):
+    student = create_student(client, 1)
+    url = f"/api/v1/student/{student['id']}"
+
+    response = client.get(url)
+    etag = response.headers["ETag"]
+    assert response.status_code == 200 and response.headers["Last-Modified"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    response = client.patch(url, json={"name": "Renamed"}, headers={"If-Match": etag})
+    assert response.status_code == 200, response.text
+    new_etag = response.headers["ETag"]
+    assert new_etag != etag and response.json()["name"] == "Renamed"
+    # The ETag of the PATCH response is the one a GET now returns
+    assert client.get(url).headers["ETag"] == new_etag
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    assert client.patch(url, json={"name": "Stale"}, headers={"If-Match": etag}).status_code == 412
+    assert client.patch(url, json={"name": "Fresh"}, headers={"If-Match": new_etag}).status_code == 200
+    assert client.get(url).json()["name"] == "Fresh"
+
+
+def test_if_match_edge_cases(client):
+    student = create_student(client, 2)
+    url = f"/api/v1/student/{student['id']}"
+    etag = client.get(url).headers["ETag"]
+
+    # Weak tags never match strongly, "*" matches any version, a list matches any of its tags
+    assert client.patch(url, json={"name": "Weak"}, headers={"If-Match": f"W/{etag}"}).status_code == 412
+    response = client.patch(url, json={"name": "Listed"}, headers={"If-Match": f'"1", {etag}'})
+    assert response.status_code == 200
+    assert client.patch(url, json={"name": "Any"}, headers={"If-Match": "*"}).status_code == 200
+    assert client.patch(
+        "/api/v1/student/00000000-0000-0000-0000-000000000000", json={"name": "Nobody"}, headers={"If-Match": etag}
+    ).status_code == 404
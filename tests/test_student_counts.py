@@ -0,0 +1,87 @@
+"""Listing totals: exact, cached (dropped by a new generation on writes) and estimated counts."""
+from sqlalchemy import text
+from sqlmodel import Session
+
+from src.core.cache import TTLLRUCache
+from src.core.config import settings
+from src.db.database import get_engine
+from src.db.models.student import StudentCreate, StudentFilter
+from src.services.student_count_cache import StudentCountCache
+from src.services.student_service import StudentService
+from tests.conftest import create_student
+
+
+def total(client, count: str, **params):
+    body = client.get("/api/v1/student/", params={"count": count, "limit": 1, **params}).json()
+    return body["total"], body["total_mode"]
+
+
+def insert_behind_the_cache(number: int) -> None:
+    with Session(get_engine()) as session:
+        StudentService(session).create_student(
+            StudentCreate(name=f"Hidden {number}", student_id=f"H{number:06d}", id_semester="2024/1", email=f"hidden{number}@example.com")
+        )
+
+
+def test_exact_counts_every_time(client):
+    create_student(client, 1)
+    assert total(client, "exact") == (1, "exact")
+    insert_behind_the_cache(2)
+    assert total(client, "exact") == (2, "exact")
+
+
+def test_cached_total_until_a_write_moves_the_generation(client):
+    for number in range(3):
+        create_student(client, number, id_semester="2024/1" if number else "2023/2")
+    assert total(client, "cached") == (3, "exact")  # Miss: counted and stored
+    assert total(client, "cached") == (3, "cached")
+    assert total(client, "cached", id_semester="2023/2") == (1, "exact")  # Cached per filter set
+
+    insert_behind_the_cache(10)
+    assert total(client, "cached") == (3, "cached")  # Stale until a write through the API
+
+    student = create_student(client, 4)
+    assert total(client, "cached") == (5, "exact")
+    assert total(client, "cached") == (5, "cached")
+
+    # Only writes to filtered fields can move a filtered total
+    url = f"/api/v1/student/{student['id']}"
+    assert client.patch(url, json={"email": "other@example.com"}).status_code == 200
+    assert total(client, "cached") == (5, "cached")
+    assert client.patch(url, json={"id_semester": "2023/2"}).status_code == 200
+    assert total(client, "cached", id_semester="2023/2") == (2, "exact")
+
+    assert client.delete(url).status_code == 204
+    assert total(client, "cached") == (4, "exact")
+
+
+def test_estimate_uses_statistics_and_falls_back(client, monkeypatch):
+    for number in range(3):
+        create_student(client, number)
+    # Never analyzed: no estimate, so the cached/exact path answers
+    assert total(client, "estimate") == (3, "exact")
+
+    with get_engine().begin() as connection:
+        connection.execute(text("ANALYZE"))
+    insert_behind_the_cache(10)
+    # Below STUDENT_COUNT_EXACT_BELOW an estimate is replaced by an exact count
+    assert total(client, "estimate") == (4, "exact")
+    monkeypatch.setattr(settings, "STUDENT_COUNT_EXACT_BELOW", 0)
+    assert total(client, "estimate") == (3, "estimate")  # As of the last ANALYZE
+    # SQLite has no estimate for a filtered list
+    assert total(client, "estimate", id_semester="2024/1")[1] != "estimate"
+
+
+def test_total_counted_under_an_old_generation_is_never_served():
+    counts = StudentCountCache(TTLLRUCache(max_entries=100))
+    filters = StudentFilter(id_semester="2024/1")
+    assert counts.get(filters)[0] is None
+    _, generation = counts.get(filters)
+    counts.invalidate()  # A write lands while the count runs
+    counts.store(filters, 7, generation)
+    assert counts.get(filters)[0] is None
+    _, generation = counts.get(filters)
+    counts.store(filters, 8, generation)
+    assert counts.get(filters)[0] == 8
+    assert counts.get(StudentFilter(id_semester="2023/2"))[0] is None
+    assert (counts.hits, counts.invalidations) == (1, 1)
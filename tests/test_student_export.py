@@ -0,0 +1,89 @@
+"""Student export: NDJSON and CSV bodies, one CSV header across batches, field escaping, order and filters."""
+import csv
+import io
+import json
+
+import pytest
+
+from src.core.config import settings
+from src.utils.export import rows_to_csv, rows_to_ndjson
+from tests.conftest import create_student
+
+COLUMNS = ["name", "student_id", "id_semester", "email", "department", "id"]
+
+
+def export(client, **params):
+    response = client.get("/api/v1/student/export", params=params)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def csv_rows(response) -> list:
+    return list(csv.reader(io.StringIO(response.text)))
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    monkeypatch.setattr(settings, "STUDENT_EXPORT_BATCH_SIZE", 2)
+
+
+def test_ndjson_has_one_object_per_student(client, small_batches):
+    created = [create_student(client, number, **({"department": {"faculty": "Teknik"}} if number == 1 else {})) for number in range(5)]
+    response = export(client)
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="students.ndjson"'
+    assert response.text.endswith("\n")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [list(row) for row in rows] == [COLUMNS] * 5
+    assert [row["id"] for row in rows] == [student["id"] for student in created]
+    assert rows[1]["department"] == {"faculty": "Teknik"} and rows[0]["department"] == {}
+
+
+def test_csv_has_one_header_across_batches(client, small_batches):
+    created = [create_student(client, number) for number in range(5)]
+    response = export(client, format="csv")
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="students.csv"'
+    header, *rows = csv_rows(response)
+    assert header == COLUMNS
+    assert [row[5] for row in rows] == [student["id"] for student in created]
+
+
+def test_empty_exports(client):
+    assert export(client).text == ""
+    # A CSV without rows still has its header
+    assert export(client, format="csv").text == ",".join(COLUMNS) + "\r\n"
+
+
+def test_csv_escapes_fields(client):
+    create_student(client, 1, name='Budi "B", Jr.\nSecond line', department={"note": 'a,"b"', "city": "Médan"})
+    (header, row) = csv_rows(export(client, format="csv"))
+    assert row[0] == 'Budi "B", Jr.\nSecond line'
+    assert json.loads(row[4]) == {"note": 'a,"b"', "city": "Médan"}
+
+
+def test_order_by_and_filters(client):
+    create_student(client, 1, name="Charlie", id_semester="2024/2", department={"faculty": "Teknik"})
+    create_student(client, 2, name="Alice", id_semester="2024/1", department={"faculty": "Hukum"})
+    create_student(client, 3, name="Bob", id_semester="2024/2", department={"faculty": "Teknik"})
+
+    def names(**params):
+        return [json.loads(line)["name"] for line in export(client, **params).text.splitlines()]
+
+    assert names() == ["Charlie", "Alice", "Bob"]
+    assert names(order_by="name") == ["Alice", "Bob", "Charlie"]
+    assert names(order_by="name", id_semester="2024/2") == ["Bob", "Charlie"]
+    assert names(department="faculty:Teknik", name="ch") == ["Charlie"]
+    assert names(name="li", name_match="contains", order_by="name") == ["Alice", "Charlie"]
+    assert [row[0] for row in csv_rows(export(client, format="csv", order_by="name", department="faculty:Hukum"))] == [
+        "name", "Alice"
+    ]
+    assert client.get("/api/v1/student/export", params={"order_by": "email"}).status_code == 422
+    assert client.get("/api/v1/student/export", params={"department": "faculty"}).status_code == 422
+
+
+def test_renderers():
+    rows = [{"name": "Ana, \"A\"", "department": {"tags": ["x", "é"]}, "id": 7}]
+    assert rows_to_ndjson(rows) == '{"name":"Ana, \\"A\\"","department":{"tags":["x","é"]},"id":7}\n'
+    assert rows_to_csv(rows, ["name", "department", "id"]) == '"Ana, ""A""","{""tags"":[""x"",""é""]}",7\r\n'
+    assert rows_to_csv([], ["name", "id"], header=True) == "name,id\r\n"
@@ -0,0 +1,53 @@
+"""Sparse fieldsets (?fields=): validation, and the shape of detail, list and batch responses."""
+import pytest
+
+from src.db.models.student import STUDENT_READ_FIELDS
+from tests.conftest import create_student
+
+
+@pytest.mark.parametrize("fields", ["", " , ", "name,bogus", "updated_at", "created_at,id"])
+def test_invalid_fieldsets_are_422(client, fields):
+    for url in ("/api/v1/student/", "/api/v1/student/00000000-0000-0000-0000-000000000000", "/api/v1/student/batch?ids=00000000-0000-0000-0000-000000000000"):
+        response = client.get(url, params={"fields": fields})
+        assert response.status_code == 422, (url, response.text)
+    assert "expected a comma-separated subset of " + ", ".join(STUDENT_READ_FIELDS) in response.json()["detail"]
+
+
+def test_detail_returns_only_the_requested_fields(client):
+    student = create_student(client, 1, department={"faculty": "Teknik"})
+    url = f"/api/v1/student/{student['id']}"
+    full = client.get(url)
+
+    # Once read from the database (cache miss) and once projected from the cached record
+    for _ in range(2):
+        sparse = client.get(url, params={"fields": " email , name "})
+        assert sparse.status_code == 200
+        assert sparse.json() == {"name": "Student 1", "email": "student1@example.com"}
+        assert sparse.headers["ETag"] == full.headers["ETag"]
+    assert client.get(url, params={"fields": "department,id"}).json() == {"department": {"faculty": "Teknik"}, "id": student["id"]}
+
+
+def test_fresh_detail_read_is_sparse_too(client):
+    student = create_student(client, 1)
+    # No full read first: the miss reads only the requested columns
+    assert client.get(f"/api/v1/student/{student['id']}", params={"fields": "student_id"}).json() == {"student_id": "T000001"}
+
+
+@pytest.mark.parametrize("pagination", ["offset", "cursor"])
+def test_list_pages_are_sparse(client, pagination):
+    created = [create_student(client, number) for number in range(3)]
+    names, params = [], {"fields": "name", "limit": 2, "pagination": pagination}
+    while len(names) < len(created):
+        page = client.get("/api/v1/student/", params=params).json()
+        assert page["data"] and all(list(student) == ["name"] for student in page["data"])
+        names.extend(student["name"] for student in page["data"])
+        # The cursor is built from columns loaded alongside the fieldset
+        params = {**params, "cursor": page["next_cursor"]} if pagination == "cursor" else {**params, "offset": len(names)}
+    assert names == [student["name"] for student in created]
+
+
+def test_batch_is_sparse(client):
+    student = create_student(client, 1)
+    unknown = "00000000-0000-0000-0000-000000000000"
+    body = client.get("/api/v1/student/batch", params={"ids": f"{student['id']},{unknown}", "fields": "id,name"}).json()
+    assert body == {"data": [{"name": "Student 1", "id": student["id"]}], "missing": [unknown]}
@@ -0,0 +1,66 @@
+"""
+Plan checks for the student list filters: the queries StudentService issues for each filter
+must be answered through the filter indexes, not a full table scan.
+
+SQLite always runs. PostgreSQL (trigram and GIN indexes) runs when TEST_POSTGRES_URL points at a
+disposable database; the student table there is created and dropped by the test.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlmodel import SQLModel
+
+from src.db.models.student import StudentFilter
+from tests.query_plans import TABLES, captured_statements, postgres_plan_indexes, seed, sqlite_plan
+
+
+def filter_calls(filters: StudentFilter):
+    yield "count", lambda service: service.count_students(filters)
+    yield "page", lambda service: service.get_students_page(limit=50, filters=filters)
+
+
+@pytest.fixture(scope="module")
+def sqlite_engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}")
+    seed(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("filters, index", [
+    (StudentFilter(id_semester="2015/2"), "ix_student_id_semester"),
+    (StudentFilter(id_semester="2015/2", department={"faculty": "Teknik"}), "ix_student_id_semester"),
+])
+def test_sqlite_filter_uses_index(sqlite_engine, filters, index):
+    for label, call in filter_calls(filters):
+        for statement, parameters in captured_statements(sqlite_engine, call):
+            plan = sqlite_plan(sqlite_engine, statement, parameters)
+            assert index in plan, f"{label} query does not use {index}:\n{statement}\n{plan}"
+
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+@pytest.fixture(scope="module")
+def postgres_engine():
+    if not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(POSTGRES_URL)
+    seed(engine)
+    yield engine
+    SQLModel.metadata.drop_all(engine, tables=TABLES)
+    engine.dispose()
+
+
+@pytest.mark.parametrize("filters, index", [
+    (StudentFilter(id_semester="2015/2"), "ix_student_id_semester"),
+    (StudentFilter(name="Student 0012"), "ix_student_name_trgm"),
+    (StudentFilter(name="budi", name_match="contains"), "ix_student_name_trgm"),
+    (StudentFilter(department={"faculty": "Teknik"}), "ix_student_department"),
+])
+def test_postgres_filter_uses_index(postgres_engine, filters, index):
+    for label, call in filter_calls(filters):
+        for statement, parameters in captured_statements(postgres_engine, call):
+            indexes = postgres_plan_indexes(postgres_engine, statement, parameters)
+            assert index in indexes, f"{label} query does not use {index} (uses {indexes}):\n{statement}"
@@ -0,0 +1,155 @@
+"""Background CSV imports: progress, per-row errors with file row numbers, upserts and rejected uploads."""
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from src.core.cache import TTLLRUCache
+from src.core.config import settings
+from src.core.middleware import BodyLimitMiddleware
+from src.services import student_import
+from src.services.student_import import StudentImporter, StudentImportStore
+from tests.conftest import create_student
+
+HEADER = "name,student_id,id_semester,email,department\n"
+
+
+@pytest.fixture
+def importer(tmp_path, monkeypatch):
+    """A fresh importer with small batches; the app's one is shut down with the TestClient that started it."""
+    def install(**options):
+        instance = StudentImporter(StudentImportStore(TTLLRUCache(max_entries=100)), str(tmp_path / "spool"), **options)
+        monkeypatch.setattr(student_import, "student_importer", instance)
+        monkeypatch.setattr(student_import, "_student_importer_initialized", True)
+        return instance
+    return install
+
+
+def upload(client, content: str, filename: str = "students.csv", **params):
+    return client.post("/api/v1/student/imports", params=params, files={"file": (filename, content.encode("utf-8"), "text/csv")})
+
+
+def finished(client, job: dict, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/api/v1/student/imports/{job['id']}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        assert time.monotonic() < deadline, f"import still {job['status']}"
+        time.sleep(0.02)
+
+
+def test_import_reports_progress_and_rejected_rows(client, importer):
+    importer(batch_size=2)
+    create_student(client, 1)
+    content = HEADER + "".join([
+        'Alpha,I000001,2024/1,alpha@example.com,"{""faculty"": ""Teknik""}"\n',  # row 2
+        "No Email,I000002,2024/1,,\n",                                          # row 3: invalid
+        "Bad Json,I000003,2024/1,bad@example.com,{oops\n",                      # row 4: invalid
+        "Beta,I000004,2024/1,beta@example.com,\n",                              # row 5
+        "Gamma,I000005,2024/1,gamma@example.com,\n",                            # row 6
+        "Gamma Again,I000006,2024/1,gamma@example.com,\n",                      # row 7: duplicates row 6
+        "Existing,T000001,2024/1,existing@example.com,\n",                      # row 8: already stored
+    ])
+    response = upload(client, content)
+    assert response.status_code == 202, response.text
+    accepted = response.json()
+    assert response.headers["Location"].endswith(f"/student/imports/{accepted['id']}")
+    assert accepted["status"] == "pending" and accepted["bytes"] == len(content.encode("utf-8"))
+
+    job = finished(client, accepted)
+    assert job["status"] == "completed" and job["finished_at"] and job["rows_per_second"] > 0
+    assert (job["rows"], job["created"], job["updated"], job["invalid"], job["conflicts"]) == (7, 3, 0, 2, 2)
+    assert [(error["row"], error["status"]) for error in job["errors"]] == [
+        (3, "invalid"), (4, "invalid"), (7, "conflict"), (8, "conflict")
+    ]
+    assert job["errors"][0]["detail"].startswith("email:")
+    assert job["errors"][1]["detail"].startswith("department:")
+    assert job["errors"][2]["detail"] == "email duplicates row 6"
+    assert job["errors"][3]["detail"] == "student_id already exists"
+
+    students = client.get("/api/v1/student/", params={"order_by": "name"}).json()["data"]
+    assert [student["name"] for student in students] == ["Alpha", "Beta", "Gamma", "Student 1"]
+    assert students[0]["department"] == {"faculty": "Teknik"}
+
+
+def test_upsert_import_updates_and_caps_reported_errors(client, importer):
+    importer(batch_size=10, max_errors=1)
+    student = create_student(client, 1)
+    content = HEADER + "Renamed,T000001,2024/2,student1@example.com,\n,I1,,,\n,I2,,,\n"
+    job = finished(client, upload(client, content, upsert=True).json())
+    assert (job["created"], job["updated"], job["invalid"]) == (0, 1, 2)
+    assert len(job["errors"]) == 1
+    assert client.get(f"/api/v1/student/{student['id']}").json()["name"] == "Renamed"
+
+
+def test_unreadable_file_fails_the_job(client, importer):
+    importer()
+    job = finished(client, upload(client, "name,email\nA,a@example.com\n").json())
+    assert job["status"] == "failed"
+    assert job["detail"] == "Import file is missing the columns: student_id, id_semester"
+
+
+def test_rejected_uploads(client, importer, tmp_path):
+    importer(max_bytes=len(HEADER))
+    assert upload(client, HEADER, filename="students.txt").status_code == 415
+    assert upload(client, HEADER + "A,B,C,D,\n").status_code == 413
+    assert not list((tmp_path / "spool").iterdir())  # The partial spool file was removed
+    assert client.get("/api/v1/student/imports/00000000-0000-0000-0000-000000000000").status_code == 404
+
+
+@pytest.fixture
+def limited_app():
+    """An upload endpoint behind BodyLimitMiddleware, and the sizes of the files that reached it."""
+    app = FastAPI()
+    app.add_middleware(BodyLimitMiddleware, limits={"/upload": 1000})
+    received = []
+
+    @app.post("/upload")
+    async def upload_file(file: UploadFile = File(...)):
+        received.append(len(await file.read()))
+        return {"bytes": received[-1]}
+
+    return TestClient(app), received
+
+
+def test_oversized_bodies_are_refused_before_they_are_parsed(limited_app):
+    limited_client, received = limited_app
+    files = {"file": ("students.csv", b"x" * 500, "text/csv")}
+    assert limited_client.post("/upload", files=files).json() == {"bytes": 500}
+
+    response = limited_client.post("/upload", files={"file": ("students.csv", b"x" * 1000, "text/csv")})
+    assert response.status_code == 413  # 1000 bytes of file, plus the multipart framing
+    assert response.json() == {"detail": "Request bodies are limited to 1000 bytes"}
+
+    # Without a Content-Length the body is cut off once the limit is passed
+    sent, messages = [], []
+
+    async def receive():
+        sent.append(b"x" * 100 if sent else b'--b\r\nContent-Disposition: form-data; name="file"; filename="s.csv"\r\n\r\n')
+        return {"type": "http.request", "body": sent[-1], "more_body": len(sent) < 100}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "POST", "scheme": "http", "path": "/upload", "raw_path": b"/upload",
+        "root_path": "", "query_string": b"", "headers": [(b"content-type", b"multipart/form-data; boundary=b")],
+        "client": ("127.0.0.1", 1), "server": ("testserver", 80),
+    }
+    asyncio.run(limited_client.app(scope, receive, send))
+    assert messages[0]["status"] == 413 and len(sent) == 11
+    assert received == [500]
+
+
+def test_import_content_length_over_the_limit_is_refused_unread(client, importer, tmp_path):
+    importer()
+    limit = settings.STUDENT_IMPORT_MAX_BYTES + student_import.MULTIPART_OVERHEAD_BYTES
+    response = client.post(
+        "/api/v1/student/imports", content=b"--b--\r\n",
+        headers={"Content-Type": "multipart/form-data; boundary=b", "Content-Length": str(limit + 1)}
+    )
+    assert response.status_code == 413
+    assert not list((tmp_path / "spool").iterdir())
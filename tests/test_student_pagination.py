@@ -0,0 +1,54 @@
+"""Cursor pagination of GET /student/: full walks in both orderings and rejection of tampered cursors."""
+import pytest
+
+from src.utils.pagination import decode_cursor, encode_cursor
+from tests.conftest import create_student
+
+
+def walk(client, order_by: str, limit: int = 2) -> list:
+    ids, cursor = [], None
+    while True:
+        params = {"limit": limit, "order_by": order_by, "pagination": "cursor"}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/v1/student/", params=params).json()
+        ids.extend(student["id"] for student in page["data"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.parametrize("order_by", ["created_at", "name"])
+def test_cursor_walk_returns_every_student_once(client, order_by):
+    created = [create_student(client, number, name=f"Name {(number * 7) % 5}")["id"] for number in range(5)]
+    ids = walk(client, order_by)
+    assert sorted(ids) == sorted(created)
+    assert ids == [student["id"] for student in client.get("/api/v1/student/", params={"order_by": order_by}).json()["data"]]
+
+
+def tampered(cursor: str, **changes) -> str:
+    return encode_cursor({**decode_cursor(cursor), **changes})
+
+
+@pytest.mark.parametrize("changes, message", [
+    ({"key": [{"x": 1}, 1]}, "does not fit created_at"),
+    ({"key": [1, 2, 3]}, "list of 2 values"),
+    ({"key": "ab"}, "list of 2 values"),
+    ({"key": ["not a date", "also not a uuid"]}, "does not fit created_at"),
+    ({"offset": -5}, "negative offset"),
+    ({"order_by": "name"}, "issued for order_by=name"),
+])
+def test_tampered_cursor_is_rejected_with_400(client, changes, message):
+    for number in range(3):
+        create_student(client, number)
+    cursor = client.get("/api/v1/student/", params={"limit": 1, "pagination": "cursor"}).json()["next_cursor"]
+    response = client.get("/api/v1/student/", params={"limit": 1, "cursor": tampered(cursor, **changes)})
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
+
+
+def test_malformed_cursor_is_prefixed_once(client):
+    response = client.get("/api/v1/student/", params={"cursor": "!!not-base64!!"})
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert detail.startswith("Invalid cursor: ") and detail.count("Invalid cursor") == 1
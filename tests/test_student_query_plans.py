@@ -0,0 +1,250 @@
+"""
+Plan regression harness for every StudentService statement.
+
+Each case runs one StudentService method against a seeded database, captures the SELECT, UPDATE and
+DELETE statements it sends, EXPLAINs them with the same parameters and fails when:
+
+- none of the case's expected indexes is used (e.g. a lookup by UUID that stops using the primary key);
+- a student table is read with a full table scan or sorted in a temporary B-tree (SQLite), or
+  sequentially scanned or estimated above the case's cost limit (PostgreSQL).
+
+Plans are written to QUERY_PLAN_ARTIFACTS_DIR (default build/query-plans), one Markdown file per
+database, for review alongside the change that moved them. SQLite always runs; PostgreSQL runs when
+TEST_POSTGRES_URL points at a disposable database.
+"""
+import inspect
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine
+from sqlmodel import Session, SQLModel, select
+
+from src.core.exceptions import StudentVersionConflict
+from src.db.explain import plan_nodes
+from src.db.models.student import Student, StudentCreate, StudentUpdate
+from src.services.student_service import StudentService
+from tests.query_plans import ROWS, TABLES, captured_statements, postgres_plan, render_plan, seed, sqlite_plan
+
+ARTIFACTS_DIR = Path(os.getenv("QUERY_PLAN_ARTIFACTS_DIR", Path(__file__).resolve().parent.parent / "build" / "query-plans"))
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+# Index names per database for the primary keys (SQLite's automatic index on the UUID primary key,
+# and the rowid alias of student_change.seq)
+STUDENT_PK = ("sqlite_autoindex_student_1", "ix_student_id", "student_pkey")
+STUDENT_CHANGE_PK = ("INTEGER PRIMARY KEY", "student_change_pkey")
+# PostgreSQL total cost limit of a statement on the seeded tables; a forced sequential scan costs ~1e10
+DEFAULT_MAX_COST = 1000.0
+
+# Statements checked: reads and writes that locate rows of the student tables (INSERTs have no access path)
+CHECKED_STATEMENT = re.compile(r"^\s*(SELECT\b.*\bFROM|UPDATE|DELETE\s+FROM)\s+\"?student(_change)?\b", re.IGNORECASE | re.DOTALL)
+SQLITE_TABLE_SCAN = re.compile(r"^SCAN (student|student_change)$", re.MULTILINE)
+
+
+def update_stale_version(service: StudentService, sample: Student) -> None:
+    # Runs the conditional UPDATE and, once it matches no row, the existence check
+    with pytest.raises(StudentVersionConflict):
+        service.update_student(sample.id, StudentUpdate(), if_match=[datetime(2000, 1, 1, tzinfo=timezone.utc)])
+
+
+@dataclass
+class PlanCase:
+    name: str
+    call: Callable[[StudentService, Student], Any]
+    indexes: Tuple[str, ...]  # Every checked statement must use one of these ("" for no requirement)
+    allow_scan: bool = False
+    max_cost: float = DEFAULT_MAX_COST
+
+
+CASES = [
+    PlanCase("get_student_by_id", lambda service, sample: service.get_student_by_id(sample.id), STUDENT_PK),
+    PlanCase(
+        "get_student_by_id[fields]",
+        lambda service, sample: service.get_student_by_id(sample.id, fields=("name", "student_id")), STUDENT_PK
+    ),
+    PlanCase("get_student_version", lambda service, sample: service.get_student_version(sample.id), STUDENT_PK),
+    PlanCase("get_students_by_ids", lambda service, sample: service.get_students_by_ids([sample.id, uuid4()]), STUDENT_PK),
+    PlanCase("get_student_by_email", lambda service, sample: service.get_student_by_email(sample.email), ("ix_student_email",)),
+    PlanCase(
+        "get_student_by_email_and_id",
+        lambda service, sample: service.get_student_by_email_and_id(sample.email, sample.student_id),
+        ("ix_student_email", "ix_student_student_id"),
+    ),
+    PlanCase("get_all_students", lambda service, sample: service.get_all_students(limit=100), ("ix_student_created_at_id",)),
+    PlanCase(
+        "get_all_students[name]",
+        lambda service, sample: service.get_all_students(limit=100, order_by="name"), ("ix_student_name_id",)
+    ),
+    PlanCase("get_students_page", lambda service, sample: service.get_students_page(limit=100), ("ix_student_created_at_id",)),
+    PlanCase(
+        "get_students_page[after]",
+        lambda service, sample: service.get_students_page(limit=100, after=[sample.created_at, sample.id]),
+        ("ix_student_created_at_id",),
+    ),
+    PlanCase(
+        "get_students_page[name, after]",
+        lambda service, sample: service.get_students_page(limit=100, order_by="name", after=[sample.name, sample.id]),
+        ("ix_student_name_id",),
+    ),
+    PlanCase(
+        "get_students_page[fields]",
+        lambda service, sample: service.get_students_page(limit=100, fields=("id", "name")), ("ix_student_created_at_id",)
+    ),
+    PlanCase(
+        "get_students_page_versions[after]",
+        lambda service, sample: service.get_students_page_versions(limit=100, after=[sample.created_at, sample.id]),
+        ("ix_student_created_at_id",),
+    ),
+    PlanCase(
+        "iter_students",
+        lambda service, sample: sum(len(rows) for rows in service.iter_students()),
+        ("ix_student_created_at_id",), max_cost=10 * DEFAULT_MAX_COST,
+    ),
+    # COUNT(*) reads every row by definition; it only has to avoid sorting
+    PlanCase("count_students", lambda service, sample: service.count_students(), (), allow_scan=True),
+    PlanCase(
+        "bulk_create_students",
+        lambda service, sample: service.bulk_create_students([StudentCreate.model_validate(sample.model_dump())]),
+        ("ix_student_student_id", "ix_student_email"),
+    ),
+    PlanCase("update_student", lambda service, sample: service.update_student(uuid4(), StudentUpdate(name="Nobody")), STUDENT_PK),
+    PlanCase("update_student[if_match]", lambda service, sample: update_stale_version(service, sample), STUDENT_PK),
+    PlanCase("delete_student", lambda service, sample: service.delete_student(uuid4()), STUDENT_PK),
+    PlanCase("get_student_changes", lambda service, sample: service.get_student_changes(ROWS - 10), STUDENT_CHANGE_PK),
+    # SQLite reports a MIN()/MAX() answered from the rowid as a bare "SEARCH student_change"
+    PlanCase(
+        "get_student_change_bounds",
+        lambda service, sample: service.get_student_change_bounds(), ("SEARCH student_change", "student_change_pkey")
+    ),
+    PlanCase(
+        "prune_student_changes",
+        lambda service, sample: service.prune_student_changes(datetime(2000, 1, 1, tzinfo=timezone.utc)),
+        ("ix_student_change_created_at",),
+    ),
+]
+
+# Public StudentService methods without a case, and why
+UNCHECKED_METHODS = {
+    "create_student": "INSERTs only",
+    "record_changes": "INSERTs only",
+    "estimate_students": "reads planner statistics, not the student tables",
+    "filtered": "statement builder, covered through the methods using it",
+    "page_statement": "statement builder, covered through the methods using it",
+    "export_statement": "statement builder, covered by iter_students",
+}
+
+
+def test_every_service_method_is_checked():
+    methods = {name for name, _ in inspect.getmembers(StudentService, inspect.isfunction) if not name.startswith("_")}
+    checked = {case.name.split("[")[0] for case in CASES}
+    assert methods - checked - set(UNCHECKED_METHODS) == set(), "add a PlanCase (or an UNCHECKED_METHODS entry)"
+
+
+def test_get_student_by_id_filters_on_the_primary_key(sqlite_engine):
+    # get_student passes the path UUID, which once was compared to the student_id column instead
+    engine, sample, _ = sqlite_engine
+    ((statement, parameters),) = captured_statements(engine, lambda service: service.get_student_by_id(sample.id))
+    where = statement.split("WHERE", 1)[1]
+    assert re.fullmatch(r"\s*student\.id = \?\s*(LIMIT .*)?", where, re.DOTALL), where
+    assert parameters[0] == sample.id.hex
+
+
+def is_checked(statement: str) -> bool:
+    return bool(CHECKED_STATEMENT.match(statement))
+
+
+def sample_student(engine) -> Student:
+    # The row itself rather than a StudentRead: cursor cases need created_at, which StudentRead leaves out
+    with Session(engine) as session:
+        return session.exec(select(Student).where(Student.email == "plan1234@example.com")).one()
+
+
+class PlanReport:
+    """Collects the plans of one database and writes them as a Markdown artifact."""
+    def __init__(self, dialect: str):
+        self.dialect = dialect
+        self.sections: List[str] = []
+
+    def add(self, case: PlanCase, statement: str, plan: str, problems: List[str]) -> None:
+        verdict = "OK" if not problems else "FAIL: " + "; ".join(problems)
+        self.sections.append(f"## {case.name}\n\n{verdict}\n\n```sql\n{statement.strip()}\n```\n\n```\n{plan}\n```\n")
+
+    def write(self) -> None:
+        ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
+        (ARTIFACTS_DIR / f"{self.dialect}.md").write_text(f"# StudentService query plans ({self.dialect})\n\n" + "\n".join(self.sections))
+
+
+@pytest.fixture(scope="module")
+def sqlite_engine(tmp_path_factory):
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('query-plans') / 'plans.db'}")
+    seed(engine)
+    report = PlanReport("sqlite")
+    yield engine, sample_student(engine), report
+    report.write()
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def postgres_engine():
+    if not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(POSTGRES_URL)
+    seed(engine)
+    report = PlanReport("postgresql")
+    yield engine, sample_student(engine), report
+    report.write()
+    SQLModel.metadata.drop_all(engine, tables=TABLES)
+    engine.dispose()
+
+
+def sqlite_problems(case: PlanCase, plan: str) -> List[str]:
+    problems = []
+    if case.indexes and not any(index in plan for index in case.indexes):
+        problems.append(f"uses none of {', '.join(case.indexes)}")
+    if not case.allow_scan and SQLITE_TABLE_SCAN.search(plan):
+        problems.append("full table scan")
+    if "USE TEMP B-TREE" in plan:
+        problems.append("sorts in a temporary B-tree")
+    return problems
+
+
+def postgres_problems(case: PlanCase, plan: Dict[str, Any]) -> List[str]:
+    problems = []
+    nodes = plan_nodes(plan)
+    indexes = [node["Index Name"] for node in nodes if "Index Name" in node]
+    if case.indexes and not set(indexes) & set(case.indexes):
+        problems.append(f"uses none of {', '.join(case.indexes)} (uses {indexes})")
+    if not case.allow_scan and any(node["Node Type"] == "Seq Scan" for node in nodes):
+        problems.append("sequential scan")
+    if plan["Total Cost"] > case.max_cost:
+        problems.append(f"estimated cost {plan['Total Cost']} > {case.max_cost}")
+    return problems
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case.name for case in CASES])
+def test_sqlite_plan(sqlite_engine, case):
+    engine, sample, report = sqlite_engine
+    failures = []
+    for statement, parameters in captured_statements(engine, lambda service: case.call(service, sample), keep=is_checked):
+        plan = sqlite_plan(engine, statement, parameters)
+        problems = sqlite_problems(case, plan)
+        report.add(case, statement, plan, problems)
+        failures.extend(f"{problem}:\n{statement}\n{plan}" for problem in problems)
+    assert not failures, "\n\n".join(failures)
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case.name for case in CASES])
+def test_postgres_plan(postgres_engine, case):
+    engine, sample, report = postgres_engine
+    failures = []
+    for statement, parameters in captured_statements(engine, lambda service: case.call(service, sample), keep=is_checked):
+        plan = postgres_plan(engine, statement, parameters)
+        problems = postgres_problems(case, plan)
+        report.add(case, statement, render_plan(plan), problems)
+        failures.extend(f"{problem}:\n{statement}\n{render_plan(plan)}" for problem in problems)
+    assert not failures, "\n\n".join(failures)
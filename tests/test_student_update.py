@@ -0,0 +1,63 @@
+"""PUT/PATCH /student/{id}: explicit nulls, duplicate student_id/email, and other constraint failures."""
+import sqlite3
+from uuid import UUID
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from src.core.exceptions import StudentConflict
+from src.db.database import get_engine
+from src.db.models.student import StudentUpdate
+from src.services.student_service import StudentService, is_unique_violation
+from tests.conftest import create_student
+
+
+@pytest.mark.parametrize("field", ["name", "student_id", "id_semester", "email", "department"])
+def test_explicit_null_is_rejected_with_422(client, field):
+    student = create_student(client, 1)
+    url = f"/api/v1/student/{student['id']}"
+    for method in (client.patch, client.put):
+        response = method(url, json={field: None})
+        assert response.status_code == 422, response.text
+        assert "may be omitted but not null" in response.text
+    assert client.get(url).json() == student
+
+
+def test_taken_student_id_or_email_is_409(client):
+    create_student(client, 1)
+    student = create_student(client, 2)
+    url = f"/api/v1/student/{student['id']}"
+    for field, value in (("student_id", "T000001"), ("email", "student1@example.com")):
+        response = client.patch(url, json={field: value})
+        assert response.status_code == 409
+        assert response.json()["detail"].startswith("Duplicate student:")
+
+
+def test_other_constraint_failures_are_not_conflicts(client):
+    student = create_student(client, 1)
+    with Session(get_engine()) as session:
+        service = StudentService(session)
+        # model_construct skips the null check, so the NOT NULL constraint is what rejects it
+        with pytest.raises(ValueError) as raised:
+            service.update_student(UUID(student["id"]), StudentUpdate.model_construct(name=None, _fields_set={"name"}))
+        assert not isinstance(raised.value, StudentConflict)
+        assert "NOT NULL" in str(raised.value)
+
+
+class PostgresError(Exception):
+    def __init__(self, sqlstate: str):
+        super().__init__(f"SQLSTATE {sqlstate}")
+        self.sqlstate = sqlstate
+
+
+@pytest.mark.parametrize("orig, unique", [
+    (sqlite3.IntegrityError("UNIQUE constraint failed: student.email"), True),
+    (sqlite3.IntegrityError("NOT NULL constraint failed: student.name"), False),
+    (sqlite3.IntegrityError("CHECK constraint failed: name"), False),
+    (PostgresError("23505"), True),
+    (PostgresError("23502"), False),
+    (PostgresError("23503"), False),
+])
+def test_is_unique_violation(orig, unique):
+    assert is_unique_violation(IntegrityError("UPDATE student", {}, orig)) is unique